@@ -10,10 +10,16 @@ applications, frameworks and engines can be downloaded through the hook.
 """
 
 import os
+import getpass
+import time
 import zipfile
+import hashlib
 import json
 import platform
 import re
+import shutil
+import tempfile
+import threading
 
 from sgtk import get_hook_baseclass
 
@@ -24,6 +30,22 @@ _SIX_IMPORT_WARNING = (
     "pipeline configuration. Falling back on using urllib2."
 )
 
+# Size of the chunks read when downloading release assets.
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Number of attempts to download a release asset, partial downloads are resumed.
+_DOWNLOAD_ATTEMPTS = 3
+# Maximum number of threads used to extract a release asset.
+_EXTRACT_THREADS = 4
+# Age, in seconds, after which a partial download lock is considered stale.
+_DOWNLOAD_LOCK_TIMEOUT = 60 * 60
+
+# Environment variable which can be set to the path of a shared folder, e.g. a
+# network share or a local mirror, where release assets are looked up before
+# downloading them from github. Assets downloaded from github are added to it.
+# Assets are stored as:
+#  <bundle store>/<organization>/<repository>/<tag>/<asset name>
+_BUNDLE_STORE_ENV_VAR = "UE_SHOTGRID_BUNDLE_STORE"
+
 
 class Bootstrap(get_hook_baseclass()):
     """
@@ -93,6 +115,13 @@ class Bootstrap(get_hook_baseclass()):
             raise RuntimeError("Don't know how to download %s" % descd)
         name = specs[0]
         token = specs[1]
+        store_folder = None
+        if os.environ.get(_BUNDLE_STORE_ENV_VAR):
+            store_folder = os.path.join(
+                os.environ[_BUNDLE_STORE_ENV_VAR], *(name.split("/") + [version])
+            )
+            if self._populate_from_bundle_store(store_folder, version, destination):
+                return
         try:
             if self.shotgun.config.proxy_handler:
                 # Re-use proxy settings from the Shotgun connection
@@ -125,28 +154,16 @@ class Bootstrap(get_hook_baseclass()):
             # the current platform and version. We're assuming that the cached
             # config for a user will never be shared between machines with
             # different os.
-            pname = {
-                "Darwin": "osx",
-                "Linux": "linux",
-                "Windows": "win"
-            }.get(platform.system())
-
-            if not pname:
-                raise ValueError("Unsupported platform %s" % platform.system())
-
             extracted = []
             for asset in response_d["assets"]:
                 name = asset["name"]
-                m = re.match(
-                    r"%s-py\d.\d+-%s.zip" % (version, pname),
-                    name
-                )
-                if m:
+                if self._is_platform_asset(name, version):
                     # Download the asset payload
                     self._download_zip_github_asset(
                         asset,
                         destination,
-                        token
+                        token,
+                        store_folder,
                     )
                     extracted.append(asset)
 
@@ -167,6 +184,118 @@ class Bootstrap(get_hook_baseclass()):
             self.logger.exception(e)
             raise
 
+    def _is_platform_asset(self, asset_name, version):
+        """
+        Return True if the given release asset is suitable for the current
+        platform.
+
+        :param str asset_name: A release asset name.
+        :param str version: The release tag.
+        :raises ValueError: If the current platform is not supported.
+        """
+        pname = {
+            "Darwin": "osx",
+            "Linux": "linux",
+            "Windows": "win"
+        }.get(platform.system())
+
+        if not pname:
+            raise ValueError("Unsupported platform %s" % platform.system())
+
+        return bool(re.match(r"%s-py\d.\d+-%s.zip$" % (version, pname), asset_name))
+
+    def _populate_from_bundle_store(self, store_folder, version, destination):
+        """
+        Extract release assets for the current platform from the shared bundle
+        store into the given destination.
+
+        Assets are hard linked, or copied if they can't be, to a local temporary
+        file before being extracted. Their checksum is verified if one was
+        stored with them.
+
+        :param str store_folder: Full path to the bundle store folder for the release.
+        :param str version: The release tag.
+        :param str destination: Folder where the bundle needs to be written.
+        :returns: True if some assets were extracted, False otherwise.
+        """
+        if not os.path.isdir(store_folder):
+            return False
+        asset_names = [
+            asset_name for asset_name in os.listdir(store_folder)
+            if self._is_platform_asset(asset_name, version)
+        ]
+        if not asset_names:
+            return False
+        if not os.path.exists(destination):
+            os.makedirs(destination)
+        for asset_name in asset_names:
+            store_path = os.path.join(store_folder, asset_name)
+            fd, local_path = tempfile.mkstemp(suffix=".zip")
+            os.close(fd)
+            os.remove(local_path)
+            try:
+                try:
+                    os.link(store_path, local_path)
+                except (AttributeError, OSError):
+                    shutil.copyfile(store_path, local_path)
+                checksum_path = "%s.sha256" % store_path
+                if os.path.isfile(checksum_path):
+                    with open(checksum_path, "r") as f:
+                        expected_digest = f.read().strip()
+                    if _get_file_digest(local_path) != expected_digest:
+                        self.logger.warning(
+                            "Checksum mismatch for %s in the bundle store, ignoring it." % store_path
+                        )
+                        return False
+                self._extract_zip(local_path, destination)
+            finally:
+                if os.path.exists(local_path):
+                    os.remove(local_path)
+        self.logger.info(
+            "Extracted files: %s from bundle store %s" % (os.listdir(destination), store_folder)
+        )
+        return True
+
+    def _add_to_bundle_store(self, store_folder, asset_name, download_path):
+        """
+        Add a downloaded release asset to the shared bundle store.
+
+        Failures are logged and ignored, the store is just an optimization.
+
+        :param str store_folder: Full path to the bundle store folder for the release.
+        :param str asset_name: The release asset name.
+        :param str download_path: Full path to the downloaded asset.
+        """
+        store_path = os.path.join(store_folder, asset_name)
+        if os.path.exists(store_path):
+            return
+        try:
+            if not os.path.isdir(store_folder):
+                os.makedirs(store_folder)
+            # Copy to a temporary file and rename it, so other hosts never
+            # see a partial asset. The checksum is written the same way, after
+            # the asset, since assets without a checksum are not verified.
+            fd, tmp_path = tempfile.mkstemp(prefix="%s." % asset_name, dir=store_folder)
+            os.close(fd)
+            try:
+                shutil.copyfile(download_path, tmp_path)
+                digest = _get_file_digest(tmp_path)
+                _replace(tmp_path, store_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            fd, tmp_path = tempfile.mkstemp(prefix="%s." % asset_name, dir=store_folder)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(digest)
+                _replace(tmp_path, "%s.sha256" % store_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self.logger.info("Added %s to bundle store %s" % (asset_name, store_folder))
+        except (IOError, OSError) as e:
+            self.logger.warning("Unable to add %s to the bundle store: %s" % (asset_name, e))
+
     def _should_download_release(self, desc):
         """
         Return a repo name and a token if the given descriptor should be downloaded
@@ -191,11 +320,14 @@ class Bootstrap(get_hook_baseclass()):
                     return name, token
         return None
 
-    def _download_zip_github_asset(self, asset, destination, token):
+    def _download_zip_github_asset(self, asset, destination, token, store_folder=None):
         """
         Download the zipped github asset and extract it into the given destination
         folder.
 
+        The asset is streamed to a temporary file which is kept if the download
+        fails, so the download can be resumed on the next attempt.
+
         Assets can be retrieved with the releases github REST api endpoint.
         https://developer.github.com/v3/repos/releases/#get-a-release-by-tag-name
 
@@ -204,6 +336,8 @@ class Bootstrap(get_hook_baseclass()):
                             zipped archive. The folder is created if it does not
                             exist.
         :param str token: A Github OAuth or personal token.
+        :param str store_folder: Optional bundle store folder to add the
+                                 downloaded asset to.
         """
         try:
             from tank_vendor.six.moves.urllib import request as url2
@@ -236,18 +370,267 @@ class Bootstrap(get_hook_baseclass()):
             opener = url2.build_opener(auth_handler)
 
         url2.install_opener(opener)
-        request = url2.Request(asset["url"])
-        if token:
-            # We will be redirected and the Auth shouldn't be in the header
-            # for the redirection.
-            request.add_unredirected_header("Authorization", "token %s" % token)
-        request.add_header("Accept", "application/octet-stream")
-        response = url2.urlopen(request)
-        if not os.path.exists(destination):
-            self.logger.info("Creating %s" % destination)
-            os.makedirs(destination)
-        tmp_file = os.path.join(destination, asset["name"])
-        with open(tmp_file, "wb") as f:
-            f.write(response.read())
-        with zipfile.ZipFile(tmp_file, "r") as zip_ref:
-            zip_ref.extractall(destination)
\ No newline at end of file
+
+        # Partial downloads are kept outside of the destination folder, which
+        # is deleted if the bundle can't be cached, so they can be resumed.
+        download_folder = os.path.join(
+            tempfile.gettempdir(),
+            "tk-unreal-downloads-%s" % _get_user_name(),
+        )
+        if not os.path.exists(download_folder):
+            os.makedirs(download_folder)
+        download_path, lock_path = self._lock_download(
+            download_folder, "%s-%s" % (asset.get("id", ""), asset["name"])
+        )
+        try:
+            for attempt in range(1, _DOWNLOAD_ATTEMPTS + 1):
+                try:
+                    self._download_github_asset(url2, asset, token, download_path)
+                    break
+                except (IOError, OSError, ValueError) as e:
+                    if attempt == _DOWNLOAD_ATTEMPTS:
+                        raise
+                    self.logger.warning(
+                        "Download of %s failed, retrying: %s" % (asset["name"], e)
+                    )
+            if not os.path.exists(destination):
+                self.logger.info("Creating %s" % destination)
+                os.makedirs(destination)
+            if store_folder:
+                self._add_to_bundle_store(store_folder, asset["name"], download_path)
+            self._extract_zip(download_path, destination)
+            os.remove(download_path)
+        finally:
+            if lock_path:
+                os.remove(lock_path)
+            elif os.path.exists(download_path):
+                # Private downloads can't be resumed.
+                os.remove(download_path)
+
+    def _lock_download(self, download_folder, name):
+        """
+        Return a path to download a release asset to, locked for the current
+        process.
+
+        The path for the asset name is used if it can be locked, so partial
+        downloads can be resumed. Otherwise another process is downloading the
+        same asset and a private temporary path is used instead.
+
+        :param str download_folder: Full path to the folder to download to.
+        :param str name: The file name to use for the download.
+        :returns: A download path, lock path tuple. The lock path is ``None``
+                  if a private temporary path is returned.
+        """
+        download_path = os.path.join(download_folder, name)
+        lock_path = "%s.lock" % download_path
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError:
+                try:
+                    # Clear locks left behind by processes which died.
+                    if time.time() - os.path.getmtime(lock_path) > _DOWNLOAD_LOCK_TIMEOUT:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                break
+            os.write(fd, ("%d" % os.getpid()).encode("utf-8"))
+            os.close(fd)
+            return download_path, lock_path
+        self.logger.debug(
+            "%s is already being downloaded by another process" % download_path
+        )
+        fd, download_path = tempfile.mkstemp(prefix="%s." % name, dir=download_folder)
+        os.close(fd)
+        return download_path, None
+
+    def _download_github_asset(self, url2, asset, token, download_path):
+        """
+        Download the given github asset to the given path, resuming a previous
+        partial download if any.
+
+        Data is streamed to disk in chunks, and its size and checksum, if github
+        provides one for the asset, are checked as it arrives.
+
+        :param url2: The urllib request module to use.
+        :param str asset: A Github asset dictionary.
+        :param str token: A Github OAuth or personal token.
+        :param str download_path: Full path to the file to download to.
+        :raises IOError: If the download is incomplete.
+        :raises ValueError: If the downloaded data does not match the asset
+                            size or checksum. The partial download is discarded.
+        """
+        expected_size = asset.get("size")
+        hasher = None
+        expected_digest = None
+        if asset.get("digest"):
+            # Digests are provided as "<algorithm>:<hex digest>"
+            algorithm, expected_digest = asset["digest"].split(":", 1)
+            hasher = hashlib.new(algorithm)
+
+        offset = 0
+        if os.path.exists(download_path):
+            offset = os.path.getsize(download_path)
+            if expected_size and offset > expected_size:
+                os.remove(download_path)
+                offset = 0
+
+        if not expected_size or offset < expected_size:
+            request = url2.Request(asset["url"])
+            if token:
+                # We will be redirected and the Auth shouldn't be in the header
+                # for the redirection.
+                request.add_unredirected_header("Authorization", "token %s" % token)
+            request.add_header("Accept", "application/octet-stream")
+            if offset:
+                self.logger.info("Resuming download of %s from byte %d" % (asset["name"], offset))
+                request.add_header("Range", "bytes=%d-" % offset)
+            response = url2.urlopen(request)
+            if offset and response.getcode() != 206:
+                # The server ignored the range, start over.
+                offset = 0
+        else:
+            response = None
+
+        if hasher and offset:
+            with open(download_path, "rb") as f:
+                for chunk in iter(lambda: f.read(_DOWNLOAD_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+
+        received = offset
+        if response is not None:
+            with open(download_path, "ab" if offset else "wb") as f:
+                while True:
+                    chunk = response.read(_DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    received += len(chunk)
+                    if expected_size and received > expected_size:
+                        f.close()
+                        os.remove(download_path)
+                        raise ValueError(
+                            "Received more data than the %d bytes expected for %s" % (
+                                expected_size, asset["name"]
+                            )
+                        )
+                    if hasher:
+                        hasher.update(chunk)
+                    f.write(chunk)
+
+        if expected_size and received < expected_size:
+            raise IOError(
+                "Incomplete download of %s, %d out of %d bytes received" % (
+                    asset["name"], received, expected_size
+                )
+            )
+        if hasher and hasher.hexdigest() != expected_digest:
+            os.remove(download_path)
+            raise ValueError("Checksum mismatch for %s" % asset["name"])
+
+    def _extract_zip(self, zip_path, destination):
+        """
+        Extract the given zip file into the given destination folder, using
+        multiple threads.
+
+        :param str zip_path: Full path to the zip file to extract.
+        :param str destination: Full path to an existing folder.
+        :raises ValueError: If a member would be extracted outside of the
+                            destination folder.
+        """
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            members = zip_ref.infolist()
+            for member in members:
+                parts = member.filename.replace("\\", "/").split("/")
+                if (
+                    member.filename.startswith(("/", "\\"))
+                    or re.match(r"[a-zA-Z]:", member.filename)
+                    or ".." in parts
+                ):
+                    raise ValueError(
+                        "Invalid member %s in %s" % (member.filename, zip_path)
+                    )
+            # Create folders first so threads don't race to create them.
+            for member in members:
+                if member.filename.endswith("/"):
+                    zip_ref.extract(member, destination)
+                else:
+                    folder = os.path.join(destination, *member.filename.split("/")[:-1])
+                    if not os.path.isdir(folder):
+                        os.makedirs(folder)
+
+        # Dispatch files to threads, biggest ones first, to balance the load.
+        files = sorted(
+            [member for member in members if not member.filename.endswith("/")],
+            key=lambda x: x.file_size,
+            reverse=True,
+        )
+        buckets = [[] for _ in range(min(_EXTRACT_THREADS, len(files)))]
+        bucket_sizes = [0] * len(buckets)
+        for member in files:
+            index = bucket_sizes.index(min(bucket_sizes))
+            buckets[index].append(member)
+            bucket_sizes[index] += member.file_size
+
+        errors = []
+
+        def extract_members(members):
+            try:
+                # Each thread needs its own handle on the zip file.
+                with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                    for member in members:
+                        zip_ref.extract(member, destination)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=extract_members, args=(bucket,))
+            for bucket in buckets
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+
+def _get_user_name():
+    """
+    Return the name of the current user, or a generic name if it can't be
+    retrieved.
+
+    :returns: A string.
+    """
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "unknown"
+
+
+def _replace(src, dst):
+    """
+    Atomically rename the given file, replacing the destination if it exists.
+
+    :param str src: Full path to the file to rename.
+    :param str dst: Full path to rename the file to.
+    """
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        # Python 2
+        os.rename(src, dst)
+
+
+def _get_file_digest(path):
+    """
+    Return the sha256 hex digest of the given file.
+
+    :param str path: Full path to a file.
+    :returns: A string.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_DOWNLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
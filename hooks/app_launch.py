@@ -12,14 +12,29 @@
 App Launch Hook
 
 This hook is executed to launch the applications.
+
+ShotGrid lookups and the rez module root discovery done for each launch are
+cached on disk and shared between launches. The cache can be invalidated with::
+
+    python app_launch.py --invalidate-cache
+
+This can be run with any python interpreter, tk-core is not needed.
 """
 
+import hashlib
+import json
 import os
 import sys
 import subprocess
 import platform
-import tank
+import tempfile
+import time
 
+try:
+    import tank
+except ImportError:
+    # Running as a script to manage the launch cache, outside of Toolkit.
+    tank = None
 
 
 ENGINES = {
@@ -32,9 +47,20 @@ ENGINES = {
     'tk-unreal' : 'unreal'
 }
 
+# Time to live, in seconds, of the cached lookups.
+DEPARTMENT_CACHE_TTL = 60 * 60
+REZ_PACKAGES_CACHE_TTL = 60 * 60
+REZ_ROOT_CACHE_TTL = 24 * 60 * 60
+
+# Maximum age, in seconds, of cached resolved rez contexts.
+REZ_CONTEXT_CACHE_MAX_AGE = 7 * 24 * 60 * 60
 
+# Software fields needed to resolve rez packages.
+REZ_SOFTWARE_FIELDS = ['projects', 'sg_rez', 'sg_win_rez']
 
-class AppLaunch(tank.Hook):
+
+
+class AppLaunch(tank.Hook if tank else object):
     """
     Hook to run an application.
     """
@@ -64,7 +90,8 @@ class AppLaunch(tank.Hook):
         sg = self.tank.shotgun
         project = context.project
         user = context.user
-        depart = sg.find_one("Department", [['users', 'in', user]], ['name'])
+        cache = LaunchCache()
+        depart = get_department(sg, user, cache)
 
         depart_confirm = False
 
@@ -100,22 +127,17 @@ class AppLaunch(tank.Hook):
         if depart_confirm:
             
             adapter = get_adapter(platform.system())
-            packages = get_rez_packages(sg, app_name, version, system, project)
+            packages = get_rez_packages(sg, app_name, version, system, project, cache)
 
             try:
                 import rez as _
             except ImportError:
-                rez_path = adapter.get_rez_module_root()
+                rez_path = get_rez_module_root(adapter, system, cache)
                 if not rez_path:
                     raise EnvironmentError('rez is not installed and could not be automatically found. Cannot continue.')
                 
-                if sys.version_info.major == 3:
-                    rez_path = rez_path.decode('utf-8')
-                
                 sys.path.append(rez_path)
             
-            from rez import resolved_context
-
             if not packages or app_name == 'unreal':
                 if not packages:
                     self.logger.debug('No rez packages were found. The default boot, instead.')
@@ -123,7 +145,7 @@ class AppLaunch(tank.Hook):
                 return_code = os.system(command)
                 return {'command': command, 'return_code': return_code}
             
-            context = resolved_context.ResolvedContext(packages)
+            context = get_resolved_context(packages)
             return adapter.execute(context, app_args, app_name)
 
         else:
@@ -160,55 +182,405 @@ class AppLaunch(tank.Hook):
 
             return {"command": cmd, "return_code": exit_code}
 
+    def preload(self, **kwargs):
+        """
+        Warm the launch cache with the rez packages of all Software versions
+        available to the current project.
 
-def get_rez_packages(sg, app_name, version, system, project):
-    
-    if system == 'Linux':
-        filter_dict = [
-            ['code','is',app_name.title()+" "+version],
-            ['projects','in',project],
-            ['-NoLoadStartupDialog']
-        ]
-        packages = sg.find("Software",filter_dict,['sg_rez'])
-        if packages : 
-            packages =  packages[0]['sg_rez']
-        else:
-            filter_dict = [
-                ['code','is',app_name.title()+" "+version],
-                ['projects','is',None],
-                ['-NoLoadStartupDialog']
-            ]
-            packages = sg.find("Software",filter_dict,['sg_rez'])
-            if packages:
-                packages =  packages[0]['sg_rez']
+        This is meant to be called when the launcher starts up, so launches
+        don't have to query ShotGrid.
+        """
+        count = preload_rez_packages(self.tank.shotgun, self.parent.context.project, LaunchCache())
+        self.parent.log_debug("Cached rez packages for %d Software versions" % count)
 
-    else:
-        filter_dict = [
-            ['code','is',app_name.title()+" "+version],
-            ['projects','in',project],
-            ['-NoLoadStartupDialog']
-        ]
-        packages = sg.find("Software",filter_dict,['sg_win_rez'])
-        if packages : 
-            packages =  packages[0]['sg_win_rez']
-        else:
-            filter_dict = [
-                ['code','is',app_name.title()+" "+version],
-                ['projects','is',None],
-                ['-NoLoadStartupDialog']
-            ]
-            packages = sg.find("Software",filter_dict,['sg_win_rez'])
-            if packages:
-                packages =  packages[0]['sg_win_rez']
+
+def get_department(sg, user, cache=None):
+    """
+    Return the Department the given user belongs to.
+
+    :param sg: A Shotgun API connection.
+    :param dict user: A HumanUser entity dictionary.
+    :param cache: Optional :class:`LaunchCache` instance.
+    :returns: A Department entity dictionary with its name, or None.
+    """
+    key = "department:%s:%s" % (sg.base_url, user['id'] if user else None)
+    if cache:
+        found, depart = cache.get(key, DEPARTMENT_CACHE_TTL)
+        if found:
+            return depart
+
+    depart = sg.find_one("Department", [['users', 'in', user]], ['name'])
+
+    if cache:
+        cache.set(key, depart)
+    return depart
+
+
+def get_rez_module_root(adapter, system, cache=None):
+    """
+    Return the rez module root discovered with the given adapter.
+
+    :param adapter: A :class:`BaseAdapter` class.
+    :param str system: The current platform system name.
+    :param cache: Optional :class:`LaunchCache` instance.
+    :returns: The rez module root path or an empty string.
+    """
+    key = "rez_root:%s" % system
+    if cache:
+        found, rez_path = cache.get(key, REZ_ROOT_CACHE_TTL)
+        if found:
+            return rez_path
+
+    rez_path = adapter.get_rez_module_root()
+    if sys.version_info.major == 3 and isinstance(rez_path, bytes):
+        rez_path = rez_path.decode('utf-8')
+
+    # Only cache successful discoveries
+    if cache and rez_path:
+        cache.set(key, rez_path)
+    return rez_path
+
+
+def get_rez_packages(sg, app_name, version, system, project, cache=None):
+    """
+    Return the rez packages to use for the given application version.
+
+    Software entities linked to the project take precedence over global ones,
+    not linked to any project. Both candidates are retrieved with a single
+    query.
+
+    :param sg: A Shotgun API connection.
+    :param str app_name: The application name, e.g. "maya".
+    :param str version: The application version.
+    :param str system: The current platform system name.
+    :param dict project: A Project entity dictionary.
+    :param cache: Optional :class:`LaunchCache` instance.
+    :returns: A list of rez package requests or None.
+    """
+    code = app_name.title() + " " + version
+    key = _get_rez_packages_cache_key(sg, project, code, system)
+    if cache:
+        found, packages = cache.get(key, REZ_PACKAGES_CACHE_TTL)
+        if found:
+            return packages
+
+    candidates = sg.find(
+        "Software",
+        [['code', 'is', code], _get_project_software_filter(project)],
+        REZ_SOFTWARE_FIELDS,
+    )
+    packages = _pick_rez_packages(candidates, system)
+
+    if cache:
+        cache.set(key, packages)
+    return packages
+
+
+def preload_rez_packages(sg, project, cache):
+    """
+    Retrieve rez packages for all Software versions available to the given
+    project with a single query and store them in the cache.
+
+    :param sg: A Shotgun API connection.
+    :param dict project: A Project entity dictionary.
+    :param cache: A :class:`LaunchCache` instance.
+    :returns: The number of Software versions which were cached.
+    """
+    softwares = sg.find(
+        "Software",
+        [_get_project_software_filter(project)],
+        ['code'] + REZ_SOFTWARE_FIELDS,
+    )
+    candidates_by_code = {}
+    for software in softwares:
+        candidates_by_code.setdefault(software['code'], []).append(software)
+
+    entries = {}
+    for code, candidates in candidates_by_code.items():
+        for system in ('Linux', 'Windows'):
+            key = _get_rez_packages_cache_key(sg, project, code, system)
+            entries[key] = _pick_rez_packages(candidates, system)
+    cache.set_many(entries)
+    return len(candidates_by_code)
+
+
+def _get_project_software_filter(project):
+    """
+    Return a filter matching Software entities linked to the given project or
+    not linked to any project.
+    """
+    return {
+        'filter_operator': 'any',
+        'filters': [
+            ['projects', 'in', project],
+            ['projects', 'is', None],
+        ],
+    }
+
+
+def _get_rez_packages_cache_key(sg, project, code, system):
+    return "rez_packages:%s:%s:%s:%s" % (
+        sg.base_url, project['id'] if project else None, code, system
+    )
+
+
+def _pick_rez_packages(candidates, system):
+    """
+    Pick the rez packages from the given Software entities for the given system.
+
+    :param candidates: A list of Software entity dictionaries sharing the same code.
+    :param str system: The current platform system name.
+    :returns: A list of rez package requests or None.
+    """
+    if not candidates:
+        return None
+    field = 'sg_rez' if system == 'Linux' else 'sg_win_rez'
+    # Project specific Software entities take precedence over global ones
+    candidates = sorted(candidates, key=lambda x: not x.get('projects'))
+    packages = candidates[0].get(field)
 
     if packages:
         packages = [ x for x in packages.split(",")] 
     else:
         packages = None
-        
     return packages
 
 
+def get_resolved_context(packages, cache_folder=None):
+    """
+    Return a resolved rez context for the given package requests.
+
+    Resolved contexts are saved on disk, keyed by the package requests, the
+    current platform and the package repositories timestamp, so repeated
+    launches don't need to solve the same requests again. Cached contexts
+    which are stale are resolved again, and cached contexts for the same
+    requests with another repositories timestamp are dropped.
+
+    :param packages: A list of rez package requests.
+    :param str cache_folder: Optional folder where resolved contexts are cached,
+                             the default location is used if not set.
+    :returns: A :class:`rez.resolved_context.ResolvedContext` instance.
+    """
+    from rez import resolved_context
+    from rez.config import config as rez_config
+
+    cache_folder = cache_folder or get_rez_context_cache_folder()
+    request_key = hashlib.sha1(
+        json.dumps([packages, platform.system()]).encode('utf-8')
+    ).hexdigest()
+    repository_timestamp = _get_rez_repository_timestamp(rez_config.packages_path)
+    context_path = os.path.join(
+        cache_folder, '%s_%d.rxt' % (request_key, repository_timestamp)
+    )
+
+    if os.path.isfile(context_path):
+        try:
+            context = resolved_context.ResolvedContext.load(context_path)
+            if context.success and not context.is_stale():
+                return context
+        except Exception:
+            # Corrupted or incompatible file, resolve again
+            pass
+
+    context = resolved_context.ResolvedContext(packages)
+    try:
+        _prune_rez_context_cache(cache_folder, request_key)
+        if context.success:
+            fd, tmp_path = tempfile.mkstemp(suffix='.rxt', dir=cache_folder)
+            os.close(fd)
+            context.save(tmp_path)
+            _replace_file(tmp_path, context_path)
+    except (IOError, OSError):
+        # Caching is an optimization, don't prevent launches from working
+        pass
+    return context
+
+
+def get_rez_context_cache_folder():
+    """
+    Return the folder where resolved rez contexts are cached for the current user.
+
+    :returns: A full path.
+    """
+    return os.path.join(os.path.dirname(get_launch_cache_path()), 'rez_contexts')
+
+
+def _get_rez_repository_timestamp(packages_path):
+    """
+    Return the latest modification time of the given rez package repositories.
+
+    Releasing a new package version creates a folder in its package family
+    folder, so checking repositories and their package family folders is
+    enough to detect new releases.
+
+    :param packages_path: A list of rez package repository paths.
+    :returns: An integer timestamp.
+    """
+    timestamp = 0
+    for repository in packages_path:
+        if not os.path.isdir(repository):
+            continue
+        timestamp = max(timestamp, os.path.getmtime(repository))
+        for name in os.listdir(repository):
+            family_path = os.path.join(repository, name)
+            if os.path.isdir(family_path):
+                timestamp = max(timestamp, os.path.getmtime(family_path))
+    return int(timestamp)
+
+
+def _prune_rez_context_cache(cache_folder, request_key):
+    """
+    Remove cached contexts for the given request key and cached contexts older
+    than the maximum age from the cache folder.
+
+    :param str cache_folder: Folder where resolved contexts are cached.
+    :param str request_key: A request key, as used in cached context file names.
+    """
+    if not os.path.isdir(cache_folder):
+        os.makedirs(cache_folder)
+        return
+    now = time.time()
+    for name in os.listdir(cache_folder):
+        path = os.path.join(cache_folder, name)
+        if name.startswith('%s_' % request_key) or now - os.path.getmtime(path) > REZ_CONTEXT_CACHE_MAX_AGE:
+            os.remove(path)
+
+
+def get_launch_cache_path():
+    """
+    Return the path to the launch cache file for the current user.
+
+    :returns: A full path.
+    """
+    if tank:
+        from tank.util import LocalFileStorageManager
+
+        cache_root = LocalFileStorageManager.get_global_root(LocalFileStorageManager.CACHE)
+    else:
+        # Same location tk-core's LocalFileStorageManager uses for its cache.
+        system = platform.system()
+        if system == 'Windows':
+            cache_root = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'Shotgun')
+        elif system == 'Darwin':
+            cache_root = os.path.expanduser('~/Library/Caches/Shotgun')
+        else:
+            cache_root = os.path.expanduser('~/.shotgun')
+
+    return os.path.join(cache_root, "launch_cache", "launch_cache.json")
+
+
+def invalidate_launch_cache(path=None):
+    """
+    Remove all entries from the launch cache.
+
+    :param str path: Optional path to the cache file, the default location is
+                     used if not set.
+    """
+    LaunchCache(path).invalidate()
+    rez_context_folder = os.path.join(
+        os.path.dirname(path or get_launch_cache_path()), 'rez_contexts'
+    )
+    if os.path.isdir(rez_context_folder):
+        for name in os.listdir(rez_context_folder):
+            os.remove(os.path.join(rez_context_folder, name))
+
+
+class LaunchCache(object):
+    """
+    A small JSON key/value cache stored on disk, where each entry expires after
+    a given time.
+
+    The file is re-read for each lookup and replaced atomically when updated, so
+    concurrent launches can share it safely. A corrupted or unreadable file is
+    treated as an empty cache.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param str path: Optional path to the cache file, the default location
+                         is used if not set.
+        """
+        self._path = path or get_launch_cache_path()
+
+    def get(self, key, ttl):
+        """
+        Retrieve a value from the cache.
+
+        :param str key: The key of the entry to retrieve.
+        :param int ttl: Maximum age in seconds of the entry.
+        :returns: A (found, value) tuple.
+        """
+        entry = self._read().get(key)
+        if entry and time.time() - entry[0] < ttl:
+            return True, entry[1]
+        return False, None
+
+    def set(self, key, value):
+        """
+        Store a value in the cache.
+
+        :param str key: The key of the entry to store.
+        :param value: A JSON serializable value.
+        """
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        """
+        Store multiple values in the cache.
+
+        :param dict values: A dictionary of keys and JSON serializable values.
+        """
+        entries = self._read()
+        now = time.time()
+        for key, value in values.items():
+            entries[key] = [now, value]
+        try:
+            self._write(entries)
+        except (IOError, OSError):
+            # Caching is an optimization, don't prevent launches from working
+            pass
+
+    def invalidate(self):
+        """
+        Remove all entries from the cache.
+        """
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    def _read(self):
+        try:
+            with open(self._path, 'r') as f:
+                entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def _write(self, entries):
+        folder = os.path.dirname(self._path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        fd, tmp_path = tempfile.mkstemp(suffix='.json', dir=folder)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        _replace_file(tmp_path, self._path)
+
+
+def _replace_file(src, dst):
+    """
+    Rename the given source file to the given destination, replacing it if
+    it exists.
+    """
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2 does not have os.replace
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
 
 def get_adapter(system=''):
     if not system:
@@ -298,4 +670,24 @@ class WindowsAdapter(BaseAdapter):
     @staticmethod
     def get_rez_root_command():
 
-        return 'rez-env rez -- echo %REZ_REZ_ROOT%'
\ No newline at end of file
+        return 'rez-env rez -- echo %REZ_REZ_ROOT%'
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the app launch cache.')
+    parser.add_argument(
+        '--invalidate-cache',
+        action='store_true',
+        help='Remove all cached ShotGrid lookups and rez discoveries.',
+    )
+    parser.add_argument(
+        '--cache-path',
+        help='Path to the cache file, the default location is used if not set.',
+    )
+    options = parser.parse_args()
+    if options.invalidate_cache:
+        invalidate_launch_cache(options.cache_path)
+    else:
+        parser.print_help()
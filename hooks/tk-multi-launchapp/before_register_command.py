@@ -8,10 +8,15 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import threading
+
 import sgtk
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# Whether the app launch cache was already warmed in this process.
+_launch_cache_preloaded = False
+
 
 class BeforeRegisterCommand(HookBaseClass):
     """
@@ -43,4 +48,34 @@ class BeforeRegisterCommand(HookBaseClass):
         if software_version.product == "NukeStudio":
             engine_instance_name = "tk-nukestudio"
 
+        self._preload_launch_cache()
+
         return engine_instance_name
+
+    def _preload_launch_cache(self):
+        """
+        Warm the app launch cache once, when the first launcher command is
+        registered.
+
+        The cache is warmed in a background thread so registering commands
+        doesn't wait on ShotGrid.
+        """
+        global _launch_cache_preloaded
+        if _launch_cache_preloaded:
+            return
+        _launch_cache_preloaded = True
+        thread = threading.Thread(target=self._do_preload_launch_cache)
+        thread.daemon = True
+        thread.start()
+
+    def _do_preload_launch_cache(self):
+        """
+        Run the app launch hook preload method, errors are only logged.
+        """
+        try:
+            self.parent.execute_hook_method("hook_app_launch", "preload")
+        except Exception as e:
+            # Launches will query ShotGrid if the cache couldn't be warmed
+            self.logger.debug(
+                "Unable to preload the app launch cache: %s" % e, exc_info=True
+            )
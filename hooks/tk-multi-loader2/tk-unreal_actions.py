@@ -74,8 +74,9 @@ class UnrealActions(HookBaseClass):
         """
         Executes the specified action on a list of items.
 
-        The default implementation dispatches each item from ``actions`` to
-        the ``execute_action`` method.
+        "import_content" actions are imported into the Content Browser in a
+        single batch, all other actions are dispatched to the ``execute_action``
+        method.
 
         The ``actions`` is a list of dictionaries holding all the actions to execute.
         Each entry will have the following values:
@@ -95,11 +96,18 @@ class UnrealActions(HookBaseClass):
 
         :param list actions: Action dictionaries.
         """
+        import_publishes = []
         for single_action in actions:
             name = single_action["name"]
             sg_publish_data = single_action["sg_publish_data"]
             params = single_action["params"]
-            self.execute_action(name, params, sg_publish_data)
+            if name == "import_content":
+                import_publishes.append(sg_publish_data)
+            else:
+                self.execute_action(name, params, sg_publish_data)
+
+        if import_publishes:
+            self._import_multiple_to_content_browser(import_publishes)
 
     def execute_action(self, name, params, sg_publish_data):
         """
@@ -152,14 +160,60 @@ class UnrealActions(HookBaseClass):
             asset_paths.append(asset_path)
             unreal.EditorAssetLibrary.sync_browser_to_objects(asset_paths)
 
-    def _set_asset_metadata(self, asset_path, sg_publish_data):
+    def _import_multiple_to_content_browser(self, sg_publish_datas):
+        """
+        Import multiple assets into the Unreal Content Browser in a single batch.
+
+        All files are imported with a single import call, metadata is then set
+        on all imported assets which are saved together, and the Content Browser
+        is focused once on all of them.
+
+        :param sg_publish_datas: A list of Shotgun data dictionaries with all the standard publish fields.
+        """
+        app = self.parent
+        app.log_debug("Importing %d publishes into the Content Browser" % len(sg_publish_datas))
+
+        imports = []
+        for sg_publish_data in sg_publish_datas:
+            path = self.get_publish_path(sg_publish_data)
+            unreal.log("File to import: {}".format(path))
+
+            if not os.path.exists(path):
+                raise Exception("File not found on disk - '%s'" % path)
+
+            destination_path, destination_name = self._get_destination_path_and_name(sg_publish_data)
+            imports.append((path, destination_path, destination_name))
+
+        asset_paths = _unreal_import_fbx_assets(imports)
+
+        assets = []
+        for asset_path, sg_publish_data in zip(asset_paths, sg_publish_datas):
+            if asset_path:
+                asset = self._set_asset_metadata(asset_path, sg_publish_data, save=False)
+                if asset:
+                    assets.append(asset)
+
+        if assets:
+            unreal.EditorAssetLibrary.save_loaded_assets(assets)
+
+        # Focus the Unreal Content Browser on the imported assets
+        imported_paths = [asset_path for asset_path in asset_paths if asset_path]
+        if imported_paths:
+            unreal.EditorAssetLibrary.sync_browser_to_objects(imported_paths)
+
+    def _set_asset_metadata(self, asset_path, sg_publish_data, save=True):
         """
         Set needed metadata on the given asset
+
+        :param asset_path: The Unreal path of the asset.
+        :param sg_publish_data: Shotgun data dictionary with all the standard publish fields.
+        :param save: Whether the asset should be saved after setting the metadata.
+        :returns: The loaded asset, or None if it couldn't be loaded.
         """
         asset = unreal.EditorAssetLibrary.load_asset(asset_path)
 
         if not asset:
-            return
+            return None
 
         engine = sgtk.platform.current_engine()
 
@@ -203,7 +257,10 @@ class UnrealActions(HookBaseClass):
         tag = engine.get_metadata_tag("url")
         unreal.EditorAssetLibrary.set_metadata_tag(asset, tag, url)
 
-        unreal.EditorAssetLibrary.save_loaded_asset(asset)
+        if save:
+            unreal.EditorAssetLibrary.save_loaded_asset(asset)
+
+        return asset
 
     ##############################################################################################################
     # helper methods which can be subclassed in custom hooks to fine tune the behaviour of things
@@ -308,6 +365,33 @@ def _unreal_import_fbx_asset(input_path, destination_path, destination_name):
     return first_imported_object
 
 
+def _unreal_import_fbx_assets(imports):
+    """
+    Import multiple FBX files into Unreal Content Browser with a single import call
+
+    :param imports: A list of (input path, destination path, destination name) tuples
+    :return a list with, for each import, the first imported object path or None
+    """
+    tasks = []
+    for input_path, destination_path, destination_name in imports:
+        tasks.append(_generate_fbx_import_task(input_path, destination_path, destination_name))
+
+    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+
+    first_imported_objects = []
+
+    for task in tasks:
+        unreal.log("Import Task for: {}".format(task.filename))
+        first_imported_object = None
+        for object_path in task.imported_object_paths:
+            unreal.log("Imported object: {}".format(object_path))
+            if not first_imported_object:
+                first_imported_object = object_path
+        first_imported_objects.append(first_imported_object)
+
+    return first_imported_objects
+
+
 def _generate_fbx_import_task(
     filename,
     destination_path,
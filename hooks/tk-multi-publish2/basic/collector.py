@@ -3,17 +3,22 @@
 # file included in this repository.
 
 from collections import namedtuple, defaultdict
-import copy
+import json
 import os
+import tempfile
 
 import unreal
 
 import sgtk
 
-# A named tuple to store LevelSequence edits: the sequence/track/section
-# the edit is in.
+# A named tuple to store LevelSequence edits: the object path of the sequence
+# the edit is in and the names of the track/section holding the edit.
 SequenceEdit = namedtuple("SequenceEdit", ["sequence", "track", "section"])
 
+# Version of the on disk sequence edits index format. Indexes saved with a
+# different version are discarded and rebuilt.
+_SEQUENCE_EDITS_INDEX_VERSION = 1
+
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
@@ -64,6 +69,14 @@ class UnrealSessionCollector(HookBaseClass):
                                "to publish plugins via the collected item's "
                                "properties. ",
             },
+            "Lazy Collection": {
+                "type": "bool",
+                "default": False,
+                "description": "If True, Level Sequences are collected from "
+                               "Asset Registry data and the last saved edits "
+                               "index only, loading them and checking their "
+                               "edits is deferred to validation.",
+            },
         }
 
         collector_settings.update(work_template_setting)
@@ -82,7 +95,8 @@ class UnrealSessionCollector(HookBaseClass):
         parent_item = self.collect_current_session(settings, parent_item)
 
         # Collect assets selected in Unreal
-        self.collect_selected_assets(parent_item)
+        lazy_setting = settings.get("Lazy Collection")
+        self.collect_selected_assets(parent_item, lazy=bool(lazy_setting and lazy_setting.value))
 
     def collect_current_session(self, settings, parent_item):
         """
@@ -161,14 +175,18 @@ class UnrealSessionCollector(HookBaseClass):
         asset_item.properties["asset_type"] = asset_type
         return asset_item
 
-    def collect_selected_assets(self, parent_item):
+    def collect_selected_assets(self, parent_item, lazy=False):
         """
         Creates items for assets selected in Unreal.
 
         :param parent_item: Parent Item instance
+        :param bool lazy: If True, Level Sequences are collected without being
+                          loaded, see :meth:`collect_level_sequence_lazily`.
         """
         unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
         sequence_edits = None
+        # Edit paths computed for Level Sequences, shared by all selected assets
+        paths_cache = {}
         
         # 선택된 에셋 로깅 추가
         self.logger.debug("Selected assets: %s", unreal_sg.selected_assets)
@@ -177,10 +195,12 @@ class UnrealSessionCollector(HookBaseClass):
         # Iterate through the selected assets and get their info and add them as items to be published
         for asset in unreal_sg.selected_assets:
             self.logger.debug("Asset: %s", asset)
-            if asset.asset_class_path.asset_name == "LevelSequence":
+            if asset.asset_class_path.asset_name == "LevelSequence" and lazy:
+                self.collect_level_sequence_lazily(parent_item, asset, paths_cache)
+            elif asset.asset_class_path.asset_name == "LevelSequence":
                 if sequence_edits is None:
                     sequence_edits = self.retrieve_sequence_edits()
-                self.collect_level_sequence(parent_item, asset, sequence_edits)
+                self.collect_level_sequence(parent_item, asset, sequence_edits, paths_cache)
             else:
                 self.create_asset_item(
                     parent_item,
@@ -191,12 +211,12 @@ class UnrealSessionCollector(HookBaseClass):
                     "%s" % asset.asset_name,
                 )
 
-    def get_all_paths_from_sequence(self, level_sequence, sequence_edits, visited=None):
+    def get_all_paths_from_sequence(self, level_sequence, sequence_edits, paths_cache=None):
         """
         Retrieve all edit paths from the given Level Sequence to top Level Sequences.
 
-        Recursively explore the sequence edits, stop the recursion when a Level
-        Sequence which is not a sub-sequence of another is reached.
+        Explore the sequence edits, stopping when a Level Sequence which is not
+        a sub-sequence of another is reached.
 
         Lists of Level Sequences are returned, where each list contains all the
         the Level Sequences to traverse to reach the top Level Sequence from the
@@ -210,46 +230,87 @@ class UnrealSessionCollector(HookBaseClass):
         paths would be detected and returned by this method, e.g.
         `[[Shot_001_010, Seq_001, Master sequence], [Shot_001_010, Seq_001, Master sequence 2]]`
 
-        Maintain a list of visited Level Sequences to detect cycles.
-
-        :param level_sequence: A :class:`unreal.LevelSequence` instance.
-        :param sequence_edits: A dictionary with  :class:`unreal.LevelSequence as keys and
-                                              lists of :class:`SequenceEdit` as values.
-        :param visited: A list of :class:`unreal.LevelSequence` instances, populated
-                        as nodes are visited.
-        :returns: A list of lists of Level Sequences.
-        """
-        if not visited:
-            visited = []
-        visited.append(level_sequence)
-        self.logger.info("Treating %s" % level_sequence.get_name())
-        if not sequence_edits[level_sequence]:
-            # No parent, return a list with a single entry with the current
-            # sequence
-            return [[level_sequence]]
-
-        all_paths = []
-        # Loop over parents get all paths starting from them
-        for edit in sequence_edits[level_sequence]:
-            if edit.sequence in visited:
-                self.logger.warning(
-                    "Detected a cycle in edits path %s to %s" % (
-                        "->".join(visited), edit.sequence
-                    )
-                )
-            else:
-                # Get paths from the parent and prepend the current sequence
-                # to them.
-                for edit_path in self.get_all_paths_from_sequence(
-                    edit.sequence,
-                    sequence_edits,
-                    copy.copy(visited),  # Each visit needs its own stack
-                ):
-                    self.logger.info("Got %s from %s" % (edit_path, edit.sequence.get_name()))
-                    all_paths.append([level_sequence] + edit_path)
-        return all_paths
-
-    def collect_level_sequence(self, parent_item, asset, sequence_edits):
+        The traversal is iterative and paths computed for each Level Sequence are
+        stored in the given cache, so ancestors shared by multiple Level Sequences
+        are only treated once when the same cache is used for all of them. Edits
+        leading back to a Level Sequence being treated are reported as cycles and
+        ignored. Paths of Level Sequences from which a cycle can be reached depend
+        on where the traversal started, they are not cached.
+
+        :param str level_sequence: A Level Sequence object path.
+        :param sequence_edits: A dictionary with Level Sequence object paths as keys and
+                               lists of :class:`SequenceEdit` as values.
+        :param paths_cache: Optional dictionary where keys are Level Sequence object
+                            paths and values lists of paths, populated as Level
+                            Sequences are treated.
+        :returns: A list of lists of Level Sequence object paths.
+        """
+        if paths_cache is None:
+            paths_cache = {}
+
+        if level_sequence not in paths_cache:
+            # Stack of Level Sequences being treated, with an iterator on their
+            # remaining edits and whether a cycle can be reached from them.
+            stack = [[level_sequence, iter(sequence_edits.get(level_sequence) or []), False]]
+            on_stack = set([level_sequence])
+            # Paths cut short by cycles, only valid for this traversal.
+            partial_paths = {}
+            while stack:
+                frame = stack[-1]
+                current, edits = frame[0], frame[1]
+                for edit in edits:
+                    if edit.sequence in on_stack:
+                        self.logger.warning(
+                            "Detected a cycle in edits path %s to %s" % (
+                                "->".join([x[0] for x in stack]), edit.sequence
+                            )
+                        )
+                        frame[2] = True
+                    elif edit.sequence not in paths_cache:
+                        # Treat the parent first, then come back to the
+                        # remaining edits.
+                        stack.append([edit.sequence, iter(sequence_edits.get(edit.sequence) or []), False])
+                        on_stack.add(edit.sequence)
+                        break
+                else:
+                    # All parents were treated, get paths from them and prepend
+                    # the current sequence to them.
+                    stack.pop()
+                    self.logger.debug("Treating %s" % current)
+                    current_edits = sequence_edits.get(current)
+                    if not current_edits:
+                        # No parent, a single path with the current sequence
+                        on_stack.remove(current)
+                        paths_cache[current] = [[current]]
+                        continue
+                    all_paths = []
+                    for edit in current_edits:
+                        # Parents leading to a cycle were not treated.
+                        if edit.sequence in on_stack:
+                            continue
+                        if edit.sequence in paths_cache:
+                            parent_paths = paths_cache[edit.sequence]
+                        else:
+                            parent_paths = partial_paths.get(edit.sequence, [])
+                        for edit_path in parent_paths:
+                            all_paths.append([current] + edit_path)
+                    on_stack.remove(current)
+                    if frame[2]:
+                        # Cut short by a cycle, so are the Level Sequences
+                        # which led to this one.
+                        partial_paths[current] = all_paths
+                        if stack:
+                            stack[-1][2] = True
+                    else:
+                        paths_cache[current] = all_paths
+
+            if level_sequence in partial_paths:
+                return [list(edit_path) for edit_path in partial_paths[level_sequence]]
+
+        # Return copies, callers are allowed to modify them.
+        return [list(edit_path) for edit_path in paths_cache[level_sequence]]
+
+    def collect_level_sequence(self, parent_item, asset, sequence_edits, paths_cache=None):
         """
         Collect the items for the given Level Sequence asset.
 
@@ -258,14 +319,19 @@ class UnrealSessionCollector(HookBaseClass):
 
         :param parent_item: Parent Item instance.
         :param asset: An Unreal LevelSequence asset.
-        :param sequence_edits: A dictionary with  :class:`unreal.LevelSequence as keys and
-                                              lists of :class:`SequenceEdit` as values.
+        :param sequence_edits: A dictionary with Level Sequence object paths as keys and
+                               lists of :class:`SequenceEdit` as values.
+        :param paths_cache: Optional dictionary of edit paths already computed
+                            for Level Sequences, shared between calls.
         """
         unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
-        level_sequence = unreal.load_asset(unreal_sg.object_path(asset))
-        for edits_path in self.get_all_paths_from_sequence(level_sequence, sequence_edits):
+        level_sequence_path = "%s" % unreal_sg.object_path(asset)
+        for edits_path in self.get_all_paths_from_sequence(level_sequence_path, sequence_edits, paths_cache):
             # Reverse the path to have it from top master sequence to the shot.
             edits_path.reverse()
+            # Only the Level Sequences from the edits path are needed by the
+            # publish plugins.
+            edits_path = [unreal.load_asset(x) for x in edits_path]
             self.logger.info("Collected %s" % [x.get_name() for x in edits_path])
             if len(edits_path) > 1:
                 display_name = "%s (%s)" % (edits_path[0].get_name(), edits_path[-1].get_name())
@@ -282,34 +348,378 @@ class UnrealSessionCollector(HookBaseClass):
             # publishing.
             item.properties["edits_path"] = edits_path
 
+    def collect_level_sequence_lazily(self, parent_item, asset, paths_cache=None):
+        """
+        Collect placeholder items for the given Level Sequence asset, without
+        loading any asset.
+
+        Edit paths are computed from the edits index as it was last saved. Items
+        store them as object paths, they are checked against an up to date index
+        and loaded with :meth:`resolve_lazy_edits_path` when the item is validated.
+
+        If the Level Sequence is not in the index yet, a single item is collected
+        and its edits path is entirely resolved at validation.
+
+        :param parent_item: Parent Item instance.
+        :param asset: An Unreal LevelSequence asset.
+        :param paths_cache: Optional dictionary of edit paths already computed
+                            for Level Sequences, shared between calls.
+        """
+        unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
+        level_sequence_path = "%s" % unreal_sg.object_path(asset)
+        index = self.get_sequence_edits_index()
+        if index.has_object_path(level_sequence_path):
+            all_paths = self.get_all_paths_from_sequence(
+                level_sequence_path, index.get_sequence_edits(), paths_cache
+            )
+            resolved = True
+        else:
+            all_paths = [[level_sequence_path]]
+            resolved = False
+        for edits_path in all_paths:
+            # Reverse the path to have it from top master sequence to the shot.
+            edits_path.reverse()
+            names = [_get_object_name(x) for x in edits_path]
+            if len(edits_path) > 1:
+                display_name = "%s (%s)" % (names[0], names[-1])
+            else:
+                display_name = names[0]
+            item = self.create_asset_item(
+                parent_item,
+                edits_path[0],
+                "LevelSequence",
+                names[0],
+                display_name,
+            )
+            # The edits path is resolved when the item is validated.
+            item.properties["lazy_edits_path"] = edits_path
+            item.properties["lazy_edits_path_resolved"] = resolved
+
+    def resolve_lazy_edits_path(self, item, sequence_edits=None, paths_cache=None):
+        """
+        Resolve the edits path of an item collected with :meth:`collect_level_sequence_lazily`.
+
+        The item edits path is checked against an up to date edits index and
+        the Level Sequences on the path are loaded and stored in the item
+        "edits_path" property. The item asset properties are updated for the
+        top Level Sequence of the path.
+
+        To resolve multiple items, bring the index up to date once with
+        :meth:`retrieve_sequence_edits` and pass its result and a shared paths
+        cache for all of them.
+
+        :param item: An item collected with :meth:`collect_level_sequence_lazily`.
+        :param sequence_edits: Optional dictionary returned by :meth:`retrieve_sequence_edits`,
+                               it is called if not set.
+        :param paths_cache: Optional dictionary of edit paths already computed
+                            for Level Sequences, shared between calls.
+        :raises ValueError: If the edits path does not exist anymore or can't
+                            be determined.
+        """
+        if sequence_edits is None:
+            sequence_edits = self.retrieve_sequence_edits()
+        lazy_edits_path = item.properties["lazy_edits_path"]
+        all_paths = self.get_all_paths_from_sequence(
+            lazy_edits_path[-1], sequence_edits, paths_cache
+        )
+        for edits_path in all_paths:
+            edits_path.reverse()
+        if not item.properties["lazy_edits_path_resolved"]:
+            if len(all_paths) > 1:
+                raise ValueError(
+                    "%s is used in multiple edits, reload the publisher to "
+                    "collect all of them." % lazy_edits_path[-1]
+                )
+            if not all_paths:
+                raise ValueError(
+                    "Edits path for %s can't be determined, reload the publisher." % (
+                        lazy_edits_path[-1]
+                    )
+                )
+            edits_path = all_paths[0]
+        elif lazy_edits_path in all_paths:
+            edits_path = lazy_edits_path
+        else:
+            raise ValueError(
+                "Edit %s does not exist anymore, reload the publisher." % (
+                    " > ".join(lazy_edits_path)
+                )
+            )
+        edits_path = [unreal.load_asset(x) for x in edits_path]
+        item.properties["asset_path"] = edits_path[0].get_path_name()
+        item.properties["asset_name"] = edits_path[0].get_name()
+        item.properties["edits_path"] = edits_path
+
     def retrieve_sequence_edits(self):
         """
-        Build a dictionary for all Level Sequences where keys are Level Sequences
-        and values the list of edits they are in.
+        Build a dictionary for all Level Sequences where keys are Level Sequence
+        object paths and values the list of edits they are in.
+
+        Edits are read from a persistent index saved in the Unreal project
+        "Saved" folder. The index is reconciled with the Asset Registry: only
+        Level Sequences which were added or saved since the last collection are
+        loaded and scanned, removed Level Sequences are dropped from the index.
 
-        :returns: A dictionary of :class:`unreal.LevelSequence` where values are
+        :returns: A dictionary of Level Sequence object paths where values are
                   lists of :class:`SequenceEdit`.
         """
-        sequence_edits = defaultdict(list)
-        unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
         level_sequence_class = unreal.TopLevelAssetPath("/Script/LevelSequence", "LevelSequence")
         asset_helper = unreal.AssetRegistryHelpers.get_asset_registry()
         # Retrieve all Level Sequence assets
         all_level_sequences = asset_helper.get_assets_by_class(level_sequence_class)
-        for lvseq_asset in all_level_sequences:
-            lvseq = unreal.load_asset(unreal_sg.object_path(lvseq_asset), unreal.LevelSequence)
-            # Check shots
-            for track in lvseq.find_master_tracks_by_type(unreal.MovieSceneCinematicShotTrack):
-                for section in track.get_sections():
-                    # Not sure if you can have anything else than a MovieSceneSubSection
-                    # in a MovieSceneCinematicShotTrack, but let's be cautious here.
-                    try:
-                        # Get the Sequence attached to the section and check if
-                        # it is the one we're looking for.
-                        section_seq = section.get_sequence()
-                        sequence_edits[section_seq].append(
-                            SequenceEdit(lvseq, track, section)
-                        )
-                    except AttributeError:
-                        pass
-        return sequence_edits
+        index = self.get_sequence_edits_index()
+        refreshed = index.update(all_level_sequences, self.scan_level_sequence_edits)
+        self.logger.debug(
+            "Refreshed %d out of %d Level Sequences in the edits index." % (
+                refreshed, len(all_level_sequences)
+            )
+        )
+        if refreshed:
+            index.save()
+        return index.get_sequence_edits()
+
+    def get_sequence_edits_index(self):
+        """
+        Return the :class:`SequenceEditsIndex` for the current Unreal project.
+
+        The index is kept in memory for the Unreal session and loaded from disk
+        the first time it is needed.
+
+        :returns: A :class:`SequenceEditsIndex` instance.
+        """
+        index_path = os.path.abspath(
+            os.path.join(
+                unreal.Paths.project_saved_dir(),
+                "ShotGrid",
+                "sequence_edits_index.json",
+            )
+        )
+        index = _SEQUENCE_EDITS_INDEXES.get(index_path)
+        if index is None:
+            index = SequenceEditsIndex(index_path, self.logger)
+            index.load()
+            _SEQUENCE_EDITS_INDEXES[index_path] = index
+        return index
+
+    def scan_level_sequence_edits(self, lvseq_asset):
+        """
+        Load the given Level Sequence and return the edits it contains.
+
+        :param lvseq_asset: A :class:`unreal.AssetData` for a Level Sequence.
+        :returns: A list of (sub-sequence object path, track name, section name)
+                  tuples.
+        """
+        unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
+        lvseq = unreal.load_asset(unreal_sg.object_path(lvseq_asset), unreal.LevelSequence)
+        edits = []
+        if not lvseq:
+            return edits
+        # Check shots
+        for track in lvseq.find_master_tracks_by_type(unreal.MovieSceneCinematicShotTrack):
+            for section in track.get_sections():
+                # Not sure if you can have anything else than a MovieSceneSubSection
+                # in a MovieSceneCinematicShotTrack, but let's be cautious here.
+                try:
+                    # Get the Sequence attached to the section
+                    section_seq = section.get_sequence()
+                except AttributeError:
+                    continue
+                if not section_seq:
+                    continue
+                edits.append((
+                    section_seq.get_path_name(),
+                    track.get_name(),
+                    section.get_name(),
+                ))
+        return edits
+
+
+# Sequence edits indexes, keyed by their path on disk, kept around for the
+# Unreal session.
+_SEQUENCE_EDITS_INDEXES = {}
+
+
+class SequenceEditsIndex(object):
+    """
+    A persistent index of the shots contained by all Level Sequences of an
+    Unreal project.
+
+    Entries are keyed by package name and store a stamp computed from the
+    package file saved on disk. An entry is only rebuilt, which requires loading
+    the Level Sequence, when its stamp changes. Level Sequences with unsaved
+    changes are always scanned, but never persisted.
+    """
+
+    def __init__(self, path, logger):
+        """
+        :param str path: Full path to the JSON file the index is saved to.
+        :param logger: A standard logger.
+        """
+        self._path = path
+        self._logger = logger
+        self._packages = {}
+        # Edits and object paths built from the packages, reset when they change
+        self._sequence_edits = None
+        self._object_paths = None
+
+    def load(self):
+        """
+        Load the index from disk, if it exists and was saved with a compatible
+        format.
+        """
+        self._set_packages({})
+        if not os.path.isfile(self._path):
+            return
+        try:
+            with open(self._path, "r") as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            self._logger.warning("Unable to read %s, ignoring it: %s" % (self._path, e))
+            return
+        if data.get("version") != _SEQUENCE_EDITS_INDEX_VERSION:
+            self._logger.debug("Discarding outdated sequence edits index %s" % self._path)
+            return
+        self._set_packages(data.get("packages") or {})
+
+    def save(self):
+        """
+        Save the index to disk.
+
+        The index is written to a temporary file which is then renamed, so a
+        concurrent reader never sees a partially written index.
+        """
+        folder = os.path.dirname(self._path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        persistent = dict(
+            (name, entry) for name, entry in self._packages.items() if entry["stamp"]
+        )
+        fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=folder)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"version": _SEQUENCE_EDITS_INDEX_VERSION, "packages": persistent},
+                    f,
+                )
+            os.replace(tmp_path, self._path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def update(self, level_sequence_assets, scan_callback):
+        """
+        Reconcile the index with the given Level Sequence assets.
+
+        :param level_sequence_assets: A list of :class:`unreal.AssetData` for
+                                      all the Level Sequences in the project.
+        :param scan_callback: A callable taking an :class:`unreal.AssetData`
+                              and returning a list of (sub-sequence object path,
+                              track name, section name) tuples.
+        :returns: The number of Level Sequences which were scanned.
+        """
+        dirty_packages = set(
+            package.get_name()
+            for package in unreal.EditorLoadingAndSavingUtils.get_dirty_content_packages()
+        )
+        unreal_sg = sgtk.platform.current_engine().unreal_sg_engine
+        packages = {}
+        refreshed = 0
+        for lvseq_asset in level_sequence_assets:
+            package_name = "%s" % lvseq_asset.package_name
+            if package_name in dirty_packages:
+                stamp = None
+            else:
+                stamp = _get_package_file_stamp(package_name)
+            entry = self._packages.get(package_name)
+            if not stamp or not entry or entry["stamp"] != stamp:
+                entry = {
+                    "stamp": stamp,
+                    "object_path": "%s" % unreal_sg.object_path(lvseq_asset),
+                    "edits": [list(edit) for edit in scan_callback(lvseq_asset)],
+                }
+                refreshed += 1
+            packages[package_name] = entry
+        # Packages which were not listed anymore are dropped.
+        if set(packages) != set(self._packages):
+            refreshed += 1
+        if refreshed:
+            self._set_packages(packages)
+        return refreshed
+
+    def has_object_path(self, object_path):
+        """
+        Return True if the given Level Sequence is in the index.
+
+        :param str object_path: A Level Sequence object path.
+        """
+        if self._object_paths is None:
+            self._object_paths = set(
+                entry["object_path"] for entry in self._packages.values()
+            )
+        return object_path in self._object_paths
+
+    def get_sequence_edits(self):
+        """
+        Return the edits from the index.
+
+        The returned dictionary is shared until the index changes and must not
+        be modified.
+
+        :returns: A dictionary of Level Sequence object paths where values are
+                  lists of :class:`SequenceEdit`.
+        """
+        if self._sequence_edits is None:
+            sequence_edits = defaultdict(list)
+            for entry in self._packages.values():
+                for sub_sequence_path, track_name, section_name in entry["edits"]:
+                    sequence_edits[sub_sequence_path].append(
+                        SequenceEdit(entry["object_path"], track_name, section_name)
+                    )
+            self._sequence_edits = sequence_edits
+        return self._sequence_edits
+
+    def _set_packages(self, packages):
+        """
+        Set the index packages and reset data built from them.
+
+        :param dict packages: Package names as keys and index entries as values.
+        """
+        self._packages = packages
+        self._sequence_edits = None
+        self._object_paths = None
+
+
+def _get_object_name(object_path):
+    """
+    Return the object name from the given object path.
+
+    :param str object_path: An Unreal object path, e.g. "/Game/Cine/Seq_010.Seq_010".
+    :returns: The object name, e.g. "Seq_010".
+    """
+    return object_path.rsplit("/", 1)[-1].rsplit(".", 1)[-1]
+
+
+def _get_package_file_stamp(package_name):
+    """
+    Return a stamp for the saved state of the given package.
+
+    The stamp is built from the modification time and the size of the package
+    file on disk. Only packages from the project content folder are handled.
+
+    :param str package_name: An Unreal package name, e.g. "/Game/Cine/Seq_010".
+    :returns: A string or ``None`` if the package file can't be found.
+    """
+    if not package_name.startswith("/Game/"):
+        return None
+    content_dir = unreal.Paths.convert_relative_path_to_full(
+        unreal.Paths.project_content_dir()
+    )
+    for ext in (".uasset", ".umap"):
+        package_file = os.path.join(content_dir, package_name[len("/Game/"):] + ext)
+        try:
+            stat = os.stat(package_file)
+        except OSError:
+            continue
+        return "%d:%d" % (stat.st_mtime_ns, stat.st_size)
+    return None
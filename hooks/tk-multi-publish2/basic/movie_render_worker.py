@@ -0,0 +1,296 @@
+# This file is based on templates provided and copyrighted by Autodesk, Inc.
+# This file has been modified by Epic Games, Inc. and is subject to the license
+# file included in this repository.
+
+"""
+Headless Movie Render Queue worker.
+
+This script is not a Toolkit hook, it is run in a separate Unreal Editor
+process started by the movie publish plugin with::
+
+    UnrealEditor <project> -ExecutePythonScript=<this file> -FixedSeed -execcmds="r.HLOD 0" -RenderOffscreen -Unattended
+
+Render profile console variables, passed on the command line of render
+processes, are set on each job configuration instead.
+
+The worker stays up between publishes so the engine startup, shaders, loaded
+map and DDC are reused across renders. It polls a queue folder for job
+descriptors and renders the Movie Render Queue manifest they reference, one at
+a time, from Unreal's tick. Each job result is written as a json file in the
+queue folder and the worker quits after being idle for a while.
+
+Queue folder layout::
+
+    worker.json          Heartbeat, rewritten every few seconds.
+    jobs/<id>.json       Pending jobs, written by the publish plugin.
+    running/<id>.json    The job being rendered.
+    results/<id>.json    Job results, read and removed by the publish plugin.
+    stop                 Optional, the worker quits when this file exists.
+"""
+
+import json
+import os
+import tempfile
+import time
+import traceback
+
+import unreal
+
+# Environment variables used to configure the worker.
+WORKER_FOLDER_ENV_VAR = "UE_SHOTGRID_RENDER_WORKER_FOLDER"
+WORKER_IDLE_TIMEOUT_ENV_VAR = "UE_SHOTGRID_RENDER_WORKER_IDLE_TIMEOUT"
+
+# Seconds between two heartbeats.
+HEARTBEAT_INTERVAL = 5
+# Seconds without any job after which the worker quits.
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+
+def write_json(path, data):
+    """
+    Atomically write the given data as json in the given file.
+
+    :param str path: Full path to the file to write.
+    :param data: Data to serialize.
+    """
+    folder = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def set_console_variables(queue, cvars):
+    """
+    Set the given console variables for all jobs in the given queue.
+
+    Console variables are set by the Movie Render Queue when the render starts
+    and restored when it is done, so they don't leak to the next job.
+
+    :param queue: A :class:`unreal.MoviePipelineQueue` instance.
+    :param cvars: A list of "<name>=<value>" strings, with numeric values.
+    """
+    for job in queue.get_jobs():
+        setting = job.get_configuration().find_or_add_setting_by_class(
+            unreal.MoviePipelineConsoleVariableSetting
+        )
+        for cvar in cvars:
+            name, value = cvar.split("=", 1)
+            if hasattr(setting, "add_or_update_console_variable"):
+                setting.add_or_update_console_variable(name, float(value))
+            else:
+                # Unreal 4.27 and early 5 releases.
+                variables = setting.get_editor_property("console_variables")
+                variables[name] = float(value)
+                setting.set_editor_property("console_variables", variables)
+
+
+class MovieRenderWorker(object):
+    """
+    Render Movie Render Queue manifests queued in a folder, one at a time.
+    """
+
+    def __init__(self, folder, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Instantiate a new :class:`MovieRenderWorker`.
+
+        :param str folder: Full path to the queue folder.
+        :param float idle_timeout: Seconds without any job after which the
+                                   worker quits.
+        """
+        self._folder = folder
+        self._idle_timeout = idle_timeout
+        self._tick_handle = None
+        self._executor = None
+        self._job = None
+        self._map_path = None
+        self._last_activity = time.time()
+        self._last_heartbeat = 0
+        for name in ["jobs", "running", "results"]:
+            path = os.path.join(folder, name)
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+    def start(self):
+        """
+        Start polling the queue folder from Unreal's tick.
+        """
+        # Jobs left running by a previous worker which died can't be recovered.
+        running_folder = os.path.join(self._folder, "running")
+        for name in os.listdir(running_folder):
+            job_id = os.path.splitext(name)[0]
+            self._write_result(
+                job_id, False, "Render worker was stopped while rendering"
+            )
+            os.remove(os.path.join(running_folder, name))
+        self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+        unreal.log("Render worker polling %s" % self._folder)
+
+    def _on_tick(self, delta_seconds):
+        """
+        Called by Unreal after each tick, start the next job if idle.
+
+        :param float delta_seconds: Seconds elapsed since the last tick.
+        """
+        now = time.time()
+        if now - self._last_heartbeat > HEARTBEAT_INTERVAL:
+            self._write_heartbeat()
+            self._last_heartbeat = now
+        if self._executor:
+            # Rendering, the executor calls us back when it is done.
+            return
+        if os.path.exists(os.path.join(self._folder, "stop")):
+            self._shutdown("stop requested")
+            return
+        job = self._claim_next_job()
+        if job:
+            self._start_job(job)
+        elif now - self._last_activity > self._idle_timeout:
+            self._shutdown("idle for %d seconds" % (now - self._last_activity))
+
+    def _write_heartbeat(self):
+        """
+        Write the worker heartbeat file.
+        """
+        write_json(
+            os.path.join(self._folder, "worker.json"),
+            {
+                "pid": os.getpid(),
+                "time": time.time(),
+                "job": self._job["id"] if self._job else None,
+                "map_path": self._map_path,
+            },
+        )
+
+    def _claim_next_job(self):
+        """
+        Claim the oldest pending job, if any.
+
+        :returns: A job dictionary or ``None``.
+        """
+        jobs_folder = os.path.join(self._folder, "jobs")
+        names = [name for name in os.listdir(jobs_folder) if name.endswith(".json")]
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(jobs_folder, name)))
+        for name in names:
+            running_path = os.path.join(self._folder, "running", name)
+            try:
+                # Renaming the file claims the job.
+                os.replace(os.path.join(jobs_folder, name), running_path)
+                with open(running_path, "r") as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                unreal.log_warning("Unable to read job %s: %s" % (name, e))
+                continue
+            job["id"] = os.path.splitext(name)[0]
+            return job
+        return None
+
+    def _start_job(self, job):
+        """
+        Start rendering the given job.
+
+        :param job: A job dictionary.
+        """
+        self._job = job
+        self._job["started"] = time.time()
+        unreal.log("Render worker starting job %s" % job["id"])
+        try:
+            queue = unreal.MoviePipelineLibrary.load_manifest_file(job["manifest_path"])
+            subsystem = unreal.get_editor_subsystem(unreal.MoviePipelineQueueSubsystem)
+            subsystem.get_queue().copy_from(queue)
+            # Render processes get these from their command line.
+            set_console_variables(subsystem.get_queue(), job.get("cvars") or [])
+            # Keep the map loaded in the editor between jobs, PIE then only
+            # needs to duplicate it.
+            map_path = job.get("map_path")
+            if map_path and map_path != self._map_path:
+                unreal.EditorLoadingAndSavingUtils.load_map(map_path)
+                self._map_path = map_path
+            self._executor = unreal.MoviePipelinePIEExecutor()
+            self._executor.on_executor_finished_delegate.add_callable_unique(
+                self._on_executor_finished
+            )
+            subsystem.render_queue_with_executor_instance(self._executor)
+        except Exception:
+            self._executor = None
+            self._complete_job(False, traceback.format_exc())
+
+    def _on_executor_finished(self, executor, success):
+        """
+        Called by the Movie Render Queue executor when the render is done.
+
+        :param executor: The :class:`unreal.MoviePipelineExecutorBase` instance.
+        :param bool success: Whether the render succeeded.
+        """
+        self._executor = None
+        self._complete_job(
+            success, None if success else "Movie Render Queue render failed"
+        )
+
+    def _complete_job(self, success, error):
+        """
+        Report the result of the current job and forget about it.
+
+        :param bool success: Whether the render succeeded.
+        :param str error: An error message, if any.
+        """
+        job = self._job
+        self._job = None
+        self._last_activity = time.time()
+        self._write_result(job["id"], success, error, job["started"])
+        try:
+            os.remove(os.path.join(self._folder, "running", "%s.json" % job["id"]))
+        except OSError:
+            pass
+        unreal.log("Render worker completed job %s: %s" % (job["id"], success))
+
+    def _write_result(self, job_id, success, error, started=None):
+        """
+        Write the result file for the given job.
+
+        :param str job_id: The job id.
+        :param bool success: Whether the render succeeded.
+        :param str error: An error message, if any.
+        :param float started: Optional time at which the render started.
+        """
+        write_json(
+            os.path.join(self._folder, "results", "%s.json" % job_id),
+            {
+                "id": job_id,
+                "success": success,
+                "error": error,
+                "started": started,
+                "completed": time.time(),
+            },
+        )
+
+    def _shutdown(self, reason):
+        """
+        Stop polling the queue folder and quit the editor.
+
+        :param str reason: Why the worker is shutting down.
+        """
+        unreal.log("Render worker shutting down: %s" % reason)
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+        for name in ["worker.json", "stop"]:
+            try:
+                os.remove(os.path.join(self._folder, name))
+            except OSError:
+                pass
+        unreal.SystemLibrary.quit_editor()
+
+
+if __name__ == "__main__":
+    # Keep a reference on the worker for the lifetime of the editor.
+    _WORKER = MovieRenderWorker(
+        os.environ[WORKER_FOLDER_ENV_VAR],
+        float(os.environ.get(WORKER_IDLE_TIMEOUT_ENV_VAR) or DEFAULT_IDLE_TIMEOUT),
+    )
+    _WORKER.start()
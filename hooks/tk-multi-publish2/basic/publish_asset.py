@@ -76,7 +76,7 @@ class UnrealAssetPublishPlugin(HookBaseClass):
             - checked (bool): If True, the plugin will be checked in the UI, otherwise it will be unchecked.
                             Only applies to accepted tasks.
         """
-        if UNREAL_AVAILABLE and item.properties.get("unreal_asset_path"):
+        if UNREAL_AVAILABLE and item.properties.get("asset_path"):
             return {"accepted": True}
         return {"accepted": False}
 
@@ -87,8 +87,8 @@ class UnrealAssetPublishPlugin(HookBaseClass):
         Returns a boolean to indicate validity.
         """
         publisher = self.parent
-        engine = publisher.engine
-        asset_path = item.properties.get("unreal_asset_path")
+        asset_path = item.properties.get("asset_path")
+        asset_name = item.properties.get("asset_name")
 
         if not UNREAL_AVAILABLE:
             error_msg = "Unreal is not available. Unable to export asset."
@@ -100,61 +100,200 @@ class UnrealAssetPublishPlugin(HookBaseClass):
             self.logger.error(error_msg)
             raise Exception(error_msg)
 
-        return True
+        publish_template = publisher.get_template_by_name(settings["Publish Template"].value)
+        if not publish_template:
+            error_msg = "A publish template could not be determined for the asset."
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
 
-    def publish(self, settings, item):
-        publisher = self.parent
+        # Query the fields needed for the publish template from the context
+        try:
+            fields = item.context.as_template_fields(publish_template)
+        except Exception:
+            # We likely failed because of folder creation, trigger that
+            publisher.sgtk.create_filesystem_structure(
+                item.context.entity["type"],
+                item.context.entity["id"],
+                publisher.engine.instance_name
+            )
+            fields = item.context.as_template_fields(publish_template)
+        fields["name"] = asset_name
+
+        # Publish the next version after the ones already on disk
+        existing_paths = publisher.sgtk.paths_from_template(publish_template, fields, skip_keys=["version"])
+        versions = [publish_template.get_fields(path).get("version") or 0 for path in existing_paths]
+        fields["version"] = max(versions or [0]) + 1
+
+        missing_keys = publish_template.missing_keys(fields)
+        if missing_keys:
+            error_msg = "Missing keys required for the publish template %s" % missing_keys
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
 
-        # Get the path in a normalized state. No trailing separator, separators are
-        # appropriate for current os, no double separators, etc.
-        path = sgtk.util.ShotgunPath.normalize(path)
+        publish_path = publish_template.apply_fields(fields)
+        if not os.path.isabs(publish_path):
+            # If the path is not absolute, prepend the publish folder setting.
+            publish_folder = settings["Publish Folder"].value or unreal.Paths.project_saved_dir()
+            publish_path = os.path.abspath(os.path.join(publish_folder, publish_path))
 
-        # Get the publish path
-        publish_path = self._get_publish_path(settings, item)
-        
-        # Ensure the publish folder exists
-        publish_folder = os.path.dirname(publish_path)
-        self.parent.ensure_folder_exists(publish_folder)
+        # The base class registers the publish from these properties
+        item.properties["path"] = publish_path
+        item.properties["publish_path"] = publish_path
+        item.properties["publish_type"] = "Unreal FBX"
+        item.properties["publish_version"] = fields["version"]
 
-        # Get the asset path and name
-        asset_path = item.properties["unreal_asset_path"]
-        asset_name = os.path.splitext(os.path.basename(publish_path))[0]
+        # Flag the item to be exported in the next FBX export batch
+        item.properties["fbx_export_pending"] = True
+        item.properties["fbx_export_path"] = None
 
-        # Export the asset to FBX
-        _unreal_export_asset_to_fbx(publish_folder, asset_path, asset_name)
+        return True
+
+    def publish(self, settings, item):
+        # Assets are exported to FBX in batches: the first item published exports
+        # all the validated items, other items just retrieve their exported file.
+        if item.properties.get("fbx_export_pending"):
+            self._export_fbx_batch(settings, item)
+
+        if not item.properties["fbx_export_path"]:
+            raise Exception("Failed to export asset to FBX")
 
         # Register the publish
-        self._register_publish(settings, item, publish_path)
+        super(UnrealAssetPublishPlugin, self).publish(settings, item)
 
         return True
 
-def _unreal_export_asset_to_fbx(destination_path, asset_path, asset_name):
+    def _export_fbx_batch(self, settings, item):
+        """
+        Export to FBX all the items from the publish tree which were validated
+        by this plugin and not exported yet.
+
+        The path of the exported FBX is stored in each item properties, or
+        ``None`` if the export failed.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching the keys returned in the settings property.
+        :param item: The item being published, always part of the batch.
+        """
+        exports = []
+        for batch_item in self._get_fbx_batch_items(settings, item):
+            # Get the publish path
+            publish_path = self.get_publish_path(settings, batch_item)
+
+            # Ensure the publish folder exists
+            publish_folder = os.path.dirname(publish_path)
+            self.parent.ensure_folder_exists(publish_folder)
+
+            # Get the asset path and name
+            asset_path = batch_item.properties["asset_path"]
+            asset_name = os.path.splitext(os.path.basename(publish_path))[0]
+            exports.append((batch_item, publish_folder, asset_path, asset_name))
+
+        self.logger.info("Exporting %d asset(s) to FBX" % len(exports))
+        exported_paths = _unreal_export_assets_to_fbx(
+            [(folder, asset_path, asset_name) for _, folder, asset_path, asset_name in exports]
+        )
+        for (batch_item, _, asset_path, _), exported_path in zip(exports, exported_paths):
+            if not exported_path:
+                self.logger.error("Failed to export %s to FBX" % asset_path)
+            batch_item.properties["fbx_export_path"] = exported_path
+            batch_item.properties["fbx_export_pending"] = False
+
+    def _get_fbx_batch_items(self, settings, item):
+        """
+        Return the items from the publish tree which can be exported in the
+        same batch as the given item.
+
+        Only items with an active task for the same plugin instance as the
+        task being published are part of the batch.
+
+        :param settings: Dictionary of Settings of the task being published.
+        :param item: The item being published.
+        :returns: A list of items, including the given item.
+        """
+        # Tasks are given their own settings, find the plugin through them.
+        plugin = None
+        for task in item.tasks:
+            if task.settings is settings:
+                plugin = task.plugin
+                break
+        batch_items = [item]
+        if plugin is None:
+            return batch_items
+        root_item = item
+        while not root_item.is_root:
+            root_item = root_item.parent
+        for tree_item in root_item.descendants:
+            if tree_item is item or not tree_item.properties.get("fbx_export_pending"):
+                continue
+            if tree_item.type_spec not in self.item_filters:
+                continue
+            if not any(task.active and task.plugin is plugin for task in tree_item.tasks):
+                continue
+            batch_items.append(tree_item)
+        return batch_items
+
+def _unreal_export_assets_to_fbx(exports):
     """
-    Export an asset to FBX from Unreal
+    Export multiple assets to FBX from Unreal in a single batch
 
-    :param destination_path: The path where the exported FBX will be placed
-    :param asset_path: The Unreal asset to export to FBX
-    :param asset_name: The asset name to use for the FBX filename
+    All assets are loaded first, then exported with a single call to
+    run_asset_export_tasks.
+
+    :param exports: A list of (destination path, Unreal asset path, asset name) tuples
+    :return a list with, for each export, the path of the exported FBX or None if the export failed
+    """
+    assets = _unreal_load_assets([asset_path for _, asset_path, _ in exports])
+    tasks = []
+    previous_mtimes = []
+    for (destination_path, asset_path, asset_name), asset in zip(exports, assets):
+        task = _generate_fbx_export_task(destination_path, asset_path, asset_name, asset)
+        tasks.append(task)
+        # Remember existing files so we don't mistake them for new exports
+        previous_mtimes.append(
+            os.path.getmtime(task.filename) if os.path.isfile(task.filename) else None
+        )
+
+    unreal.Exporter.run_asset_export_tasks([task for task in tasks if task.object])
+
+    exported_paths = []
+    for task, previous_mtime in zip(tasks, previous_mtimes):
+        exported = (
+            task.object is not None
+            and os.path.isfile(task.filename)
+            and os.path.getmtime(task.filename) != previous_mtime
+        )
+        exported_paths.append(task.filename if exported else None)
+    return exported_paths
+
+def _unreal_load_assets(asset_paths):
+    """
+    Load the given assets from Unreal, under a single progress dialog
+
+    :param asset_paths: A list of Unreal asset paths
+    :return a list of loaded assets, with None for assets which couldn't be loaded
     """
-    task = _generate_fbx_export_task(destination_path, asset_path, asset_name)
-    exported = unreal.Exporter.run_asset_export_task(task)
-    if not exported:
-        raise Exception("Failed to export asset to FBX")
+    assets = []
+    with unreal.ScopedSlowTask(len(asset_paths), "Loading assets for FBX export") as slow_task:
+        slow_task.make_dialog(False)
+        for asset_path in asset_paths:
+            slow_task.enter_progress_frame(1)
+            assets.append(unreal.load_asset(asset_path))
+    return assets
 
-def _generate_fbx_export_task(destination_path, asset_path, asset_name):
+def _generate_fbx_export_task(destination_path, asset_path, asset_name, asset=None):
     """
     Create and configure an Unreal AssetExportTask
 
     :param destination_path: The path where the exported FBX will be placed
     :param asset_path: The Unreal asset to export to FBX
     :param asset_name: The FBX filename to export to
+    :param asset: Optional already loaded Unreal asset, loaded from asset_path if not set
     :return the configured AssetExportTask
     """
     # Create the export task
     export_task = unreal.AssetExportTask()
     
     # Configure the task
-    export_task.object = unreal.load_asset(asset_path)
+    export_task.object = asset if asset is not None else unreal.load_asset(asset_path)
     export_task.filename = os.path.join(destination_path, asset_name + ".fbx")
     export_task.selected = False
     export_task.replace_identical = True
@@ -6,13 +6,25 @@ import sgtk
 import unreal
 from tank_vendor import six
 
+from concurrent import futures
+import collections
 import copy
+import ctypes
 import datetime
+import getpass
+import hashlib
+import json
 import os
 import pprint
+import re
+import shutil
+import socket
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import uuid
 
 # Local storage path field for known Oses.
 _OS_LOCAL_STORAGE_PATH_FIELD = {
@@ -22,6 +34,129 @@ _OS_LOCAL_STORAGE_PATH_FIELD = {
     "linux2": "linux_path",
 }[sys.platform]
 
+# Resources a single Movie Render Queue process is expected to need, used to
+# cap the number of renders running at the same time.
+_CORES_PER_RENDER = 4
+_MEMORY_PER_RENDER = 8 * 1024 * 1024 * 1024
+
+# Console variables for the highest rendering quality.
+_MAX_QUALITY_RENDER_CVARS = [
+    "sg.ViewDistanceQuality=4",
+    "sg.AntiAliasingQuality=4",
+    "sg.ShadowQuality=4",
+    "sg.PostProcessQuality=4",
+    "sg.TextureQuality=4",
+    "sg.EffectsQuality=4",
+    "sg.FoliageQuality=4",
+    "sg.ShadingQuality=4",
+    "r.TextureStreaming=0",
+    "r.ForceLOD=0",
+    "r.SkeletalMeshLODBias=-10",
+    "r.ParticleLODBias=-10",
+    "foliage.DitheredLOD=0",
+    "foliage.ForceLOD=0",
+    "r.Shadow.DistanceScale=10",
+    "r.ShadowQuality=5",
+    "r.Shadow.RadiusThreshold=0.001000",
+    "r.ViewDistanceScale=50",
+    "r.D3D12.GPUTimeout=0",
+    "a.URO.Enable=0",
+]
+# Render profiles available by default, each profile controls:
+# - resolution: the [width, height] of the movie.
+# - frame_rate: the movie frame rate, null to use the sequence frame rate with
+#   the Movie Render Queue and 24 fps with the Level Sequencer.
+# - movie_quality: the Level Sequencer movie compression quality, from 1 to 100.
+# - spatial_samples, temporal_samples: the Movie Render Queue anti-aliasing
+#   samples, null to keep the presets values.
+# - warm_up_frames: the number of frames the engine is run before rendering
+#   each shot with the Movie Render Queue, null to keep the presets value.
+# - cvars: the console variables to set in Movie Render Queue render processes.
+# The "dailies" profile matches the settings used before profiles were added,
+# missing values in other profiles are taken from it.
+_DEFAULT_RENDER_PROFILE = "dailies"
+_DEFAULT_RENDER_PROFILES = {
+    "fast_preview": {
+        "resolution": [960, 540],
+        "movie_quality": 50,
+        "spatial_samples": 1,
+        "temporal_samples": 1,
+        "warm_up_frames": 0,
+        "cvars": [
+            "sg.ViewDistanceQuality=1",
+            "sg.AntiAliasingQuality=1",
+            "sg.ShadowQuality=1",
+            "sg.PostProcessQuality=1",
+            "sg.TextureQuality=2",
+            "sg.EffectsQuality=1",
+            "sg.FoliageQuality=1",
+            "sg.ShadingQuality=1",
+            "r.D3D12.GPUTimeout=0",
+        ],
+    },
+    "dailies": {
+        "resolution": [1280, 720],
+        "frame_rate": None,
+        "movie_quality": 75,
+        "spatial_samples": None,
+        "temporal_samples": None,
+        "warm_up_frames": None,
+        "cvars": _MAX_QUALITY_RENDER_CVARS,
+    },
+    "final": {
+        "resolution": [1920, 1080],
+        "movie_quality": 95,
+        "spatial_samples": 1,
+        "temporal_samples": 8,
+        "warm_up_frames": 32,
+        "cvars": _MAX_QUALITY_RENDER_CVARS,
+    },
+}
+
+# Maximum number of movies uploaded to SG at the same time and number of
+# attempts for each upload.
+_MAX_CONCURRENT_UPLOADS = 4
+_UPLOAD_ATTEMPTS = 3
+
+# Script run by the persistent render worker, the worker quits after being
+# idle for this number of seconds.
+_RENDER_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "movie_render_worker.py")
+_RENDER_WORKER_IDLE_TIMEOUT = 30 * 60
+# Maximum number of seconds to wait for the render worker to start, and
+# without a heartbeat from a running render worker.
+_RENDER_WORKER_START_TIMEOUT = 15 * 60
+_RENDER_WORKER_STALE_DELAY = 10 * 60
+
+# Seconds between two checks of the render queue folder for a job result, and
+# maximum number of seconds to wait for a job result.
+_RENDER_QUEUE_POLL_INTERVAL = 5
+_RENDER_QUEUE_TIMEOUT = 24 * 60 * 60
+
+# Seconds between two checks of the renders collected from Unreal's tick with
+# Async Render, and between two reports of their progress.
+_ASYNC_RENDER_POLL_INTERVAL = 0.5
+_ASYNC_RENDER_PROGRESS_INTERVAL = 30
+# Name of the engine command cancelling renders running with Async Render.
+_ASYNC_RENDER_CANCEL_COMMAND = "Cancel Background Renders"
+
+# Number of attempts to render each frame range of a chunked render.
+_RENDER_CHUNK_ATTEMPTS = 2
+
+# Maximum size of the per shot renders cache, least recently used renders are
+# removed when it is exceeded.
+_RENDER_CACHE_MAX_SIZE = 50 * 1024 * 1024 * 1024
+
+# Patterns matched against the Movie Render Queue log to track renders progress.
+_RENDER_LOG_PIPELINE_RE = re.compile(r"LogMovieRenderPipeline")
+_RENDER_LOG_WARM_UP_RE = re.compile(r"warm[\s-]?up", re.IGNORECASE)
+_RENDER_LOG_SHOT_RE = re.compile(r"shot\W*(\d+)\s*(?:/|of)\s*(\d+)", re.IGNORECASE)
+_RENDER_LOG_FRAME_RE = re.compile(r"frame\W*(\d+)\s*(?:/|of)\s*(\d+)", re.IGNORECASE)
+_RENDER_LOG_ENCODE_RE = re.compile(r"ProRes|encod|finaliz", re.IGNORECASE)
+# Render phases, in the order they happen.
+_RENDER_PHASES = ["startup", "queued", "warm_up", "render", "encode"]
+# Seconds between two render progress messages.
+_RENDER_PROGRESS_LOG_INTERVAL = 10
+
 HookBaseClass = sgtk.get_hook_baseclass()
 
 
@@ -101,7 +236,89 @@ class UnrealMoviePublishPlugin(HookBaseClass):
                 "type": "string",
                 "default": None,
                 "description": "Optional folder to use as a root for publishes"
-            }
+            },
+            "Concurrent Renders": {
+                "type": "int",
+                "default": 1,
+                "description": "Maximum number of Movie Render Queue renders "
+                               "to run at the same time, one render per "
+                               "publish item: the shots of a sequence item "
+                               "are rendered one after the other in a single "
+                               "render. 1 renders each item in its publish "
+                               "pass, 0 caps it from the available cores and "
+                               "memory."
+            },
+            "Render Worker": {
+                "type": "bool",
+                "default": False,
+                "description": "Render with the Movie Render Queue in a "
+                               "headless Unreal process kept running between "
+                               "publishes, instead of starting a new Unreal "
+                               "process for each render."
+            },
+            "Render Backend": {
+                "type": "string",
+                "default": "local",
+                "description": "How Movie Render Queue renders are run: "
+                               "\"local\" renders on this machine, "
+                               "\"queue_folder\" submits them to the Render "
+                               "Queue Folder for render farm workers, the "
+                               "publish is registered when they complete."
+            },
+            "Render Queue Folder": {
+                "type": "string",
+                "default": None,
+                "description": "Shared folder where renders are submitted with "
+                               "the \"queue_folder\" Render Backend."
+            },
+            "Render Profile": {
+                "type": "string",
+                "default": _DEFAULT_RENDER_PROFILE,
+                "description": "Name of the render profile to use, from the "
+                               "Render Profiles setting."
+            },
+            "Render Profiles": {
+                "type": "dict",
+                "default": _DEFAULT_RENDER_PROFILES,
+                "description": "Render profiles by name, each profile can set "
+                               "the resolution, frame_rate, movie_quality, "
+                               "spatial_samples, temporal_samples, "
+                               "warm_up_frames and cvars to use for rendering. "
+                               "Missing values are taken from the default "
+                               "\"dailies\" profile."
+            },
+            "Incremental Render": {
+                "type": "bool",
+                "default": False,
+                "description": "Only render the shots of a sequence which "
+                               "changed since they were last rendered and "
+                               "assemble the movie from cached shot renders. "
+                               "Requires FFmpeg."
+            },
+            "Render Chunks": {
+                "type": "int",
+                "default": 0,
+                "description": "Number of frame ranges a sequence is split "
+                               "into, rendered at the same time to PNG image "
+                               "sequences and encoded to a movie with FFmpeg. "
+                               "0 or 1 renders the movie with a single render."
+            },
+            "Async Render": {
+                "type": "bool",
+                "default": False,
+                "description": "Do not wait for Movie Render Queue renders in "
+                               "the finalize pass, they are collected from "
+                               "Unreal's tick and the publish is registered "
+                               "when they complete, so the editor can be used "
+                               "while rendering."
+            },
+            "FFmpeg Path": {
+                "type": "string",
+                "default": "ffmpeg",
+                "description": "FFmpeg executable used to assemble movies from "
+                               "shot renders with Incremental Render and to "
+                               "encode image sequences with Render Chunks."
+            },
         }
 
         # update the base settings
@@ -152,6 +369,10 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         for preset in unreal.EditorAssetLibrary.list_assets(presets_folder.path):
             settings_frame.unreal_render_presets_widget.addItem(preset.split(".")[0])
 
+        # Render profiles are added from the settings in set_ui_settings
+        settings_frame.unreal_render_profile_label = QtGui.QLabel("Render profile:")
+        settings_frame.unreal_render_profile_widget = QtGui.QComboBox()
+
         settings_frame.unreal_publish_folder_label = QtGui.QLabel("Publish folder:")
         storage_roots = self.parent.shotgun.find(
             "LocalStorage",
@@ -174,6 +395,8 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         settings_layout.addWidget(settings_frame.description_label)
         settings_layout.addWidget(settings_frame.unreal_render_presets_label)
         settings_layout.addWidget(settings_frame.unreal_render_presets_widget)
+        settings_layout.addWidget(settings_frame.unreal_render_profile_label)
+        settings_layout.addWidget(settings_frame.unreal_render_profile_widget)
         settings_layout.addWidget(settings_frame.unreal_publish_folder_label)
         settings_layout.addWidget(settings_frame.storage_roots_widget)
 
@@ -207,6 +430,8 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             "Movie Render Queue Presets Path": render_presets_path,
             "Publish Folder": publish_folder,
         }
+        if widget.unreal_render_profile_widget.currentIndex() >= 0:
+            settings["Render Profile"] = six.ensure_str(widget.unreal_render_profile_widget.currentText())
         return settings
 
     def set_ui_settings(self, widget, settings):
@@ -231,6 +456,13 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             preset_index = widget.unreal_render_presets_widget.findText(render_presets_path)
             self.logger.info("Index for %s is %s" % (render_presets_path, preset_index))
         widget.unreal_render_presets_widget.setCurrentIndex(preset_index)
+        widget.unreal_render_profile_widget.clear()
+        render_profiles = cur_settings.get("Render Profiles") or _DEFAULT_RENDER_PROFILES
+        for profile_name in sorted(render_profiles):
+            widget.unreal_render_profile_widget.addItem(profile_name)
+        widget.unreal_render_profile_widget.setCurrentIndex(
+            widget.unreal_render_profile_widget.findText(cur_settings.get("Render Profile") or _DEFAULT_RENDER_PROFILE)
+        )
         # Note: the template is validated in the accept method, no need to check it here.
         publish_template_setting = cur_settings.get("Publish Template")
         publisher = self.parent
@@ -272,6 +504,11 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             settings["Publish Folder"].value,
             settings_manager.SCOPE_PROJECT
         )
+        settings["Render Profile"].value = settings_manager.retrieve(
+            "publish2.render_profile",
+            settings["Render Profile"].value,
+            settings_manager.SCOPE_PROJECT
+        )
         self.logger.debug("Loaded settings %s" % settings["Publish Folder"])
         self.logger.debug("Loaded settings %s" % settings["Movie Render Queue Presets Path"])
 
@@ -291,6 +528,8 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         settings_manager.store("publish2.movie_render_queue_presets_path", render_presets_path, settings_manager.SCOPE_PROJECT)
         publish_folder = settings["Publish Folder"].value
         settings_manager.store("publish2.publish_folder", publish_folder, settings_manager.SCOPE_PROJECT)
+        render_profile = settings["Render Profile"].value
+        settings_manager.store("publish2.render_profile", render_profile, settings_manager.SCOPE_PROJECT)
 
     def accept(self, settings, item):
         """
@@ -383,6 +622,12 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         if not asset_path or not asset_name:
             self.logger.debug("Sequence path or name not configured.")
             return False
+        # Items collected lazily only have their edits path resolved now.
+        if not item.properties.get("edits_path") and item.properties.get("lazy_edits_path"):
+            self._resolve_lazy_edits_paths(item)
+            # The asset is now the top Level Sequence of the edits path.
+            asset_path = item.properties["asset_path"]
+            asset_name = item.properties["asset_name"]
         # Retrieve the Level Sequences sections tree for this Level Sequence.
         # This is needed to get frame ranges in the "edit" context.
         edits_path = item.properties.get("edits_path")
@@ -476,6 +721,22 @@ class UnrealMoviePublishPlugin(HookBaseClass):
                 raise ValueError("Rendering invidual shots for a sequence is only supported with the Movie Render Queue.")
             self.logger.info("Movie Render Queue not available, Level Sequencer will be used for rendering.")
 
+        render_profile = self._get_render_profile(settings)
+        self.logger.info("Rendering with the %s render profile." % render_profile["name"])
+
+        render_backend = settings["Render Backend"].value
+        if render_backend not in _RENDER_BACKENDS:
+            raise ValueError(
+                "Invalid Render Backend %s, it must be one of %s." % (
+                    render_backend, ", ".join(sorted(_RENDER_BACKENDS))
+                )
+            )
+        if render_backend == "queue_folder":
+            if not use_movie_render_queue:
+                raise ValueError("The queue_folder Render Backend is only supported with the Movie Render Queue.")
+            if not settings["Render Queue Folder"].value:
+                raise ValueError("A Render Queue Folder must be set to use the queue_folder Render Backend.")
+
         item.properties["use_movie_render_queue"] = use_movie_render_queue
         item.properties["movie_render_queue_presets"] = render_presets
         # Set the UE movie extension based on the current platform and rendering engine
@@ -506,6 +767,10 @@ class UnrealMoviePublishPlugin(HookBaseClass):
                     publish_path
                 )
             )
+        if _ASYNC_RENDER_MONITOR.has_render(os.path.normpath(publish_path)):
+            error_msg = "%s is still being rendered in the background." % publish_path
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
         item.properties["path"] = publish_path
         item.properties["publish_path"] = publish_path
         item.properties["publish_type"] = "Unreal Render"
@@ -513,13 +778,50 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         self.save_ui_settings(settings)
         return True
 
-    def _check_render_settings(self, render_config):
+    def _resolve_lazy_edits_paths(self, item):
+        """
+        Resolve the edits path of the given item collected lazily, and the ones
+        of other checked items collected lazily with it.
+
+        The edits index is only brought up to date once for all of them, other
+        items are then already resolved when they are validated.
+
+        :param item: Item to process
+        :raises ValueError: If the edits path of the given item does not exist
+                            anymore or can't be determined.
+        """
+        sequence_edits = self.parent.execute_hook_method("collector", "retrieve_sequence_edits")
+        paths_cache = {}
+        for sibling in item.parent.children:
+            if sibling is not item and not (
+                sibling.checked
+                and sibling.properties.get("lazy_edits_path")
+                and not sibling.properties.get("edits_path")
+            ):
+                continue
+            try:
+                self.parent.execute_hook_method(
+                    "collector",
+                    "resolve_lazy_edits_path",
+                    item=sibling,
+                    sequence_edits=sequence_edits,
+                    paths_cache=paths_cache,
+                )
+            except ValueError:
+                # Errors are reported when the item itself is validated.
+                if sibling is item:
+                    raise
+
+    def _check_render_settings(self, render_config, output_class=None):
         """
         Check settings from the given render preset and report which ones are problematic and why.
 
         :param render_config: An Unreal Movie Pipeline render config.
+        :param output_class: Optional expected output setting class, Apple ProRes
+                             output is expected if not set.
         :returns: A potentially empty list of tuples, where each tuple is a setting and a string explaining the problem.
         """
+        output_class = output_class or unreal.MoviePipelineAppleProResOutput
         invalid_settings = []
         # To avoid having multiple outputs, only keep the main render pass and the expected output format.
         for setting in render_config.get_all_settings():
@@ -528,7 +830,7 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             if isinstance(setting, unreal.MoviePipelineImagePassBase) and type(setting) != unreal.MoviePipelineDeferredPassBase:
                 invalid_settings.append((setting, "Render pass %s would cause multiple outputs" % setting.get_name()))
             # Check rendering outputs
-            elif isinstance(setting, unreal.MoviePipelineOutputBase) and not isinstance(setting, unreal.MoviePipelineAppleProResOutput):
+            elif isinstance(setting, unreal.MoviePipelineOutputBase) and not isinstance(setting, output_class):
                 invalid_settings.append((setting, "Render output %s would cause multiple outputs" % setting.get_name()))
         return invalid_settings
 
@@ -564,6 +866,7 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         unreal_asset_path = item.properties["unreal_asset_path"]
         unreal_map_path = item.properties["unreal_map_path"]
         unreal.log("movie name: {}".format(movie_name))
+        render_profile = self._get_render_profile(settings)
         # Render the movie
         if item.properties.get("use_movie_render_queue"):
             presets = item.properties["movie_render_queue_presets"]
@@ -571,26 +874,96 @@ class UnrealMoviePublishPlugin(HookBaseClass):
                 self.logger.info("Rendering %s with the Movie Render Queue with %s presets." % (publish_path, presets.get_name()))
             else:
                 self.logger.info("Rendering %s with the Movie Render Queue." % publish_path)
+            concurrent_renders = settings["Concurrent Renders"].value
+            backend = self._unreal_get_render_backend(settings)
+            shot_name = item.properties.get("unreal_shot") or None
+            render_chunks = settings["Render Chunks"].value
+            ffmpeg_path = None
+            if settings["Incremental Render"].value or render_chunks > 1:
+                ffmpeg_path = self._get_ffmpeg_path(settings)
+            if ffmpeg_path and render_chunks > 1 and not shot_name:
+                # Render frame ranges at the same time, the movie is encoded
+                # and the publish registered in the finalize pass.
+                self._unreal_submit_chunked_render(
+                    item,
+                    backend,
+                    _get_max_concurrent_renders(concurrent_renders),
+                    render_chunks,
+                    ffmpeg_path,
+                    render_profile,
+                )
+                return
+            if not settings["Incremental Render"].value:
+                ffmpeg_path = None
+            if concurrent_renders != 1 or backend.deferred or settings["Async Render"].value:
+                # Queue the render, the publish is registered when it is
+                # collected in the finalize pass or from Unreal's tick.
+                max_renders = _get_max_concurrent_renders(concurrent_renders)
+                render_job = self._unreal_submit_movie_queue_render(
+                    publish_path,
+                    unreal_map_path,
+                    unreal_asset_path,
+                    presets,
+                    shot_name,
+                    backend,
+                    ffmpeg_path,
+                    render_profile,
+                )
+                if backend.deferred:
+                    self.logger.info(
+                        "Submitted render of %s to %s, the publish will be registered when it completes." % (
+                            publish_path, backend
+                        )
+                    )
+                else:
+                    self.logger.info(
+                        "Queuing render of %s, up to %d renders will run at the same time." % (
+                            publish_path, max_renders
+                        )
+                    )
+                _RENDER_SCHEDULER.submit(
+                    publish_path, max_renders, _wait_render_job, backend, render_job, _get_publish_session(item)
+                )
+                return
             res, _ = self._unreal_render_sequence_with_movie_queue(
                 publish_path,
                 unreal_map_path,
                 unreal_asset_path,
                 presets,
-                item.properties.get("unreal_shot") or None,
+                shot_name,
+                backend,
+                ffmpeg_path,
+                render_profile,
             )
         else:
             self.logger.info("Rendering %s with the Level Sequencer." % publish_path)
             res, _ = self._unreal_render_sequence_with_sequencer(
                 publish_path,
                 unreal_map_path,
-                unreal_asset_path
+                unreal_asset_path,
+                render_profile,
             )
         if not res:
             raise RuntimeError(
                 "Unable to render %s" % publish_path
             )
+        self._register_movie(settings, item)
+
+    def _register_movie(self, settings, item):
+        """
+        Register the rendered movie for the given item in SG and upload it
+        for review.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :param item: Item to process
+        """
+        publish_path = os.path.normpath(item.properties["publish_path"])
+        movie_name = os.path.splitext(os.path.basename(publish_path))[0]
+
         # Increment the version number
-        self._unreal_asset_set_version(unreal_asset_path, item.properties["version_number"])
+        self._unreal_asset_set_version(item, item.properties["unreal_asset_path"], item.properties["version_number"])
 
         # Publish the movie file to Shotgun
         super(UnrealMoviePublishPlugin, self).publish(settings, item)
@@ -639,15 +1012,10 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         upload_path = str(item.properties.get("publish_path"))
         unreal.log("upload_path: {}".format(upload_path))
 
-        # Upload the file to SG
+        # Upload the file to SG in the background, uploads are waited for in
+        # the finalize pass.
         self.logger.info("Uploading content...")
-        self.parent.shotgun.upload(
-            "Version",
-            version["id"],
-            upload_path,
-            "sg_uploaded_movie"
-        )
-        self.logger.info("Upload complete!")
+        _VERSION_UPLOADER.submit(_get_publish_session(item), self.parent.sgtk, version["id"], upload_path)
 
     def finalize(self, settings, item):
         """
@@ -659,9 +1027,139 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             instances.
         :param item: Item to process
         """
+        # Collect the render queued in the publish pass, if any, and register
+        # the publish.
+        render_keys = self._get_render_keys(item)
+        if render_keys and settings["Async Render"].value:
+            # Let the render run while the editor is used, the publish is
+            # registered from Unreal's tick when it completes.
+            _ASYNC_RENDER_MONITOR.add(self, settings, item, render_keys)
+            self.logger.info(
+                "Rendering %s in the background, the publish will be registered when it completes. "
+                "Use the \"%s\" command to cancel it." % (
+                    item.properties["publish_path"], _ASYNC_RENDER_CANCEL_COMMAND,
+                )
+            )
+            return
+        if render_keys:
+            self._collect_render(settings, item)
+
+        # Save versions of all items registered by this publish at once when
+        # all its renders were collected. Other publishes running at the same
+        # time, e.g. with Async Render, save their own versions.
+        session = _get_publish_session(item)
+        if not _RENDER_SCHEDULER.has_jobs(session) and _PENDING_ASSET_VERSIONS.get(session):
+            self._unreal_save_asset_versions(session)
+
+        # Wait for uploads once all renders were collected, so they can run
+        # while other items are still rendering or being registered.
+        if not _RENDER_SCHEDULER.has_jobs(session) and _VERSION_UPLOADER.has_uploads(session):
+            self.logger.info("Waiting for uploads to complete...")
+            failed = _VERSION_UPLOADER.wait_all(session)
+            if failed:
+                for upload_path, error in failed.items():
+                    self.logger.error("Failed to upload %s: %s" % (upload_path, error))
+                raise RuntimeError(
+                    "Unable to upload %s" % ", ".join(sorted(failed))
+                )
+            self.logger.info("Upload complete!")
+
         # do the base class finalization
         super(UnrealMoviePublishPlugin, self).finalize(settings, item)
 
+    def _get_render_keys(self, item):
+        """
+        Return the keys of the render jobs queued for the given item in the
+        publish pass and not yet collected.
+
+        :param item: Item to process
+        :returns: A potentially empty list of render job keys.
+        """
+        render_chunks = item.properties.get("render_chunks")
+        if render_chunks:
+            keys = render_chunks["keys"]
+        else:
+            keys = [os.path.normpath(item.properties["publish_path"])]
+        return [key for key in keys if _RENDER_SCHEDULER.has_job(key)]
+
+    def _collect_render(self, settings, item):
+        """
+        Wait for the render queued for the given item in the publish pass and
+        register the publish.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :param item: Item to process
+        :raises RuntimeError: If the movie could not be rendered.
+        """
+        publish_path = os.path.normpath(item.properties["publish_path"])
+        render_chunks = item.properties.get("render_chunks")
+        if render_chunks:
+            self.logger.info(
+                "Waiting for %d frame ranges of %s to complete..." % (len(render_chunks["keys"]), publish_path)
+            )
+            failed = 0
+            telemetry = []
+            for key in render_chunks["keys"]:
+                exit_code, record = _RENDER_SCHEDULER.wait(key)
+                telemetry.append(record)
+                if exit_code:
+                    failed += 1
+            item.properties["render_telemetry"] = telemetry
+            if failed:
+                item.properties["render_exit_code"] = 1
+                raise RuntimeError(
+                    "Unable to render %d frame ranges out of %d for %s" % (
+                        failed, len(render_chunks["keys"]), publish_path
+                    )
+                )
+            self.logger.info("Encoding %s..." % publish_path)
+            exit_code = _encode_image_sequence(
+                render_chunks["ffmpeg_path"],
+                render_chunks["frames_folder"],
+                render_chunks["frame_rate"],
+                publish_path,
+            )
+            item.properties["render_exit_code"] = exit_code
+            if exit_code or not os.path.isfile(publish_path):
+                raise RuntimeError(
+                    "Unable to encode %s, FFmpeg exited with %s" % (publish_path, exit_code)
+                )
+            shutil.rmtree(render_chunks["frames_folder"], ignore_errors=True)
+            self.logger.info("Rendered %s" % publish_path)
+            self._register_movie(settings, item)
+        else:
+            self.logger.info("Waiting for render of %s to complete..." % publish_path)
+            exit_code, telemetry = _RENDER_SCHEDULER.wait(publish_path)
+            item.properties["render_exit_code"] = exit_code
+            item.properties["render_telemetry"] = telemetry
+            if not os.path.isfile(publish_path):
+                raise RuntimeError(
+                    "Unable to render %s, render process exited with %s" % (publish_path, exit_code)
+                )
+            self.logger.info("Rendered %s" % publish_path)
+            self._register_movie(settings, item)
+
+    def _finalize_async_render(self, settings, item):
+        """
+        Register the publish for a render left running by the finalize pass
+        with Async Render, once it completed, and do the base class
+        finalization.
+
+        Called from Unreal's tick, the render is not waited for.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :param item: Item to process
+        """
+        self._collect_render(settings, item)
+        session = _get_publish_session(item)
+        if not _RENDER_SCHEDULER.has_jobs(session) and _PENDING_ASSET_VERSIONS.get(session):
+            self._unreal_save_asset_versions(session)
+        super(UnrealMoviePublishPlugin, self).finalize(settings, item)
+
     def _get_version_entity(self, item):
         """
         Returns the best entity to link the version to.
@@ -674,16 +1172,45 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             return None
 
     def _unreal_asset_get_version(self, asset_path):
-        asset = unreal.EditorAssetLibrary.load_asset(asset_path)
-        version_number = 0
+        """
+        Return the version number stored in the given asset metadata.
 
-        if not asset:
-            return version_number
+        The version is read from the Asset Registry data if the version tag is
+        listed in the Asset Manager "Metadata Tags For Asset Registry" project
+        settings, or from the asset itself if it is already loaded. The asset is
+        only loaded as a last resort. Versions queued for saving take precedence.
+
+        :param str asset_path: The Unreal asset path.
+        :returns: An integer, 0 if no version is stored.
+        """
+        pending_versions = [
+            versions[asset_path] for versions in _PENDING_ASSET_VERSIONS.values() if asset_path in versions
+        ]
+        if pending_versions:
+            return max(pending_versions)
 
+        version_number = 0
         engine = sgtk.platform.current_engine()
         tag = engine.get_metadata_tag("version_number")
 
-        metadata = unreal.EditorAssetLibrary.get_metadata_tag(asset, tag)
+        asset_data = unreal.EditorAssetLibrary.find_asset_data(asset_path)
+        if not asset_data or not asset_data.is_valid():
+            return version_number
+
+        if asset_data.is_asset_loaded():
+            asset = asset_data.get_asset()
+            metadata = unreal.EditorAssetLibrary.get_metadata_tag(asset, tag)
+        elif _is_asset_registry_metadata_tag(tag):
+            metadata = asset_data.get_tag_value(tag)
+        else:
+            self.logger.debug(
+                "Loading %s to read its version, add %s to the Asset Manager "
+                "Metadata Tags For Asset Registry project settings to avoid it." % (asset_path, tag)
+            )
+            asset = unreal.EditorAssetLibrary.load_asset(asset_path)
+            if not asset:
+                return version_number
+            metadata = unreal.EditorAssetLibrary.get_metadata_tag(asset, tag)
 
         if not metadata:
             return version_number
@@ -695,36 +1222,61 @@ class UnrealMoviePublishPlugin(HookBaseClass):
 
         return version_number
 
-    def _unreal_asset_set_version(self, asset_path, version_number):
-        asset = unreal.EditorAssetLibrary.load_asset(asset_path)
+    def _unreal_asset_set_version(self, item, asset_path, version_number):
+        """
+        Queue the given version number to be stored in the given asset metadata.
 
-        if not asset:
-            return
+        Queued versions are saved with :meth:`_unreal_save_asset_versions`.
+
+        :param item: The item the version is registered for.
+        :param str asset_path: The Unreal asset path.
+        :param int version_number: The version number to store.
+        """
+        versions = _PENDING_ASSET_VERSIONS.setdefault(_get_publish_session(item), {})
+        versions[asset_path] = max(version_number, versions.get(asset_path, 0))
 
+    def _unreal_save_asset_versions(self, session):
+        """
+        Store all version numbers queued by the given publish session in their
+        asset metadata and save all the assets at once.
+
+        :param session: The publish session, as returned by :func:`_get_publish_session`.
+        """
         engine = sgtk.platform.current_engine()
         tag = engine.get_metadata_tag("version_number")
 
-        unreal.EditorAssetLibrary.set_metadata_tag(asset, tag, str(version_number))
-        unreal.EditorAssetLibrary.save_loaded_asset(asset)
+        assets = []
+        for asset_path, version_number in _PENDING_ASSET_VERSIONS.pop(session, {}).items():
+            asset = unreal.EditorAssetLibrary.load_asset(asset_path)
+            if not asset:
+                continue
+            unreal.EditorAssetLibrary.set_metadata_tag(asset, tag, str(version_number))
+            assets.append(asset)
+
+        if not assets:
+            return
+        unreal.EditorAssetLibrary.save_loaded_assets(assets)
 
         # The save will pop up a progress bar that will bring the editor to the front thus hiding the publish app dialog
         # Workaround: Force all Shotgun dialogs to be brought to front
-        engine = sgtk.platform.current_engine()
         for dialog in engine.created_qt_dialogs:
             dialog.raise_()
 
-    def _unreal_render_sequence_with_sequencer(self, output_path, unreal_map_path, sequence_path):
+    def _unreal_render_sequence_with_sequencer(self, output_path, unreal_map_path, sequence_path, profile=None):
         """
         Renders a given sequence in a given level to a movie file with the Level Sequencer.
 
         :param str output_path: Full path to the movie to render.
         :param str unreal_map_path: Path of the Unreal map in which to run the sequence.
         :param str sequence_path: Content Browser path of sequence to render.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
         :returns: True if a movie file was generated, False otherwise
                   string representing the path of the generated movie file
         """
         output_folder, output_file = os.path.split(output_path)
         movie_name = os.path.splitext(output_file)[0]
+        profile = profile or _DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE]
 
         # First, check if there's a file that will interfere with the output of the Sequencer
         # Sequencer can only render to avi or mov file format
@@ -754,14 +1306,14 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             "-MovieName=%s" % movie_name,  # Output filename
             "-game",
             "-MovieSceneCaptureType=/Script/MovieSceneCapture.AutomatedLevelSequenceCapture",
-            "-ResX=1280",
-            "-ResY=720",
+            "-ResX=%d" % profile["resolution"][0],
+            "-ResY=%d" % profile["resolution"][1],
             "-ForceRes",
             "-Windowed",
             "-MovieCinematicMode=yes",
             "-MovieFormat=Video",
-            "-MovieFrameRate=24",
-            "-MovieQuality=75",
+            "-MovieFrameRate=%s" % (profile["frame_rate"] or 24),
+            "-MovieQuality=%d" % profile["movie_quality"],
             "-NoTextureStreaming",
             "-NoLoadingScreen",
             "-NoScreenMessages",
@@ -785,7 +1337,7 @@ class UnrealMoviePublishPlugin(HookBaseClass):
 
         return os.path.isfile(output_path), output_path
 
-    def _unreal_render_sequence_with_movie_queue(self, output_path, unreal_map_path, sequence_path, presets=None, shot_name=None):
+    def _unreal_render_sequence_with_movie_queue(self, output_path, unreal_map_path, sequence_path, presets=None, shot_name=None, backend=None, ffmpeg_path=None, profile=None):
         """
         Renders a given sequence in a given level with the Movie Render queue.
 
@@ -794,31 +1346,430 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         :param str sequence_path: Content Browser path of sequence to render.
         :param presets: Optional :class:`unreal.MoviePipelineMasterConfig` instance to use for renderig.
         :param str shot_name: Optional shot name to render a single shot from this sequence.
+        :param backend: Optional :class:`_MovieRenderBackend` instance, renders
+                        are run on this machine if not set.
+        :param str ffmpeg_path: Optional FFmpeg executable path, only shots which
+                                changed are rendered if set.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
         :returns: True if a movie file was generated, False otherwise
                   string representing the path of the generated movie file
         :raises ValueError: If a shot name is specified but can't be found in
                             the sequence.
         """
+        backend = backend or _LocalRenderBackend()
+        render_job = self._unreal_submit_movie_queue_render(
+            output_path,
+            unreal_map_path,
+            sequence_path,
+            presets,
+            shot_name,
+            backend,
+            ffmpeg_path,
+            profile,
+        )
+        _wait_render_job(backend, render_job)
+        return os.path.isfile(output_path), output_path
+
+    def _get_render_profile(self, settings):
+        """
+        Return the render profile to use.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :returns: A dictionary with all the render profile values and its name.
+        :raises ValueError: If the render profile is not defined.
+        """
+        profile_name = settings["Render Profile"].value or _DEFAULT_RENDER_PROFILE
+        profiles = settings["Render Profiles"].value or _DEFAULT_RENDER_PROFILES
+        if profile_name not in profiles:
+            raise ValueError(
+                "Unknown render profile %s, available profiles are %s." % (
+                    profile_name, ", ".join(sorted(profiles))
+                )
+            )
+        profile = dict(_DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE])
+        profile.update(profiles[profile_name] or {})
+        profile["name"] = profile_name
+        return profile
+
+    def _get_ffmpeg_path(self, settings):
+        """
+        Return the FFmpeg executable to use to assemble movies from shot renders.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :returns: Full path to FFmpeg or ``None`` if FFmpeg can't be found.
+        """
+        ffmpeg = settings["FFmpeg Path"].value or "ffmpeg"
+        ffmpeg_path = shutil.which(ffmpeg)
+        if not ffmpeg_path:
+            self.logger.warning(
+                "Unable to find %s, Incremental Render and Render Chunks are disabled." % ffmpeg
+            )
+        return ffmpeg_path
+
+    def _unreal_submit_chunked_render(self, item, backend, max_renders, render_chunks, ffmpeg_path, profile):
+        """
+        Split the item sequence into frame ranges and submit a render of each
+        of them to a PNG image sequence.
+
+        Renders are collected and the image sequences encoded to a movie in
+        the finalize pass.
+
+        :param item: Item to process.
+        :param backend: A :class:`_MovieRenderBackend` instance.
+        :param int max_renders: Maximum number of renders to run at the same time.
+        :param int render_chunks: Number of frame ranges to render.
+        :param str ffmpeg_path: Full path to the FFmpeg executable.
+        :param profile: A render profile dictionary.
+        """
+        publish_path = os.path.normpath(item.properties["publish_path"])
+        sequence_path = item.properties["unreal_asset_path"]
+        lvseq = unreal.load_asset(sequence_path, unreal.LevelSequence)
+        start_frame = lvseq.get_playback_start()
+        end_frame = lvseq.get_playback_end()
+        display_rate = lvseq.get_display_rate()
+        frame_rate = "%d/%d" % (display_rate.numerator, display_rate.denominator)
+        if profile["frame_rate"]:
+            frame_rate = "%s" % profile["frame_rate"]
+        frame_count = end_frame - start_frame
+        render_chunks = max(1, min(render_chunks, frame_count))
+
+        movie_name = os.path.splitext(os.path.basename(publish_path))[0]
+        frames_folder = "%s_frames" % os.path.splitext(publish_path)[0]
+        if os.path.isdir(frames_folder):
+            shutil.rmtree(frames_folder)
+        keys = []
+        for i in range(render_chunks):
+            chunk_range = (
+                start_frame + frame_count * i // render_chunks,
+                start_frame + frame_count * (i + 1) // render_chunks,
+            )
+            chunk_folder = os.path.join(frames_folder, "%03d" % i)
+            os.makedirs(chunk_folder)
+            render_job = self._unreal_submit_movie_queue_render(
+                os.path.join(chunk_folder, "%s.{frame_number}.png" % movie_name),
+                item.properties["unreal_map_path"],
+                sequence_path,
+                item.properties["movie_render_queue_presets"],
+                None,
+                backend,
+                None,
+                profile,
+                chunk_range,
+            )
+            render_job["frames_folder"] = chunk_folder
+            # Frames are only known if the sequence frame rate is used.
+            render_job["expected_frames"] = None if profile["frame_rate"] else chunk_range[1] - chunk_range[0]
+            key = "%s#%d" % (publish_path, i)
+            _RENDER_SCHEDULER.submit(
+                key, max_renders, _wait_render_chunk, backend, render_job, _get_publish_session(item)
+            )
+            keys.append(key)
+        item.properties["render_chunks"] = {
+            "keys": keys,
+            "frames_folder": frames_folder,
+            "frame_rate": frame_rate,
+            "ffmpeg_path": ffmpeg_path,
+        }
+        self.logger.info(
+            "Submitted render of %s in %d frame ranges to %s, up to %d renders will run at the same time." % (
+                publish_path, render_chunks, backend, max_renders,
+            )
+        )
+
+    def _unreal_get_render_backend(self, settings):
+        """
+        Return the render backend to use for Movie Render Queue renders.
+
+        :param settings: Dictionary of Settings. The keys are strings, matching
+            the keys returned in the settings property. The values are `Setting`
+            instances.
+        :returns: A :class:`_MovieRenderBackend` instance.
+        """
+        if settings["Render Backend"].value == "queue_folder":
+            return _QueueFolderRenderBackend(settings["Render Queue Folder"].value)
+        if not settings["Render Worker"].value:
+            return _LocalRenderBackend()
+        return _LocalRenderBackend(
+            worker={
+                "folder": os.path.abspath(
+                    os.path.join(unreal.Paths.project_saved_dir(), "ShotGrid", "render_worker")
+                ),
+                "cmd_args": [
+                    sys.executable,
+                    "%s" % os.path.join(
+                        unreal.SystemLibrary.get_project_directory(),
+                        "%s.uproject" % unreal.SystemLibrary.get_game_name(),
+                    ),
+                    "-ExecutePythonScript=%s" % _RENDER_WORKER_SCRIPT,
+                    # Process wide options of the render command line, render
+                    # profile cvars are applied by the worker for each job.
+                    "-FixedSeed",
+                    "-execcmds=r.HLOD 0",
+                    "-RenderOffscreen",
+                    "-Unattended",
+                    "-NoSplash",
+                    "-NoSound",
+                    "-log",
+                ],
+            }
+        )
+
+    def _unreal_submit_movie_queue_render(self, output_path, unreal_map_path, sequence_path, presets, shot_name, backend, ffmpeg_path=None, profile=None, frame_range=None):
+        """
+        Save a Movie Render Queue manifest for the given sequence and submit
+        it to the given render backend.
+
+        Unreal is only accessed from this method, the backend can then wait for
+        the render from any thread with :func:`_wait_render_job`.
+
+        If a FFmpeg path is given, each shot of the sequence is rendered to its
+        own movie and cached. Only shots without a cached render are rendered
+        and the movie is assembled from the shot renders once they are done.
+
+        :param str output_path: Full path to the movie to render.
+        :param str unreal_map_path: Path of the Unreal map in which to run the sequence.
+        :param str sequence_path: Content Browser path of sequence to render.
+        :param presets: Optional :class:`unreal.MoviePipelineMasterConfig` instance to use for renderig.
+        :param str shot_name: Optional shot name to render a single shot from this sequence.
+        :param backend: A :class:`_MovieRenderBackend` instance.
+        :param str ffmpeg_path: Optional FFmpeg executable path.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
+        :param frame_range: Optional (start, end) range of frames to render to a
+                            PNG image sequence, the end frame is excluded. The
+                            output path must then contain a ``{frame_number}``
+                            token.
+        :returns: A render job dictionary to pass to :func:`_wait_render_job`.
+        :raises ValueError: If a shot name is specified but can't be found in
+                            the sequence.
+        """
+        profile = profile or _DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE]
+        shot_renders = None
+        if ffmpeg_path and not shot_name and not frame_range:
+            shot_renders = self._unreal_get_shot_renders(
+                output_path, unreal_map_path, sequence_path, presets, profile
+            )
+        if frame_range:
+            render_output_path = output_path
+            render_outputs = []
+            if not profile["frame_rate"]:
+                render_outputs = [
+                    output_path.replace("{frame_number}", "%04d" % frame) for frame in range(*frame_range)
+                ]
+            shot_names = None
+        elif not shot_renders:
+            render_output_path = output_path
+            render_outputs = [output_path]
+            shot_names = None
+        else:
+            # Render shots which are not cached in a folder next to the movie.
+            render_cache = _ShotRenderCache(
+                os.path.join(unreal.Paths.project_saved_dir(), "ShotGrid", "render_cache"),
+                _RENDER_CACHE_MAX_SIZE,
+            )
+            render_folder = "%s_shots" % os.path.splitext(output_path)[0]
+            render_output_path = os.path.join(render_folder, "{shot_name}%s" % os.path.splitext(output_path)[1])
+            shot_names = []
+            render_outputs = []
+            for shot in shot_renders:
+                if render_cache.has(shot["fingerprint"]):
+                    continue
+                shot["render_path"] = render_output_path.replace("{shot_name}", shot["name"])
+                shot_names.append(shot["name"])
+                render_outputs.append(shot["render_path"])
+            self.logger.info(
+                "Rendering %d shot(s) out of %d for %s, other shots are cached." % (
+                    len(shot_names), len(shot_renders), output_path,
+                )
+            )
+            if not shot_names:
+                return {
+                    "output_path": output_path,
+                    "logger": self.logger,
+                    "shot_renders": shot_renders,
+                    "render_cache": render_cache,
+                    "ffmpeg_path": ffmpeg_path,
+                }
+            if os.path.isdir(render_folder):
+                shutil.rmtree(render_folder)
+            os.makedirs(render_folder)
+
+        manifest_path = self._unreal_save_movie_queue_manifest(
+            render_output_path,
+            unreal_map_path,
+            sequence_path,
+            presets,
+            shot_name,
+            shot_names,
+            profile,
+            frame_range,
+        )
+        telemetry = _RenderTelemetry(
+            os.path.abspath(
+                os.path.join(unreal.Paths.project_saved_dir(), "ShotGrid", "render_telemetry.jsonl")
+            ),
+            self.logger,
+            output_path=output_path,
+            sequence_path=sequence_path,
+            map_path=unreal_map_path,
+            shot_name=shot_name,
+            frame_range=frame_range,
+            presets=presets.get_path_name() if presets else None,
+            render_profile=profile.get("name"),
+        )
+        render_job = {
+            "output_path": output_path,
+            "outputs": render_outputs,
+            "frame_range": frame_range,
+            "map_path": unreal_map_path,
+            "sequence_path": sequence_path,
+            "shot_name": shot_name,
+            "project_name": unreal.SystemLibrary.get_game_name(),
+            "manifest_path": manifest_path,
+            "cmd_args": self._unreal_get_movie_queue_command(manifest_path, profile),
+            "cvars": profile.get("cvars") or [],
+            "env": _get_render_env(),
+            "logger": self.logger,
+            "telemetry": telemetry,
+        }
+        if shot_renders:
+            render_job.update({
+                "shot_renders": shot_renders,
+                "render_cache": render_cache,
+                "render_folder": render_folder,
+                "ffmpeg_path": ffmpeg_path,
+            })
+        backend.submit(render_job)
+        return render_job
+
+    def _unreal_get_shot_renders(self, output_path, unreal_map_path, sequence_path, presets=None, profile=None):
+        """
+        Return the shots of the given sequence with a fingerprint identifying
+        their render.
+
+        Fingerprints are built from the saved shot sub-sequence package, the
+        shot range and parameters in the sequence, the saved map package, the
+        presets, the render profile and the render command line.
+
+        :param str output_path: Full path to the movie to render.
+        :param str unreal_map_path: Path of the Unreal map in which to run the sequence.
+        :param str sequence_path: Content Browser path of sequence to render.
+        :param presets: Optional :class:`unreal.MoviePipelineMasterConfig` instance to use for renderig.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
+        :returns: A list of dictionaries with a "name" and a "fingerprint" key,
+                  in the order the shots appear in the sequence, or ``None`` if
+                  shots can't be rendered separately.
+        """
+        lvseq = unreal.load_asset(sequence_path, unreal.LevelSequence)
+        if not lvseq:
+            return None
+        common = [
+            unreal.SystemLibrary.get_engine_version(),
+            os.path.splitext(output_path)[1],
+            unreal_map_path,
+            _get_package_file_digest(unreal_map_path.split(".")[0]),
+        ]
+        if presets:
+            presets_path = presets.get_path_name()
+            common.extend([presets_path, _get_package_file_digest(presets_path.split(".")[0])])
+        profile = profile or _DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE]
+        common.append(json.dumps(profile, sort_keys=True))
+        # The manifest path is not part of the render settings.
+        common.extend(_get_render_args_without_manifest(self._unreal_get_movie_queue_command("", profile)))
+        if None in common:
+            self.logger.info("Unable to fingerprint renders of %s, all shots will be rendered." % sequence_path)
+            return None
+
+        shots = []
+        for track in lvseq.find_master_tracks_by_type(unreal.MovieSceneCinematicShotTrack):
+            for section in track.get_sections():
+                if not section.is_active():
+                    continue
+                try:
+                    shot_seq = section.get_sequence()
+                except AttributeError:
+                    continue
+                if not shot_seq:
+                    continue
+                shot_name = section.get_shot_display_name()
+                digest = _get_package_file_digest(shot_seq.get_path_name().split(".")[0])
+                if not digest:
+                    self.logger.info(
+                        "Unable to fingerprint shot %s of %s, all shots will be rendered." % (shot_name, sequence_path)
+                    )
+                    return None
+                shot_data = common + [
+                    shot_name,
+                    digest,
+                    section.get_start_frame(),
+                    section.get_end_frame(),
+                    "%s" % section.get_editor_property("parameters"),
+                ]
+                shots.append({
+                    "name": shot_name,
+                    "start_frame": section.get_start_frame(),
+                    "fingerprint": hashlib.sha1(
+                        json.dumps(shot_data, default=str).encode("utf-8")
+                    ).hexdigest(),
+                })
+        names = [shot["name"] for shot in shots]
+        if not shots or len(set(names)) != len(names):
+            self.logger.info("Shots of %s can't be rendered separately, all shots will be rendered." % sequence_path)
+            return None
+        shots.sort(key=lambda shot: shot["start_frame"])
+        return shots
+
+    def _unreal_save_movie_queue_manifest(self, output_path, unreal_map_path, sequence_path, presets=None, shot_name=None, shot_names=None, profile=None, frame_range=None):
+        """
+        Save a Movie Render Queue manifest to render the given sequence.
+
+        :param str output_path: Full path to the movie to render, the file name
+                                can contain Movie Render Queue tokens like
+                                ``{shot_name}``.
+        :param str unreal_map_path: Path of the Unreal map in which to run the sequence.
+        :param str sequence_path: Content Browser path of sequence to render.
+        :param presets: Optional :class:`unreal.MoviePipelineMasterConfig` instance to use for renderig.
+        :param str shot_name: Optional shot name to render a single shot from this sequence.
+        :param shot_names: Optional list of shot names to render from this sequence.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
+        :param frame_range: Optional (start, end) range of frames to render to a
+                            PNG image sequence, the end frame is excluded.
+        :returns: Full path to the saved manifest.
+        :raises ValueError: If a shot name is specified but can't be found in
+                            the sequence.
+        """
         output_folder, output_file = os.path.split(output_path)
         movie_name = os.path.splitext(output_file)[0]
+        profile = profile or _DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE]
 
         qsub = unreal.MoviePipelineQueueEngineSubsystem()
         queue = qsub.get_queue()
         job = queue.allocate_new_job(unreal.MoviePipelineExecutorJob)
         job.sequence = unreal.SoftObjectPath(sequence_path)
         job.map = unreal.SoftObjectPath(unreal_map_path)
-        # If a specific shot was given, disable all the others.
+        # If specific shots were given, disable all the others.
         if shot_name:
-            shot_found = False
+            shot_names = [shot_name]
+        if shot_names:
+            shots_found = set()
             for shot in job.shot_info:
-                if shot.outer_name != shot_name:
+                if shot.outer_name not in shot_names:
                     self.logger.info("Disabling shot %s" % shot.outer_name)
                     shot.enabled = False
                 else:
-                    shot_found = True
-            if not shot_found:
+                    shots_found.add(shot.outer_name)
+            missing_shots = [name for name in shot_names if name not in shots_found]
+            if missing_shots:
+                queue.delete_job(job)
                 raise ValueError(
-                    "Unable to find shot %s in sequence %s, aborting..." % (shot_name, sequence_path)
+                    "Unable to find shot %s in sequence %s, aborting..." % (", ".join(missing_shots), sequence_path)
                 )
         # Set settings from presets, if any
         if presets:
@@ -828,21 +1779,39 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         # https://docs.unrealengine.com/4.26/en-US/PythonAPI/class/MoviePipelineOutputSetting.html?highlight=setting#unreal.MoviePipelineOutputSetting
         output_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineOutputSetting)
         output_setting.output_directory = unreal.DirectoryPath(output_folder)
-        output_setting.output_resolution = unreal.IntPoint(1280, 720)
+        output_setting.output_resolution = unreal.IntPoint(*profile["resolution"])
         output_setting.file_name_format = movie_name
         output_setting.override_existing_output = True  # Overwrite existing files
-        # If needed we could enforce a frame rate, like for the Sequencer code.
-        # output_setting.output_frame_rate = unreal.FrameRate(24)
-        # output_setting.use_custom_frame_rate = True
+        if profile["frame_rate"]:
+            output_setting.output_frame_rate = unreal.FrameRate(int(profile["frame_rate"]))
+            output_setting.use_custom_frame_rate = True
+        # Anti-aliasing and warm-up, presets values are kept for values which
+        # are not set in the profile.
+        if any(profile[key] is not None for key in ["spatial_samples", "temporal_samples", "warm_up_frames"]):
+            aa_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
+            if profile["spatial_samples"] is not None:
+                aa_setting.spatial_sample_count = int(profile["spatial_samples"])
+            if profile["temporal_samples"] is not None:
+                aa_setting.temporal_sample_count = int(profile["temporal_samples"])
+            if profile["warm_up_frames"] is not None:
+                aa_setting.engine_warm_up_count = int(profile["warm_up_frames"])
+        if frame_range:
+            output_setting.use_custom_playback_range = True
+            output_setting.custom_start_frame = frame_range[0]
+            output_setting.custom_end_frame = frame_range[1]
+            output_setting.zero_pad_frame_numbers = 4
+            output_class = unreal.MoviePipelineImageSequenceOutput_PNG
+        else:
+            output_class = unreal.MoviePipelineAppleProResOutput
         # Remove problematic settings
-        for setting, reason in self._check_render_settings(config):
+        for setting, reason in self._check_render_settings(config, output_class):
             self.logger.warning("Disabling %s: %s." % (setting.get_name(), reason))
             config.remove_setting(setting)
 
         # Default rendering
         config.find_or_add_setting_by_class(unreal.MoviePipelineDeferredPassBase)
-        # Render to a movie
-        config.find_or_add_setting_by_class(unreal.MoviePipelineAppleProResOutput)
+        # Render to a movie or an image sequence
+        config.find_or_add_setting_by_class(output_class)
         # TODO: check which codec we should use.
 
         # We render in a forked process that we can control.
@@ -861,6 +1830,9 @@ class UnrealMoviePublishPlugin(HookBaseClass):
 
         # We can't control the name of the manifest file, so we save and then rename the file.
         _, manifest_path = unreal.MoviePipelineEditorLibrary.save_queue_to_manifest_file(queue)
+        # Each manifest must only contain its own job, remove it from the
+        # queue now that it is saved.
+        queue.delete_job(job)
 
         manifest_path = os.path.abspath(manifest_path)
         manifest_dir, manifest_file = os.path.split(manifest_path)
@@ -872,8 +1844,21 @@ class UnrealMoviePublishPlugin(HookBaseClass):
         os.replace(manifest_path, new_path)
 
         self.logger.debug("Queue manifest saved in %s" % new_path)
+        return new_path
+
+    def _unreal_get_movie_queue_command(self, manifest_path, profile=None):
+        """
+        Return the command line to render the given Movie Render Queue manifest
+        in a separate process.
+
+        :param str manifest_path: Full path to a saved manifest.
+        :param profile: Optional render profile dictionary, the default one is
+                        used if not set.
+        :returns: A list of command line arguments.
+        """
+        profile = profile or _DEFAULT_RENDER_PROFILES[_DEFAULT_RENDER_PROFILE]
         # We now need a path local to the unreal project "Saved" folder.
-        manifest_path = new_path.replace(
+        manifest_path = manifest_path.replace(
             "%s%s" % (
                 os.path.abspath(
                     os.path.join(unreal.SystemLibrary.get_project_directory(), "Saved")
@@ -898,52 +1883,1450 @@ class UnrealMoviePublishPlugin(HookBaseClass):
             "-NoLoadingScreen",
             "-FixedSeed",
             "-log",
+            # Send the log to stdout, it is parsed to report the render progress.
+            "-stdout",
+            "-FullStdOutLogOutput",
             "-Unattended",
             "-messaging",
             "-SessionName=\"Publish2 Movie Render\"",
             "-nohmd",
             "-windowed",
-            "-ResX=1280",
-            "-ResY=720",
-            # TODO: check what these settings are
-            "-dpcvars=%s" % ",".join([
-                "sg.ViewDistanceQuality=4",
-                "sg.AntiAliasingQuality=4",
-                "sg.ShadowQuality=4",
-                "sg.PostProcessQuality=4",
-                "sg.TextureQuality=4",
-                "sg.EffectsQuality=4",
-                "sg.FoliageQuality=4",
-                "sg.ShadingQuality=4",
-                "r.TextureStreaming=0",
-                "r.ForceLOD=0",
-                "r.SkeletalMeshLODBias=-10",
-                "r.ParticleLODBias=-10",
-                "foliage.DitheredLOD=0",
-                "foliage.ForceLOD=0",
-                "r.Shadow.DistanceScale=10",
-                "r.ShadowQuality=5",
-                "r.Shadow.RadiusThreshold=0.001000",
-                "r.ViewDistanceScale=50",
-                "r.D3D12.GPUTimeout=0",
-                "a.URO.Enable=0",
-            ]),
+            "-ResX=%d" % profile["resolution"][0],
+            "-ResY=%d" % profile["resolution"][1],
             "-execcmds=r.HLOD 0",
             # This need to be a path relative the to the Unreal project "Saved" folder.
             "-MoviePipelineConfig=\"%s\"" % manifest_path,
         ]
+        if profile["cvars"]:
+            cmd_args.insert(-2, "-dpcvars=%s" % ",".join(profile["cvars"]))
         unreal.log(
             "Movie Queue command-line arguments: {}".format(
                 " ".join(cmd_args)
             )
         )
-        # Make a shallow copy of the current environment and clear some variables
-        run_env = copy.copy(os.environ)
-        # Prevent SG TK to try to bootstrap in the new process
-        if "UE_SHOTGUN_BOOTSTRAP" in run_env:
-            del run_env["UE_SHOTGUN_BOOTSTRAP"]
-        if "UE_SHOTGRID_BOOTSTRAP" in run_env:
-            del run_env["UE_SHOTGRID_BOOTSTRAP"]
-        self.logger.info("Running %s" % cmd_args)
-        subprocess.call(cmd_args, env=run_env)
-        return os.path.isfile(output_path), output_path
+        return cmd_args
+
+
+class _MovieRenderScheduler(object):
+    """
+    Run Movie Render Queue renders in separate processes, with a limited
+    number of them running at the same time.
+
+    Jobs are identified by the path of the movie they render.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._max_workers = 0
+        self._jobs = {}
+
+    def submit(self, key, max_workers, func, backend, job, session=None):
+        """
+        Queue a render.
+
+        :param str key: Unique key for the job, typically the output movie path.
+        :param int max_workers: Maximum number of renders to run at the same time.
+        :param func: A callable running the render, called with the backend
+                     and the render job.
+        :param backend: A :class:`_MovieRenderBackend` instance.
+        :param job: A render job dictionary.
+        :param session: Optional publish session the job was submitted by.
+        """
+        with self._lock:
+            if self._executor is None or (not self._jobs and max_workers != self._max_workers):
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+                self._max_workers = max_workers
+            self._jobs[key] = (self._executor.submit(func, backend, job), backend, job, session)
+
+    def has_job(self, key):
+        """
+        Return True if a job was submitted for the given key and not yet
+        collected with :meth:`wait`.
+        """
+        with self._lock:
+            return key in self._jobs
+
+    def has_jobs(self, session=None):
+        """
+        Return True if some jobs were not yet collected with :meth:`wait`.
+
+        :param session: Optional publish session, only its jobs are considered
+                        if set.
+        """
+        with self._lock:
+            if session is None:
+                return bool(self._jobs)
+            return any(job[3] is session for job in self._jobs.values())
+
+    def get_job(self, key):
+        """
+        Return the render job dictionary submitted for the given key.
+
+        :param str key: Unique key for the job.
+        :returns: A render job dictionary or ``None``.
+        """
+        with self._lock:
+            if key not in self._jobs:
+                return None
+            return self._jobs[key][2]
+
+    def is_done(self, key):
+        """
+        Return True if the job with the given key completed, :meth:`wait` then
+        returns immediately.
+
+        :param str key: Unique key for the job.
+        """
+        with self._lock:
+            return self._jobs[key][0].done()
+
+    def cancel(self, key):
+        """
+        Cancel the job with the given key, it still needs to be collected with
+        :meth:`wait`.
+
+        :param str key: Unique key for the job.
+        """
+        with self._lock:
+            future, backend, job, _ = self._jobs[key]
+        # Jobs which did not start yet are simply dropped.
+        if not future.cancel():
+            backend.cancel(job)
+
+    def wait(self, key):
+        """
+        Wait for the job with the given key to complete and forget about it.
+
+        :param str key: Unique key for the job.
+        :returns: The value returned by the job callable, or a non zero exit
+                  code without telemetry if the job was cancelled before it
+                  started.
+        """
+        with self._lock:
+            future = self._jobs.pop(key)[0]
+        try:
+            return future.result()
+        except futures.CancelledError:
+            return 1, None
+
+
+class _MovieRenderWorker(object):
+    """
+    Client for the headless render worker run by ``movie_render_worker.py``.
+
+    The worker is an Unreal Editor process started on demand and kept running
+    between publishes. Jobs are queued as json files in the worker folder and
+    rendered one at a time, a heartbeat file tells if the worker is alive.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+
+    def render(self, folder, cmd_args, env, manifest_path, map_path, cvars, logger, telemetry=None):
+        """
+        Render the given Movie Render Queue manifest with the worker, starting
+        the worker if needed, and wait for the render to complete.
+
+        :param str folder: Full path to the worker folder.
+        :param cmd_args: A list of command line arguments to start the worker.
+        :param env: A dictionary with the environment for the worker process.
+        :param str manifest_path: Full path to the manifest to render.
+        :param str map_path: Path of the Unreal map in which to render.
+        :param cvars: A list of "<name>=<value>" console variables to set for
+                      the render.
+        :param logger: A standard logger.
+        :param telemetry: Optional :class:`_RenderTelemetry` instance.
+        :returns: A tuple with a boolean telling if the render succeeded and
+                  an error message or ``None``.
+        :raises RuntimeError: If the worker can't be started or stopped
+                              before the render completed.
+        """
+        with self._lock:
+            self._ensure_running(folder, cmd_args, env, logger)
+        job_id = uuid.uuid4().hex
+        job_path = os.path.join(folder, "jobs", "%s.json" % job_id)
+        result_path = os.path.join(folder, "results", "%s.json" % job_id)
+        _write_json_file(
+            job_path,
+            {
+                "manifest_path": manifest_path,
+                "map_path": map_path,
+                "cvars": cvars,
+                "submitted": time.time(),
+            }
+        )
+        logger.info("Queued render job %s for the render worker." % job_id)
+        if telemetry:
+            telemetry.enter_phase("queued")
+        while not os.path.isfile(result_path):
+            if not self._is_alive(folder):
+                if os.path.isfile(job_path):
+                    os.remove(job_path)
+                raise RuntimeError("render worker stopped before completing job %s" % job_id)
+            time.sleep(1)
+        with open(result_path, "r") as f:
+            result = json.load(f)
+        os.remove(result_path)
+        if telemetry and result.get("started"):
+            telemetry.enter_phase("render", result["started"])
+        return result["success"], result.get("error")
+
+    def _is_alive(self, folder):
+        """
+        Return True if the worker for the given folder is alive.
+
+        :param str folder: Full path to the worker folder.
+        """
+        if self._process is not None and self._process.poll() is not None:
+            return False
+        heartbeat = _read_json_file(os.path.join(folder, "worker.json"))
+        if not heartbeat:
+            return False
+        return time.time() - heartbeat.get("time", 0) < _RENDER_WORKER_STALE_DELAY
+
+    def _ensure_running(self, folder, cmd_args, env, logger):
+        """
+        Start the worker if it is not running and wait for its first heartbeat.
+
+        A worker started from another editor session for the same project is
+        reused.
+
+        :param str folder: Full path to the worker folder.
+        :param cmd_args: A list of command line arguments to start the worker.
+        :param env: A dictionary with the environment for the worker process.
+        :param logger: A standard logger.
+        :raises RuntimeError: If the worker can't be started.
+        """
+        heartbeat_path = os.path.join(folder, "worker.json")
+        heartbeat = _read_json_file(heartbeat_path)
+        if heartbeat and time.time() - heartbeat.get("time", 0) < _RENDER_WORKER_STALE_DELAY:
+            if self._process is None or self._process.poll() is None:
+                return
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        if os.path.isfile(heartbeat_path):
+            os.remove(heartbeat_path)
+        env = dict(env)
+        env["UE_SHOTGRID_RENDER_WORKER_FOLDER"] = folder
+        env["UE_SHOTGRID_RENDER_WORKER_IDLE_TIMEOUT"] = str(_RENDER_WORKER_IDLE_TIMEOUT)
+        logger.info("Starting render worker: %s" % " ".join(cmd_args))
+        self._process = subprocess.Popen(cmd_args, env=env)
+        start = time.time()
+        while not os.path.isfile(heartbeat_path):
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    "render worker exited with %s while starting" % self._process.returncode
+                )
+            if time.time() - start > _RENDER_WORKER_START_TIMEOUT:
+                self._process.kill()
+                raise RuntimeError(
+                    "render worker did not start in %d seconds" % _RENDER_WORKER_START_TIMEOUT
+                )
+            time.sleep(1)
+        logger.info("Render worker started in %.1f seconds." % (time.time() - start))
+
+
+# Persistent render worker shared by all publishes in this Unreal session.
+_RENDER_WORKER = _MovieRenderWorker()
+
+# Renders queued in the publish pass and collected in the finalize pass.
+_RENDER_SCHEDULER = _MovieRenderScheduler()
+
+# Version numbers to store in Level Sequences metadata, keyed by publish
+# session and asset path, saved all at once in the finalize pass.
+_PENDING_ASSET_VERSIONS = {}
+
+
+def _get_publish_session(item):
+    """
+    Return the publish session the given item belongs to.
+
+    Publishes can overlap, e.g. when a publish is started while renders of a
+    previous one are still running with Async Render, work deferred to the
+    finalize pass is tracked by session so each publish only waits for its own.
+
+    :param item: Item to process.
+    :returns: The root item of the item publish tree.
+    """
+    while getattr(item, "parent", None) is not None:
+        item = item.parent
+    return item
+
+
+class _VersionUploader(object):
+    """
+    Upload movies to SG Versions in background threads.
+
+    The SG API streams large files to storage in chunks. Failed uploads are
+    retried, with a growing delay between attempts.
+    """
+
+    def __init__(self, max_workers):
+        """
+        :param int max_workers: Maximum number of uploads to run at the same time.
+        """
+        self._lock = threading.Lock()
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._uploads = {}
+
+    def submit(self, session, tk, version_id, upload_path):
+        """
+        Queue the upload of a movie.
+
+        :param session: The publish session the upload is queued by.
+        :param tk: A :class:`sgtk.Sgtk` instance.
+        :param int version_id: The SG Version id to upload the movie to.
+        :param str upload_path: Full path to the movie to upload.
+        """
+        with self._lock:
+            self._uploads.setdefault(session, {})[upload_path] = self._executor.submit(
+                self._upload, tk, version_id, upload_path
+            )
+
+    def has_uploads(self, session):
+        """
+        Return True if some uploads of the given publish session were not yet
+        collected with :meth:`wait_all`.
+
+        :param session: A publish session.
+        """
+        with self._lock:
+            return bool(self._uploads.get(session))
+
+    def all_done(self, session):
+        """
+        Return True if all uploads queued by the given publish session
+        completed, :meth:`wait_all` then returns immediately.
+
+        :param session: A publish session.
+        """
+        with self._lock:
+            return all(upload.done() for upload in self._uploads.get(session, {}).values())
+
+    def wait_all(self, session):
+        """
+        Wait for all uploads queued by the given publish session to complete
+        and forget about them.
+
+        :param session: A publish session.
+        :returns: A potentially empty dictionary where keys are paths of movies
+                  which could not be uploaded and values the errors.
+        """
+        with self._lock:
+            uploads = self._uploads.pop(session, {})
+        failed = {}
+        for upload_path, upload in uploads.items():
+            try:
+                upload.result()
+            except Exception as e:
+                failed[upload_path] = e
+        return failed
+
+    @staticmethod
+    def _upload(tk, version_id, upload_path):
+        """
+        Upload the given movie, retrying on errors.
+
+        :param tk: A :class:`sgtk.Sgtk` instance.
+        :param int version_id: The SG Version id to upload the movie to.
+        :param str upload_path: Full path to the movie to upload.
+        """
+        for attempt in range(1, _UPLOAD_ATTEMPTS + 1):
+            try:
+                # tk.shotgun returns a connection specific to the current thread.
+                return tk.shotgun.upload(
+                    "Version",
+                    version_id,
+                    upload_path,
+                    "sg_uploaded_movie"
+                )
+            except Exception:
+                if attempt == _UPLOAD_ATTEMPTS:
+                    raise
+                time.sleep(2 ** attempt)
+
+
+# Movies being uploaded, waited for in the finalize pass.
+_VERSION_UPLOADER = _VersionUploader(_MAX_CONCURRENT_UPLOADS)
+
+
+class _AsyncRenderMonitor(object):
+    """
+    Collect renders left running by publishes with Async Render from Unreal's
+    tick, and register their publishes when they complete.
+
+    Renders run in the render scheduler threads, Unreal's tick only checks if
+    they completed, so the editor can be used while rendering. Their progress
+    is reported to the publish plugin logger and they can be cancelled with
+    an engine command.
+    """
+
+    def __init__(self):
+        self._entries = []
+        # Publish sessions whose uploads are waited for from Unreal's tick.
+        self._sessions = set()
+        self._tick_handle = None
+        self._logger = None
+        self._last_poll = 0
+        self._last_progress_log = 0
+
+    def add(self, plugin, settings, item, keys):
+        """
+        Collect the given render jobs from Unreal's tick and finalize the
+        publish of the given item when they complete.
+
+        :param plugin: The :class:`UnrealMoviePublishPlugin` instance.
+        :param settings: Dictionary of Settings.
+        :param item: Item to process.
+        :param keys: List of render job keys for the item.
+        """
+        self._entries.append({
+            "plugin": plugin,
+            "settings": settings,
+            "item": item,
+            "keys": keys,
+            "session": _get_publish_session(item),
+            "cancelled": False,
+        })
+        self._logger = plugin.logger
+        self._register_cancel_command(plugin)
+        if self._tick_handle is None:
+            self._last_progress_log = time.time()
+            self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def has_render(self, publish_path):
+        """
+        Return True if the movie with the given path is being rendered.
+
+        :param str publish_path: Normalized full path to the movie.
+        """
+        for entry in self._entries:
+            if os.path.normpath(entry["item"].properties["publish_path"]) == publish_path:
+                return True
+        return False
+
+    def cancel_all(self):
+        """
+        Cancel all renders, their publishes are not registered.
+        """
+        for entry in self._entries:
+            if entry["cancelled"]:
+                continue
+            entry["cancelled"] = True
+            entry["plugin"].logger.info("Cancelling render of %s..." % entry["item"].properties["publish_path"])
+            for key in entry["keys"]:
+                _RENDER_SCHEDULER.cancel(key)
+
+    def _register_cancel_command(self, plugin):
+        """
+        Register an engine command cancelling all renders, if not already done.
+
+        :param plugin: The :class:`UnrealMoviePublishPlugin` instance.
+        """
+        engine = plugin.parent.engine
+        if _ASYNC_RENDER_CANCEL_COMMAND in engine.commands:
+            return
+        try:
+            engine.register_command(
+                _ASYNC_RENDER_CANCEL_COMMAND,
+                self.cancel_all,
+                {
+                    "short_name": "cancel_background_renders",
+                    "description": "Cancel movie renders running in the background for publishes.",
+                    "app": plugin.parent,
+                }
+            )
+        except Exception as e:
+            plugin.logger.warning("Unable to register the %s command: %s" % (_ASYNC_RENDER_CANCEL_COMMAND, e))
+
+    def _on_tick(self, delta_seconds):
+        """
+        Called by Unreal after each tick, finalize the publishes whose renders
+        completed.
+
+        :param float delta_seconds: Seconds elapsed since the last tick.
+        """
+        now = time.time()
+        if now - self._last_poll < _ASYNC_RENDER_POLL_INTERVAL:
+            return
+        self._last_poll = now
+        # Exceptions must not escape from the tick callback.
+        try:
+            for entry in list(self._entries):
+                if all(_RENDER_SCHEDULER.is_done(key) for key in entry["keys"]):
+                    self._entries.remove(entry)
+                    self._sessions.add(entry["session"])
+                    self._complete(entry)
+            if self._entries and now - self._last_progress_log > _ASYNC_RENDER_PROGRESS_INTERVAL:
+                self._last_progress_log = now
+                self._log_progress()
+            # Wait for uploads of publish sessions whose renders were all
+            # registered.
+            for session in list(self._sessions):
+                if any(entry["session"] is session for entry in self._entries):
+                    continue
+                if not _VERSION_UPLOADER.all_done(session):
+                    continue
+                self._sessions.remove(session)
+                failed = _VERSION_UPLOADER.wait_all(session)
+                for upload_path, error in failed.items():
+                    self._logger.error("Failed to upload %s: %s" % (upload_path, error))
+        except Exception as e:
+            self._logger.exception("Unable to collect background renders: %s" % e)
+            self._sessions.clear()
+        if not self._entries and not self._sessions:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+
+    def _complete(self, entry):
+        """
+        Finalize the publish for the given completed entry.
+
+        :param entry: An entry dictionary, as built by :meth:`add`.
+        """
+        plugin = entry["plugin"]
+        publish_path = entry["item"].properties["publish_path"]
+        if entry["cancelled"]:
+            for key in entry["keys"]:
+                _RENDER_SCHEDULER.wait(key)
+            plugin.logger.warning("Render of %s was cancelled, it was not published." % publish_path)
+            return
+        try:
+            plugin._finalize_async_render(entry["settings"], entry["item"])
+        except Exception as e:
+            plugin.logger.error("Unable to publish %s: %s" % (publish_path, e))
+        else:
+            plugin.logger.info("Published %s." % publish_path)
+
+    def _log_progress(self):
+        """
+        Report the progress of all renders to the logger.
+        """
+        statuses = []
+        for entry in self._entries:
+            rendered = 0
+            phase = None
+            for key in entry["keys"]:
+                job = _RENDER_SCHEDULER.get_job(key)
+                telemetry = job.get("telemetry") if job else None
+                if telemetry:
+                    rendered += telemetry.frames_rendered
+                    phase = phase or telemetry.phase
+            status = "%s %s" % (
+                os.path.basename(entry["item"].properties["publish_path"]),
+                "cancelling" if entry["cancelled"] else (phase or "pending"),
+            )
+            if rendered:
+                status += ", %d frames" % rendered
+            statuses.append(status)
+        self._logger.info(
+            "%d movie(s) rendering in the background: %s." % (len(statuses), "; ".join(statuses))
+        )
+
+
+# Renders collected from Unreal's tick with Async Render.
+_ASYNC_RENDER_MONITOR = _AsyncRenderMonitor()
+
+
+class _RenderTelemetry(object):
+    """
+    Track the progress and the phases timings of a Movie Render Queue render.
+
+    Progress is parsed from the render log, reported to the logger and a json
+    record is appended to a json lines file when the render completes, so
+    render times can be compared across publishes.
+    """
+
+    # Lock used to append records from multiple threads.
+    _record_lock = threading.Lock()
+
+    def __init__(self, record_path, logger, **info):
+        """
+        Instantiate a new :class:`_RenderTelemetry`.
+
+        :param str record_path: Full path to the json lines file where records
+                                are appended.
+        :param logger: A standard logger.
+        :param info: Additional values to store in the record.
+        """
+        self._record_path = record_path
+        self._logger = logger
+        self._info = info
+        self._backend = None
+        self._phases = []
+        self._shot = (0, 0)
+        self._frame = (0, 0)
+        self._frames_completed = 0
+        self._last_progress_log = 0
+        # Last lines of the log, reported if the render fails.
+        self._tail = collections.deque(maxlen=20)
+
+    @property
+    def phase(self):
+        """
+        The current phase name, or ``None``.
+        """
+        return self._phases[-1][0] if self._phases else None
+
+    @property
+    def frames_rendered(self):
+        """
+        Number of frames rendered so far, across all shots.
+        """
+        return self._frames_completed + self._frame[0]
+
+    def start(self, backend):
+        """
+        Start tracking a render.
+
+        :param str backend: How the render is run, e.g. "process" or "worker".
+        """
+        self._backend = backend
+        self._phases = [("startup", time.time())]
+
+    def enter_phase(self, name, when=None):
+        """
+        Enter the given phase, if not already in it or past it.
+
+        :param str name: A phase name from ``_RENDER_PHASES``.
+        :param float when: Optional time at which the phase started.
+        """
+        if self.phase and _RENDER_PHASES.index(name) <= _RENDER_PHASES.index(self.phase):
+            return
+        self._phases.append((name, when or time.time()))
+        self._logger.debug("Render of %s entered %s phase." % (self._info.get("output_path"), name))
+
+    def feed(self, line):
+        """
+        Update the progress from the given render log line.
+
+        :param str line: A line from the render log.
+        """
+        line = line.rstrip()
+        self._tail.append(line)
+        if not _RENDER_LOG_PIPELINE_RE.search(line):
+            return
+        self.enter_phase("warm_up")
+        if _RENDER_LOG_WARM_UP_RE.search(line):
+            return
+        match = _RENDER_LOG_SHOT_RE.search(line)
+        if match:
+            shot = (int(match.group(1)), int(match.group(2)))
+            if shot[0] != self._shot[0]:
+                # Count the frames of the previous shot, if any
+                self._frames_completed += self._frame[1] or self._frame[0]
+                self._frame = (0, 0)
+            self._shot = shot
+        match = _RENDER_LOG_FRAME_RE.search(line)
+        if match:
+            self.enter_phase("render")
+            self._frame = (int(match.group(1)), int(match.group(2)))
+            self._log_progress()
+        elif self.phase == "render" and _RENDER_LOG_ENCODE_RE.search(line):
+            self.enter_phase("encode")
+
+    def _log_progress(self):
+        """
+        Report the render progress to the logger, at most every few seconds.
+        """
+        now = time.time()
+        if now - self._last_progress_log < _RENDER_PROGRESS_LOG_INTERVAL:
+            return
+        self._last_progress_log = now
+        fps = self._get_fps(now)
+        message = "Rendering %s: frame %d/%d" % (
+            os.path.basename(self._info.get("output_path") or ""), self._frame[0], self._frame[1]
+        )
+        if self._shot[1]:
+            message += ", shot %d/%d" % self._shot
+        if fps:
+            message += ", %.1f fps" % fps
+            # Assume remaining shots have as many frames as the current one.
+            remaining = self._frame[1] - self._frame[0]
+            remaining += max(0, self._shot[1] - self._shot[0]) * self._frame[1]
+            message += ", ETA %ds" % (remaining / fps)
+        self._logger.info(message)
+
+    def _get_fps(self, now):
+        """
+        Return the average number of frames rendered per second.
+
+        :param float now: Current time.
+        :returns: A float or ``None`` if not rendering yet.
+        """
+        for name, start in self._phases:
+            if name == "render" and now > start:
+                return self.frames_rendered / (now - start)
+        return None
+
+    def finish(self, exit_code):
+        """
+        Stop tracking the render, report the phases timings and append the
+        render record to the records file.
+
+        :param int exit_code: The render exit code.
+        :returns: The render record, a dictionary.
+        """
+        now = time.time()
+        phases = {}
+        for i, (name, start) in enumerate(self._phases):
+            end = self._phases[i + 1][1] if i + 1 < len(self._phases) else now
+            phases[name] = round(end - start, 3)
+        started = self._phases[0][1] if self._phases else now
+        fps = None
+        if phases.get("render") and self.frames_rendered:
+            fps = round(self.frames_rendered / phases["render"], 3)
+        record = dict(self._info)
+        record.update({
+            "backend": self._backend,
+            "started": datetime.datetime.fromtimestamp(started).isoformat(),
+            "duration": round(now - started, 3),
+            "exit_code": exit_code,
+            "shots": self._shot[1],
+            "frames": self.frames_rendered,
+            "fps": fps,
+            "phases": phases,
+        })
+        self._logger.info(
+            "Rendered %s in %.1fs (%s)." % (
+                record.get("output_path"),
+                record["duration"],
+                ", ".join("%s %.1fs" % (name, phases[name]) for name in _RENDER_PHASES if name in phases),
+            )
+        )
+        if exit_code and self._tail:
+            self._logger.error(
+                "Render of %s exited with %s, last log lines:\n%s" % (
+                    record.get("output_path"), exit_code, "\n".join(self._tail)
+                )
+            )
+        try:
+            with self._record_lock:
+                folder = os.path.dirname(self._record_path)
+                if not os.path.isdir(folder):
+                    os.makedirs(folder)
+                with open(self._record_path, "a") as f:
+                    f.write("%s\n" % json.dumps(record))
+        except (IOError, OSError) as e:
+            self._logger.warning("Unable to write render record to %s: %s" % (self._record_path, e))
+        return record
+
+
+class _MovieRenderBackend(object):
+    """
+    Base class for backends running saved Movie Render Queue manifests.
+
+    Render jobs are dictionaries with the output, map, sequence and manifest
+    paths, the command line and environment to render the manifest, a logger
+    and a :class:`_RenderTelemetry` instance.
+
+    Jobs are submitted from the main thread, where Unreal can be accessed, and
+    waited for from any thread.
+    """
+
+    #: Whether renders are done by workers outside of this Unreal session, the
+    #: publish is then always registered in the finalize pass.
+    deferred = False
+
+    def submit(self, job):
+        """
+        Submit the given render job.
+
+        :param job: A render job dictionary, which can be updated.
+        """
+        job["telemetry"].start(self.name)
+
+    def wait(self, job):
+        """
+        Wait for the given render job to complete.
+
+        :param job: A render job dictionary.
+        :returns: A tuple with the exit code of the render, 0 if it succeeded,
+                  and the telemetry record.
+        """
+        raise NotImplementedError
+
+    def cancel(self, job):
+        """
+        Cancel the given render job, :meth:`wait` then returns as soon as
+        possible with a non zero exit code.
+
+        :param job: A render job dictionary.
+        """
+        job["cancelled"] = True
+
+    @property
+    def name(self):
+        """
+        The backend name.
+        """
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.name
+
+
+class _LocalRenderBackend(_MovieRenderBackend):
+    """
+    Render backend running renders on this machine, in a new Unreal process or
+    with the persistent render worker.
+    """
+
+    def __init__(self, worker=None):
+        """
+        Instantiate a new :class:`_LocalRenderBackend`.
+
+        :param worker: Optional dictionary with the render worker folder and
+                       command line, the render worker is used if set.
+        """
+        self._worker = worker
+        # Protect render processes started from other threads.
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        """
+        The backend name.
+        """
+        return "worker" if self._worker else "process"
+
+    def wait(self, job):
+        """
+        Render the given job and wait for the render to complete.
+
+        The render falls back to a new Unreal process if the worker is not
+        available. The process log is then parsed to report the render progress.
+        Cancelled renders are not started, renders already running in a new
+        Unreal process are killed. Renders run by the worker can't be stopped.
+
+        :param job: A render job dictionary.
+        :returns: A tuple with the exit code of the render, 0 if it succeeded,
+                  and the telemetry record.
+        """
+        logger = job["logger"]
+        telemetry = job["telemetry"]
+        if job.get("cancelled"):
+            return 1, telemetry.finish(1)
+        if self._worker:
+            try:
+                success, error = _RENDER_WORKER.render(
+                    self._worker["folder"],
+                    self._worker["cmd_args"],
+                    job["env"],
+                    job["manifest_path"],
+                    job["map_path"],
+                    job["cvars"],
+                    logger,
+                    telemetry,
+                )
+            except (RuntimeError, OSError) as e:
+                logger.warning("Unable to render with the render worker, %s." % e)
+                telemetry.start("process")
+            else:
+                if not success:
+                    logger.error("Render worker failed to render: %s" % error)
+                exit_code = 0 if success else 1
+                return exit_code, telemetry.finish(exit_code)
+        with self._lock:
+            if job.get("cancelled"):
+                return 1, telemetry.finish(1)
+            logger.info("Running %s" % job["cmd_args"])
+            process = subprocess.Popen(
+                job["cmd_args"],
+                env=job["env"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                errors="replace",
+            )
+            job["process"] = process
+        for line in process.stdout:
+            telemetry.feed(line)
+        exit_code = process.wait()
+        if job.get("cancelled"):
+            logger.warning("Render of %s was cancelled." % job["output_path"])
+        return exit_code, telemetry.finish(exit_code)
+
+    def cancel(self, job):
+        """
+        Cancel the given render job, killing its render process if running.
+
+        :param job: A render job dictionary.
+        """
+        with self._lock:
+            super(_LocalRenderBackend, self).cancel(job)
+            process = job.get("process")
+            if process and process.poll() is None:
+                process.kill()
+
+
+class _QueueFolderRenderBackend(_MovieRenderBackend):
+    """
+    Render backend submitting renders to a shared queue folder, where they are
+    picked up by render farm workers.
+
+    Queue folder layout::
+
+        manifests/<id>.utxt  Movie Render Queue manifests.
+        jobs/<id>.json       Pending jobs, claimed by workers by moving them
+                             to the running folder.
+        running/<id>.json    Jobs being rendered.
+        results/<id>.json    Job results written by the workers, with a
+                             "success" boolean and an "error" message.
+
+    Workers must have access to the same Unreal project and to the output
+    paths. They render each job with the Unreal project and the job
+    command line arguments, adding a ``-MoviePipelineConfig`` argument for the
+    manifest copied to the Unreal project "Saved" folder.
+    See ``render_queue_stub_worker.py`` for a minimal worker.
+    """
+
+    deferred = True
+
+    def __init__(self, folder):
+        """
+        Instantiate a new :class:`_QueueFolderRenderBackend`.
+
+        :param str folder: Full path to the shared queue folder.
+        """
+        self._folder = folder
+
+    @property
+    def name(self):
+        """
+        The backend name.
+        """
+        return "queue_folder"
+
+    def __str__(self):
+        return "render queue %s" % self._folder
+
+    def submit(self, job):
+        """
+        Copy the job manifest to the queue folder and write the job descriptor.
+
+        :param job: A render job dictionary, updated with the job id.
+        """
+        super(_QueueFolderRenderBackend, self).submit(job)
+        job_id = uuid.uuid4().hex
+        manifest_folder = os.path.join(self._folder, "manifests")
+        if not os.path.isdir(manifest_folder):
+            os.makedirs(manifest_folder)
+        manifest_name = "%s%s" % (job_id, os.path.splitext(job["manifest_path"])[1])
+        shutil.copyfile(job["manifest_path"], os.path.join(manifest_folder, manifest_name))
+        _write_json_file(
+            os.path.join(self._folder, "jobs", "%s.json" % job_id),
+            {
+                "version": 1,
+                "id": job_id,
+                "submitted": time.time(),
+                "user": getpass.getuser(),
+                "host": socket.gethostname(),
+                "project_name": job["project_name"],
+                "map_path": job["map_path"],
+                "sequence_path": job["sequence_path"],
+                "shot_name": job["shot_name"],
+                "output_path": job["output_path"],
+                # Files written by the render.
+                "outputs": job["outputs"],
+                "manifest": manifest_name,
+                # Arguments to pass after the Unreal project, without the
+                # manifest which is local to each Unreal project.
+                "args": _get_render_args_without_manifest(job["cmd_args"]),
+            }
+        )
+        job["id"] = job_id
+        job["telemetry"].enter_phase("queued")
+        job["logger"].info("Submitted render job %s to %s." % (job_id, self._folder))
+
+    def wait(self, job):
+        """
+        Wait for a worker to report the given render job completion.
+
+        :param job: A render job dictionary.
+        :returns: A tuple with the exit code of the render, 0 if it succeeded,
+                  and the telemetry record.
+        """
+        logger = job["logger"]
+        telemetry = job["telemetry"]
+        result_path = os.path.join(self._folder, "results", "%s.json" % job["id"])
+        start = time.time()
+        last_log = start
+        while not os.path.isfile(result_path):
+            now = time.time()
+            if job.get("cancelled"):
+                logger.warning("Render job %s of %s was cancelled." % (job["id"], job["output_path"]))
+                return 1, telemetry.finish(1)
+            if now - start > _RENDER_QUEUE_TIMEOUT:
+                logger.error(
+                    "Render job %s did not complete in %d seconds." % (job["id"], _RENDER_QUEUE_TIMEOUT)
+                )
+                return 1, telemetry.finish(1)
+            if now - last_log > 60:
+                last_log = now
+                status = "pending"
+                if os.path.isfile(os.path.join(self._folder, "running", "%s.json" % job["id"])):
+                    status = "running"
+                    telemetry.enter_phase("render")
+                logger.info(
+                    "Waiting for render job %s of %s, %s for %ds..." % (
+                        job["id"], job["output_path"], status, now - start
+                    )
+                )
+            time.sleep(_RENDER_QUEUE_POLL_INTERVAL)
+        result = _read_json_file(result_path) or {}
+        if result.get("started"):
+            telemetry.enter_phase("render", result["started"])
+        for path in [
+            result_path,
+            os.path.join(self._folder, "manifests", "%s%s" % (job["id"], os.path.splitext(job["manifest_path"])[1])),
+        ]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if not result.get("success"):
+            logger.error(
+                "Render job %s failed on %s: %s" % (job["id"], result.get("host"), result.get("error"))
+            )
+            return 1, telemetry.finish(1)
+        logger.info("Render job %s completed on %s." % (job["id"], result.get("host")))
+        return 0, telemetry.finish(0)
+
+    def cancel(self, job):
+        """
+        Cancel the given render job, withdrawing it from the queue folder if
+        no worker claimed it yet.
+
+        Jobs already claimed by a worker are rendered anyway, their result is
+        ignored.
+
+        :param job: A render job dictionary.
+        """
+        super(_QueueFolderRenderBackend, self).cancel(job)
+        try:
+            os.remove(os.path.join(self._folder, "jobs", "%s.json" % job["id"]))
+        except OSError:
+            return
+        try:
+            os.remove(
+                os.path.join(
+                    self._folder, "manifests", "%s%s" % (job["id"], os.path.splitext(job["manifest_path"])[1])
+                )
+            )
+        except OSError:
+            pass
+
+
+def _wait_render_job(backend, job):
+    """
+    Wait for the given render job to complete with the given backend.
+
+    If the job renders shots separately, rendered shots are added to the shot
+    render cache and the movie is assembled from the shot renders.
+
+    :param backend: A :class:`_MovieRenderBackend` instance.
+    :param job: A render job dictionary.
+    :returns: A tuple with the exit code of the render, 0 if it succeeded,
+              and the telemetry record, if any.
+    """
+    record = None
+    if job.get("telemetry"):
+        exit_code, record = backend.wait(job)
+        if exit_code or not job.get("shot_renders"):
+            return exit_code, record
+    logger = job["logger"]
+    render_cache = job["render_cache"]
+    try:
+        if job.get("cancelled"):
+            return 1, record
+        for shot in job["shot_renders"]:
+            if shot.get("render_path"):
+                if not os.path.isfile(shot["render_path"]):
+                    logger.error("Unable to find render of shot %s in %s" % (shot["name"], shot["render_path"]))
+                    return 1, record
+                render_cache.add(shot["fingerprint"], shot["render_path"])
+        segments = [render_cache.get(shot["fingerprint"]) for shot in job["shot_renders"]]
+        if None in segments:
+            logger.error("Some shot renders are missing from %s" % render_cache)
+            return 1, record
+        logger.info("Assembling %s from %d shot renders..." % (job["output_path"], len(segments)))
+        exit_code = _concatenate_movies(job["ffmpeg_path"], segments, job["output_path"])
+        if exit_code:
+            logger.error("Unable to assemble %s, FFmpeg exited with %s" % (job["output_path"], exit_code))
+        return exit_code, record
+    finally:
+        if job.get("render_folder") and os.path.isdir(job["render_folder"]):
+            shutil.rmtree(job["render_folder"], ignore_errors=True)
+        render_cache.prune()
+
+
+def _wait_render_chunk(backend, job, attempts=_RENDER_CHUNK_ATTEMPTS):
+    """
+    Wait for the given frame range render job to complete with the given
+    backend, rendering it again if it failed.
+
+    :param backend: A :class:`_MovieRenderBackend` instance.
+    :param job: A render job dictionary, with the folder where frames are
+                rendered and the number of frames expected, if known.
+    :param int attempts: Maximum number of times the frame range is rendered.
+    :returns: A tuple with the exit code of the render, 0 if it succeeded,
+              and the telemetry record.
+    """
+    logger = job["logger"]
+    exit_code, record = 1, None
+    for attempt in range(attempts):
+        if job.get("cancelled"):
+            break
+        if attempt:
+            logger.warning(
+                "Rendering frames %d-%d of %s again." % (
+                    job["frame_range"][0], job["frame_range"][1] - 1, job["sequence_path"]
+                )
+            )
+            for name in os.listdir(job["frames_folder"]):
+                os.remove(os.path.join(job["frames_folder"], name))
+            backend.submit(job)
+        exit_code, record = backend.wait(job)
+        frames = len([name for name in os.listdir(job["frames_folder"]) if name.endswith(".png")])
+        if exit_code:
+            logger.warning("Render of frames %d-%d exited with %s." % (
+                job["frame_range"][0], job["frame_range"][1] - 1, exit_code
+            ))
+        elif not frames or (job["expected_frames"] and frames != job["expected_frames"]):
+            logger.warning("Render of frames %d-%d only wrote %d frames." % (
+                job["frame_range"][0], job["frame_range"][1] - 1, frames
+            ))
+            exit_code = 1
+        else:
+            return 0, record
+    return exit_code, record
+
+
+def _encode_image_sequence(ffmpeg_path, frames_folder, frame_rate, output_path):
+    """
+    Encode the frames rendered in the given folder to an Apple ProRes movie
+    with FFmpeg, using all the available cores.
+
+    Frames are read from the folder sub-folders sorted by name, and renamed to
+    be numbered contiguously.
+
+    :param str ffmpeg_path: Full path to the FFmpeg executable.
+    :param str frames_folder: Full path to the folder with the rendered frames.
+    :param str frame_rate: The movie frame rate, e.g. "24" or "30000/1001".
+    :param str output_path: Full path to the movie to write.
+    :returns: The FFmpeg exit code.
+    """
+    encode_folder = os.path.join(frames_folder, "encode")
+    os.makedirs(encode_folder)
+    frame_count = 0
+    for chunk_name in sorted(os.listdir(frames_folder)):
+        chunk_folder = os.path.join(frames_folder, chunk_name)
+        if chunk_folder == encode_folder or not os.path.isdir(chunk_folder):
+            continue
+        for name in sorted(os.listdir(chunk_folder)):
+            if not name.endswith(".png"):
+                continue
+            os.replace(
+                os.path.join(chunk_folder, name),
+                os.path.join(encode_folder, "frame.%06d.png" % frame_count),
+            )
+            frame_count += 1
+    return subprocess.call([
+        ffmpeg_path,
+        "-y",
+        "-loglevel", "error",
+        "-framerate", frame_rate,
+        "-start_number", "0",
+        "-i", os.path.join(encode_folder, "frame.%06d.png"),
+        "-threads", "%d" % (os.cpu_count() or 1),
+        "-c:v", "prores_ks",
+        "-profile:v", "2",
+        "-pix_fmt", "yuv422p10le",
+        output_path,
+    ])
+
+
+def _concatenate_movies(ffmpeg_path, movies, output_path):
+    """
+    Concatenate the given movies with FFmpeg, without re-encoding them.
+
+    :param str ffmpeg_path: Full path to the FFmpeg executable.
+    :param movies: A list of full paths to movies with the same format.
+    :param str output_path: Full path to the movie to write.
+    :returns: The FFmpeg exit code.
+    """
+    fd, list_path = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(fd, "w") as f:
+            for movie in movies:
+                f.write("file '%s'\n" % movie.replace("\\", "/").replace("'", "'\\''"))
+        return subprocess.call([
+            ffmpeg_path,
+            "-y",
+            "-loglevel", "error",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", list_path,
+            "-c", "copy",
+            output_path,
+        ])
+    finally:
+        os.remove(list_path)
+
+
+class _ShotRenderCache(object):
+    """
+    A cache of shot renders, keyed by the fingerprint of their render.
+
+    Each render is stored in the cache folder with its fingerprint as file
+    name. The modification time of the files is updated when they are used
+    so the least recently used renders can be removed when the cache size
+    exceeds its maximum size.
+    """
+
+    def __init__(self, folder, max_size):
+        """
+        Instantiate a new :class:`_ShotRenderCache`.
+
+        :param str folder: Full path to the cache folder.
+        :param int max_size: Maximum size of the cache, in bytes.
+        """
+        self._folder = os.path.abspath(folder)
+        self._max_size = max_size
+
+    def __str__(self):
+        return self._folder
+
+    def _find(self, fingerprint):
+        """
+        Return the path of the cached render for the given fingerprint.
+
+        :param str fingerprint: A shot render fingerprint.
+        :returns: A full path or ``None``.
+        """
+        if not os.path.isdir(self._folder):
+            return None
+        for name in os.listdir(self._folder):
+            if os.path.splitext(name)[0] == fingerprint:
+                return os.path.join(self._folder, name)
+        return None
+
+    def has(self, fingerprint):
+        """
+        Return True if a render is cached for the given fingerprint.
+
+        :param str fingerprint: A shot render fingerprint.
+        """
+        return self._find(fingerprint) is not None
+
+    def get(self, fingerprint):
+        """
+        Return the cached render for the given fingerprint and mark it as used.
+
+        :param str fingerprint: A shot render fingerprint.
+        :returns: A full path or ``None``.
+        """
+        path = self._find(fingerprint)
+        if path:
+            os.utime(path, None)
+        return path
+
+    def add(self, fingerprint, path):
+        """
+        Move the given render to the cache.
+
+        :param str fingerprint: The shot render fingerprint.
+        :param str path: Full path to the render.
+        """
+        if not os.path.isdir(self._folder):
+            os.makedirs(self._folder)
+        cache_path = os.path.join(self._folder, "%s%s" % (fingerprint, os.path.splitext(path)[1]))
+        shutil.move(path, cache_path)
+        os.utime(cache_path, None)
+
+    def prune(self):
+        """
+        Remove least recently used renders until the cache size is below its
+        maximum size.
+        """
+        if not os.path.isdir(self._folder):
+            return
+        entries = []
+        for name in os.listdir(self._folder):
+            path = os.path.join(self._folder, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(entry[1] for entry in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+
+
+# Available render backends, by name.
+_RENDER_BACKENDS = {
+    "local": _LocalRenderBackend,
+    "queue_folder": _QueueFolderRenderBackend,
+}
+
+
+def _get_render_args_without_manifest(cmd_args):
+    """
+    Return the arguments of the given Movie Render Queue command line which
+    follow the Unreal project, without the manifest argument.
+
+    :param cmd_args: A list of command line arguments.
+    :returns: A list of command line arguments.
+    """
+    return [arg for arg in cmd_args[2:] if not arg.startswith("-MoviePipelineConfig=")]
+
+
+def _get_package_file_digest(package_name):
+    """
+    Return a digest of the saved file for the given package.
+
+    Only packages from the project content folder are handled.
+
+    :param str package_name: An Unreal package name, e.g. "/Game/Cine/Seq_010".
+    :returns: A sha1 hex digest or ``None`` if the package file can't be found.
+    """
+    if not package_name.startswith("/Game/"):
+        return None
+    content_dir = unreal.Paths.convert_relative_path_to_full(
+        unreal.Paths.project_content_dir()
+    )
+    for ext in (".uasset", ".umap"):
+        package_file = os.path.join(content_dir, package_name[len("/Game/"):] + ext)
+        if not os.path.isfile(package_file):
+            continue
+        digest = hashlib.sha1()
+        with open(package_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return None
+
+
+def _write_json_file(path, data):
+    """
+    Atomically write the given data as json in the given file.
+
+    :param str path: Full path to the file to write.
+    :param data: Data to serialize.
+    """
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json_file(path):
+    """
+    Read the json data in the given file.
+
+    :param str path: Full path to the file to read.
+    :returns: The deserialized data, or ``None`` if the file can't be read.
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _get_render_env():
+    """
+    Return the environment to use for render processes.
+
+    :returns: A dictionary.
+    """
+    # Make a shallow copy of the current environment and clear some variables
+    run_env = copy.copy(os.environ)
+    # Prevent SG TK to try to bootstrap in the new process
+    if "UE_SHOTGUN_BOOTSTRAP" in run_env:
+        del run_env["UE_SHOTGUN_BOOTSTRAP"]
+    if "UE_SHOTGRID_BOOTSTRAP" in run_env:
+        del run_env["UE_SHOTGRID_BOOTSTRAP"]
+    return run_env
+
+
+def _is_asset_registry_metadata_tag(tag):
+    """
+    Return True if the given metadata tag is stored in the Asset Registry data.
+
+    :param str tag: A metadata tag name.
+    """
+    try:
+        settings = unreal.get_default_object(unreal.AssetManagerSettings)
+        registry_tags = settings.get_editor_property("meta_data_tags_for_asset_registry")
+    except Exception:
+        # Not available with this Unreal version
+        return False
+    return tag in ["%s" % registry_tag for registry_tag in registry_tags]
+
+
+def _get_available_memory():
+    """
+    Return the amount of physical memory currently available, in bytes.
+
+    :returns: An integer or ``None`` if it can't be retrieved.
+    """
+    if sys.platform == "win32":
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+        return status.ullAvailPhys
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _get_max_concurrent_renders(requested=0):
+    """
+    Return how many renders can run at the same time.
+
+    :param int requested: Number of concurrent renders requested, 0 or less to
+                          use as many as the available cores and memory allow.
+    :returns: An integer, at least 1.
+    """
+    limit = max(1, (os.cpu_count() or 1) // _CORES_PER_RENDER)
+    available_memory = _get_available_memory()
+    if available_memory:
+        limit = min(limit, max(1, available_memory // _MEMORY_PER_RENDER))
+    if requested > 0:
+        limit = min(limit, requested)
+    return int(limit)
@@ -0,0 +1,194 @@
+# This file is based on templates provided and copyrighted by Autodesk, Inc.
+# This file has been modified by Epic Games, Inc. and is subject to the license
+# file included in this repository.
+
+"""
+Minimal worker for Movie Render Queue jobs submitted to a render queue folder
+by the movie publish plugin with the "queue_folder" Render Backend.
+
+This script is not a Toolkit hook, it is meant to test the render queue
+locally and to document what a render farm worker needs to do::
+
+    python render_queue_stub_worker.py <queue folder> --unreal <Unreal editor> --project <.uproject>
+
+Each job is claimed by moving its descriptor to the running folder, its
+manifest is copied to the Unreal project "Saved" folder and rendered with the
+job command line arguments. A result file is written when the render
+completes. With ``--simulate`` no render is done, empty movie files are
+written instead.
+"""
+
+import argparse
+import getpass
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+
+def write_json(path, data):
+    """
+    Atomically write the given data as json in the given file.
+
+    :param str path: Full path to the file to write.
+    :param data: Data to serialize.
+    """
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def claim_next_job(folder):
+    """
+    Claim the oldest pending job in the given queue folder, if any.
+
+    :param str folder: Full path to the queue folder.
+    :returns: A job dictionary or ``None``.
+    """
+    jobs_folder = os.path.join(folder, "jobs")
+    if not os.path.isdir(jobs_folder):
+        return None
+    names = [name for name in os.listdir(jobs_folder) if name.endswith(".json")]
+    names.sort(key=lambda name: os.path.getmtime(os.path.join(jobs_folder, name)))
+    running_folder = os.path.join(folder, "running")
+    if not os.path.isdir(running_folder):
+        os.makedirs(running_folder)
+    for name in names:
+        running_path = os.path.join(running_folder, name)
+        try:
+            # Renaming the file claims the job, it fails if another worker
+            # claimed it first.
+            os.rename(os.path.join(jobs_folder, name), running_path)
+            with open(running_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print("Unable to claim job %s: %s" % (name, e))
+    return None
+
+
+def render_job(folder, job, unreal_path, project_path, simulate=False):
+    """
+    Render the given job.
+
+    :param str folder: Full path to the queue folder.
+    :param job: A job dictionary.
+    :param str unreal_path: Full path to the Unreal editor executable.
+    :param str project_path: Full path to the Unreal project.
+    :param bool simulate: If True, write empty movie files instead of
+                          rendering.
+    :returns: A tuple with a boolean telling if the render succeeded and
+              an error message or ``None``.
+    """
+    # Frame numbers of image sequences rendered with a custom frame rate
+    # are not known, no output is listed for them.
+    outputs = job.get("outputs", [job["output_path"]])
+    if simulate:
+        for output in outputs:
+            output_folder = os.path.dirname(output)
+            if not os.path.isdir(output_folder):
+                os.makedirs(output_folder)
+            open(output, "wb").close()
+        return True, None
+
+    # The manifest must be in the Unreal project "Saved" folder and given with
+    # a path relative to it.
+    saved_folder = os.path.join(os.path.dirname(project_path), "Saved")
+    manifest_path = os.path.join(
+        "MovieRenderPipeline", "RenderQueue_%s" % job["manifest"]
+    )
+    local_manifest_path = os.path.join(saved_folder, manifest_path)
+    if not os.path.isdir(os.path.dirname(local_manifest_path)):
+        os.makedirs(os.path.dirname(local_manifest_path))
+    shutil.copyfile(
+        os.path.join(folder, "manifests", job["manifest"]), local_manifest_path
+    )
+    try:
+        cmd_args = [unreal_path, project_path]
+        cmd_args.extend(job["args"])
+        cmd_args.append('-MoviePipelineConfig="%s"' % manifest_path)
+        print("Running %s" % " ".join(cmd_args))
+        env = dict(os.environ)
+        # Prevent SG TK to try to bootstrap in the render process
+        env.pop("UE_SHOTGUN_BOOTSTRAP", None)
+        env.pop("UE_SHOTGRID_BOOTSTRAP", None)
+        exit_code = subprocess.call(cmd_args, env=env)
+    finally:
+        os.remove(local_manifest_path)
+    missing = [output for output in outputs if not os.path.isfile(output)]
+    if missing:
+        return False, "Render process exited with %s without writing %s" % (
+            exit_code,
+            ", ".join(missing),
+        )
+    return True, None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("folder", help="Render queue folder")
+    parser.add_argument("--unreal", default=None, help="Unreal editor executable")
+    parser.add_argument("--project", default=None, help="Unreal project file")
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Write empty movie files instead of rendering",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Exit when no job is pending"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=5, help="Seconds between queue checks"
+    )
+    args = parser.parse_args()
+    if not args.simulate and not (args.unreal and args.project):
+        parser.error("--unreal and --project are required unless --simulate is set")
+
+    print("Processing render jobs in %s as %s" % (args.folder, getpass.getuser()))
+    while True:
+        job = claim_next_job(args.folder)
+        if not job:
+            if args.once:
+                return 0
+            time.sleep(args.poll_interval)
+            continue
+        print("Rendering job %s: %s" % (job["id"], job["output_path"]))
+        started = time.time()
+        try:
+            success, error = render_job(
+                args.folder, job, args.unreal, args.project, args.simulate
+            )
+        except Exception:
+            success, error = False, traceback.format_exc()
+        write_json(
+            os.path.join(args.folder, "results", "%s.json" % job["id"]),
+            {
+                "id": job["id"],
+                "success": success,
+                "error": error,
+                "host": socket.gethostname(),
+                "started": started,
+                "completed": time.time(),
+            },
+        )
+        os.remove(os.path.join(args.folder, "running", "%s.json" % job["id"]))
+        print("Job %s completed: %s" % (job["id"], "success" if success else error))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,15 +6,127 @@
 # Source Code License included in this distribution package. See LICENSE.
 
 import copy
+import json
 import os
+import shutil
+import socket
 import tempfile
+import threading
+import time
 import uuid
+from concurrent import futures
 
 import sgtk
-from tank_vendor import yaml
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
+# Maximum number of thumbnails written at the same time.
+_MAX_THUMBNAIL_WORKERS = 8
+
+# Name of the background publish status journal, written next to the tree file.
+_STATUS_JOURNAL_NAME = "monitor_status.jsonl"
+# Statuses, named after the tk-multi-bg-publish constants, reported in the
+# status journal after each phase completed, and when the background
+# publishing process died after the phase.
+_PHASE_STATUSES = {
+    "validate": "RUNNING",
+    "publish": "RUNNING",
+    "finalize": "SUCCESS",
+}
+_PHASE_FAILED_STATUSES = {
+    None: "VALIDATION_FAILED",
+    "validate": "PUBLISH_FAILED",
+    "publish": "FINALIZE_FAILED",
+}
+
+# Environment variable to set the maximum number of background publishing
+# processes running at the same time on this machine.
+_MAX_PUBLISH_PROCESSES_ENV_VAR = "SGTK_BG_PUBLISH_MAX_PROCESSES"
+_DEFAULT_MAX_PUBLISH_PROCESSES = 2
+# Priority of background publishes, can be overridden with the
+# "bg_publish_priority" property of the tree root item.
+_DEFAULT_PUBLISH_PRIORITY = 50
+# Seconds between two checks of the publish queue, seconds after which a
+# background publish which never reported being alive is considered dead and
+# seconds after which a dispatch lock is considered left by a session which died.
+_PUBLISH_QUEUE_POLL_INTERVAL = 5
+_PUBLISH_QUEUE_START_TIMEOUT = 30 * 60
+_PUBLISH_QUEUE_LOCK_TIMEOUT = 60
+# Background publishing processes and sessions with queued publishes rewrite a
+# heartbeat file every _HEARTBEAT_INTERVAL seconds, they are considered dead
+# when it was not updated for _HEARTBEAT_TIMEOUT seconds.
+_HEARTBEAT_INTERVAL = 30
+_HEARTBEAT_TIMEOUT = 5 * 60
+# Name of the background publishing process heartbeat file, written next to
+# the tree file.
+_PROCESS_HEARTBEAT_NAME = "bg_process.json"
+# Background publish folders are removed when they were not modified for
+# _RETENTION_MAX_AGE seconds, or oldest first when they use more than
+# _RETENTION_MAX_SIZE bytes, but never before _RETENTION_MIN_AGE seconds.
+# Clean ups are done at most every _RETENTION_INTERVAL seconds.
+_RETENTION_MAX_AGE = 7 * 24 * 60 * 60
+_RETENTION_MAX_SIZE = 5 * 1024 * 1024 * 1024
+_RETENTION_MIN_AGE = 60 * 60
+_RETENTION_INTERVAL = 60 * 60
+
+
+def append_status_records(journal_path, records):
+    """
+    Append the given item or task state changes to the given status journal.
+
+    Records are written as json lines in a single write to the file opened in
+    append mode, so records of concurrent writers are not interleaved.
+
+    :param str journal_path: Full path to the status journal.
+    :param records: A list of dictionaries with the "uuid" of an item or a
+        task and the values which changed, e.g. its "status".
+    """
+    now = time.time()
+    lines = []
+    for record in records:
+        record = dict(record)
+        record.setdefault("time", now)
+        lines.append("%s\n" % json.dumps(record))
+    fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, "".join(lines).encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def read_status_journal(journal_path, state=None, offset=0):
+    """
+    Fold the records of the given status journal into the current state of
+    the items and tasks.
+
+    To tail the journal, call it again with the returned state and offset,
+    only the records appended since are then read.
+
+    :param str journal_path: Full path to the status journal.
+    :param state: Optional state returned by a previous call.
+    :param int offset: Optional offset returned by a previous call.
+    :returns: A tuple with the state, a dictionary where keys are item or task
+        uuids and values their merged records, and the offset of the first
+        record which was not read.
+    """
+    state = {} if state is None else state
+    if not os.path.isfile(journal_path):
+        return state, offset
+    with open(journal_path, "rb") as fp:
+        fp.seek(offset)
+        for line in fp:
+            if not line.endswith(b"\n"):
+                # the record is being written, read it next time
+                break
+            offset += len(line)
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+            if record.get("uuid"):
+                state.setdefault(record["uuid"], {}).update(record)
+    return state, offset
+
 
 class PostPhase(HookBaseClass):
     """
@@ -24,6 +136,19 @@ class PostPhase(HookBaseClass):
     See the PublishTree documentation for additional details on how to traverse the tree and manipulate it.
     """
 
+    def post_validate(self, publish_tree):
+        """
+        This method is executed after the validation pass has completed for
+        each item in the tree, before the publish pass.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance representing
+            the items to be published.
+        """
+        # let the session which queued the background publish know that this process is alive, for as long as it runs
+        if publish_tree.root_item.properties.get("in_bg_process"):
+            self._start_process_heartbeat(publish_tree)
+            self._journal_phase(publish_tree, "validate")
+
     def post_publish(self, publish_tree):
         """
         This method is executed after the publish pass has completed for each
@@ -63,11 +188,112 @@ class PostPhase(HookBaseClass):
         bg_processing = publish_tree.root_item.properties.get("bg_processing")
         in_bg_process = publish_tree.root_item.properties.get("in_bg_process")
 
+        # in the background publishing process, only report that the items were published
+        if bg_processing and in_bg_process:
+            self._start_process_heartbeat(publish_tree)
+            self._journal_phase(publish_tree, "publish")
+
         # we only want to run the actions if we're going to publish in background but we're not already in the
         # background publishing process
         if not bg_processing or in_bg_process:
             return
 
+        # get the path to the folder where all the files used by the background publishing process will be stored
+        root_folder_path = os.path.join(
+            bg_publish_app.cache_location, current_engine.name
+        )
+        if not os.path.exists(root_folder_path):
+            os.makedirs(root_folder_path)
+        tmp_folder_path = tempfile.mkdtemp(dir=root_folder_path)
+
+        # write the item thumbnails to the publish folder, so we can access them later in the bg process, while the
+        # tree is being updated
+        thumbnail_executor = futures.ThreadPoolExecutor(
+            max_workers=_MAX_THUMBNAIL_WORKERS
+        )
+        try:
+            thumbnails = self._submit_thumbnails(
+                publish_tree, tmp_folder_path, thumbnail_executor
+            )
+            monitor_data["items"] = self._add_task_uuids(publish_tree, bg_publish_app)
+            for item, thumbnail in thumbnails:
+                thumbnail_path = thumbnail.result()
+                if thumbnail_path:
+                    item._thumbnail_path = thumbnail_path
+        finally:
+            thumbnail_executor.shutdown(wait=False)
+
+        # build the path to these files
+        self.__TREE_FILE_PATH = os.path.join(tmp_folder_path, "publish_tree.yml")
+        monitor_file_path = os.path.join(tmp_folder_path, "monitor.yml")
+        journal_path = os.path.join(tmp_folder_path, _STATUS_JOURNAL_NAME)
+
+        # start the status journal with the initial state of all items and tasks, state changes are appended to it
+        # so the monitor data never needs to be rewritten
+        publish_tree.root_item.properties["bg_status_journal"] = journal_path
+        status_records = []
+        for item_data in monitor_data["items"]:
+            status_records.append(
+                {
+                    "uuid": item_data["uuid"],
+                    "name": item_data["name"],
+                    "status": item_data["status"],
+                }
+            )
+            for task_data in item_data["tasks"]:
+                status_records.append(
+                    {
+                        "uuid": task_data["uuid"],
+                        "item": item_data["uuid"],
+                        "name": task_data["name"],
+                        "status": task_data["status"],
+                    }
+                )
+        append_status_records(journal_path, status_records)
+
+        # finally, save the publish tree and the monitor data to the files
+        # the monitor data is written as json, which can be read as yaml, since dumping it as yaml is much slower
+        self._save_tree(publish_tree, self.__TREE_FILE_PATH)
+        with open(monitor_file_path, "w+") as fp:
+            json.dump(monitor_data, fp)
+
+        self.logger.info(
+            "Background Publish files have been saved on disk.",
+            extra={"action_show_folder": {"path": tmp_folder_path}},
+        )
+
+        # the tree file is complete, queue it and hand it off to a background publishing process right away if
+        # one is available, instead of waiting for the finalize pass
+        queue_folder_path = os.path.join(root_folder_path, "publish_queue")
+        _PUBLISH_QUEUE.submit(
+            queue_folder_path,
+            self.__TREE_FILE_PATH,
+            publish_tree.root_item.properties.get(
+                "bg_publish_priority", _DEFAULT_PUBLISH_PRIORITY
+            ),
+        )
+        _PUBLISH_QUEUE.dispatch(queue_folder_path, bg_publish_app, self.logger)
+
+        # remove folders of previous background publishes which are no longer needed
+        _PUBLISH_FOLDER_RETENTION.run_in_background(
+            root_folder_path, queue_folder_path, self.logger
+        )
+
+        # ------------------------------------------------------------------------
+
+    def _add_task_uuids(self, publish_tree, bg_publish_app):
+        """
+        Give the items and their active tasks a unique identifier and build the
+        monitor data for them.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance representing
+            the items to be published.
+        :param bg_publish_app: The tk-multi-bg-publish app instance.
+        :returns: A list of monitor item dictionaries.
+        """
+        monitor_items = []
+        uuid_setting = None
+
         # modify the publish tree in order to add a new property/setting on the fly in order to give
         # the item/task a unique identifier
         # this will be very useful to track the tasks progress on the monitor side
@@ -75,11 +301,6 @@ class PostPhase(HookBaseClass):
         # at the same time, start to build the monitor tree
         for item in publish_tree:
 
-            # if the item has a thumbnail, download it and make sure we can access it later in the bg process
-            thumbnail_path = item.get_thumbnail_as_path()
-            if thumbnail_path:
-                item._thumbnail_path = thumbnail_path
-
             item_uuid = str(uuid.uuid4())
             item_data = {
                 "name": item.name,
@@ -92,55 +313,180 @@ class PostPhase(HookBaseClass):
             for task in item.tasks:
                 if task.active:
 
-                    # as we can't create a PublishSetting object using the Publish API, convert the task to a dict then
-                    # add the new setting to finally reset the task from the dict
-                    uuid_setting = {
-                        "name": "Task UUID",
-                        "type": "str",
-                        "default_value": None,
-                        "description": "UUID of the current task",
-                        "value": str(uuid.uuid4()),
-                    }
-                    dummy_task_dict = task.to_dict()
-                    dummy_task_dict["settings"]["Task UUID"] = uuid_setting
-                    dummy_task = task.from_dict(dummy_task_dict, None)
-                    task.settings["Task UUID"] = dummy_task.settings["Task UUID"]
+                    # the setting is built once, then copied for each task
+                    if uuid_setting is None:
+                        uuid_setting = self._create_uuid_setting(task)
+                    task_uuid_setting = copy.copy(uuid_setting)
+                    task_uuid_setting.value = str(uuid.uuid4())
+                    task.settings["Task UUID"] = task_uuid_setting
 
                     item_data["tasks"].append(
                         {
                             "name": task.name,
-                            "uuid": uuid_setting["value"],
+                            "uuid": task_uuid_setting.value,
                             "status": bg_publish_app.constants.WAITING_TO_START,
                         }
                     )
 
             if item_data["tasks"]:
                 item.properties.uuid = item_uuid
-                monitor_data["items"].append(item_data)
+                monitor_items.append(item_data)
 
-        # get the path to the folder where all the files used by the background publishing process will be stored
-        root_folder_path = os.path.join(
-            bg_publish_app.cache_location, current_engine.name
-        )
-        if not os.path.exists(root_folder_path):
-            os.makedirs(root_folder_path)
-        tmp_folder_path = tempfile.mkdtemp(dir=root_folder_path)
+        return monitor_items
 
-        # build the path to these files
-        self.__TREE_FILE_PATH = os.path.join(tmp_folder_path, "publish_tree.yml")
-        monitor_file_path = os.path.join(tmp_folder_path, "monitor.yml")
+    def _create_uuid_setting(self, task):
+        """
+        Create a "Task UUID" setting without value.
 
-        # finally, save the publish tree and the monitor data to the files
-        publish_tree.save_file(self.__TREE_FILE_PATH)
-        with open(monitor_file_path, "w+") as fp:
-            yaml.safe_dump(monitor_data, fp)
+        As we can't create a PublishSetting object using the Publish API, convert the given task to a dict then add
+        the new setting to finally rebuild a task from the dict and get the setting from it.
 
-        self.logger.info(
-            "Background Publish files have been saved on disk.",
-            extra={"action_show_folder": {"path": tmp_folder_path}},
+        :param task: A :ref:`publish-api-task` instance.
+        :returns: A PublishSetting instance.
+        """
+        dummy_task_dict = task.to_dict()
+        dummy_task_dict["settings"]["Task UUID"] = {
+            "name": "Task UUID",
+            "type": "str",
+            "default_value": None,
+            "description": "UUID of the current task",
+            "value": None,
+        }
+        dummy_task = task.from_dict(dummy_task_dict, None)
+        return dummy_task.settings["Task UUID"]
+
+    def _submit_thumbnails(self, publish_tree, folder, executor):
+        """
+        Write the thumbnails of the items in the tree to the given folder with
+        the given executor.
+
+        Thumbnails which are already files are used as is. Others are converted
+        to images in this thread, as pixmaps can only be used from the main
+        thread, and the images are saved by the executor.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance representing
+            the items to be published.
+        :param str folder: Full path to the folder where thumbnails are written.
+        :param executor: A :class:`futures.Executor` instance.
+        :returns: A list of (item, future) tuples, where each future returns
+            the path to the item thumbnail or ``None``.
+        """
+        thumbnails = []
+        for item in publish_tree:
+            thumbnail_path = item._thumbnail_path
+            if thumbnail_path and os.path.isfile(thumbnail_path):
+                thumbnail = futures.Future()
+                thumbnail.set_result(thumbnail_path)
+                thumbnails.append((item, thumbnail))
+                continue
+            pixmap = item.thumbnail
+            if not pixmap or pixmap.isNull():
+                continue
+            thumbnails.append(
+                (
+                    item,
+                    executor.submit(
+                        self._save_thumbnail,
+                        pixmap.toImage(),
+                        os.path.join(folder, "thumbnail_%s.jpg" % uuid.uuid4().hex),
+                    ),
+                )
+            )
+        return thumbnails
+
+    @staticmethod
+    def _save_thumbnail(image, path):
+        """
+        Save the given image to the given path.
+
+        :param image: A :class:`QtGui.QImage` instance.
+        :param str path: Full path to the file to write.
+        :returns: The path to the file or ``None`` if it could not be written.
+        """
+        if image.save(path) and os.path.getsize(path) > 0:
+            return path
+        return None
+
+    def _save_tree(self, publish_tree, path):
+        """
+        Stream the publish tree to the given file.
+
+        The tree is written to a temporary file which is then renamed, so the
+        background publishing process never reads a partially written tree.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance to save.
+        :param str path: Full path to the file to write.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", buffering=1024 * 1024) as fp:
+                publish_tree.save(fp)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read_monitor_status(self, tree_file_path, state=None, offset=0):
+        """
+        Return the current state of the items and tasks of a background
+        publish, folded from the status journal next to its tree file.
+
+        :param str tree_file_path: Full path to the publish tree file.
+        :param state: Optional state returned by a previous call.
+        :param int offset: Optional offset returned by a previous call.
+        :returns: A (state, offset) tuple, see :func:`read_status_journal`.
+        """
+        return read_status_journal(
+            os.path.join(os.path.dirname(tree_file_path), _STATUS_JOURNAL_NAME),
+            state,
+            offset,
         )
 
-        # ------------------------------------------------------------------------
+    def _start_process_heartbeat(self, publish_tree):
+        """
+        Start writing the background publishing process heartbeat next to the
+        tree file, if not already done.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance representing
+            the items being published.
+        """
+        journal_path = publish_tree.root_item.properties.get("bg_status_journal")
+        if not journal_path or not os.path.isdir(os.path.dirname(journal_path)):
+            return
+        _PROCESS_HEARTBEAT.start(
+            os.path.join(os.path.dirname(journal_path), _PROCESS_HEARTBEAT_NAME)
+        )
+
+    def _journal_phase(self, publish_tree, phase):
+        """
+        Report in the status journal that the given phase completed for the
+        items and the active tasks of the tree, with their new status.
+
+        :param publish_tree: The :ref:`publish-api-tree` instance representing
+            the items being published.
+        :param str phase: The name of the phase which completed.
+        """
+        journal_path = publish_tree.root_item.properties.get("bg_status_journal")
+        if not journal_path or not os.path.isdir(os.path.dirname(journal_path)):
+            return
+        bg_publish_app = sgtk.platform.current_engine().apps.get("tk-multi-bg-publish")
+        record = {"phase": phase}
+        status = _get_status(bg_publish_app, _PHASE_STATUSES[phase])
+        if status is not None:
+            record["status"] = status
+        status_records = []
+        for item in publish_tree:
+            item_uuid = item.properties.get("uuid")
+            if not item_uuid:
+                continue
+            status_records.append(dict(record, uuid=item_uuid))
+            for task in item.tasks:
+                if task.active and "Task UUID" in task.settings:
+                    status_records.append(
+                        dict(record, uuid=task.settings["Task UUID"].value)
+                    )
+        append_status_records(journal_path, status_records)
 
     def post_finalize(self, publish_tree):
         """
@@ -170,11 +516,594 @@ class PostPhase(HookBaseClass):
         bg_processing = publish_tree.root_item.properties.get("bg_processing")
         in_bg_process = publish_tree.root_item.properties.get("in_bg_process")
 
+        if bg_processing and in_bg_process:
+            self._journal_phase(publish_tree, "finalize")
+            _PROCESS_HEARTBEAT.stop()
+
         # we only want to run the actions if we're going to publish in background mode but we're not already in the
         # background publishing process
         if bg_processing and not in_bg_process:
             current_engine = sgtk.platform.current_engine()
             bg_publish_app = current_engine.apps.get("tk-multi-bg-publish")
-            # launch the background publishing process and show the monitor app
-            bg_publish_app.launch_publish_process(self.__TREE_FILE_PATH)
+            # the background publish was queued in the publish pass, show the monitor app
             bg_publish_app.create_panel()
+
+
+class _PublishQueue(object):
+    """
+    Local queue of background publishes, shared by all the sessions of an
+    engine on this machine.
+
+    Tree files are queued by priority and handed to tk-multi-bg-publish by a
+    fixed number of slots, each slot starting a background publishing process
+    for the next tree file when its previous one completed. A background
+    publish is considered completed when the status journal reports that all
+    its items were finalized, or when its process stopped writing its
+    heartbeat, e.g. because it failed.
+
+    Slots are freed by any session dispatching from the queue folder. Pending
+    tree files queued by a session which is gone, e.g. because the editor was
+    closed, are expired instead of being published.
+
+    Queue folder layout::
+
+        jobs/<rank>-<id>.json   Pending tree files, sorted by priority then
+                                submission time.
+        running/<id>.json       Tree files being published.
+        sessions/<id>.json      Heartbeats of the sessions which queued tree
+                                files.
+        dispatch.lock           Held while a session starts publishes.
+    """
+
+    def __init__(self):
+        self._folders = set()
+        self._timer = None
+
+    def submit(self, folder, tree_file_path, priority=_DEFAULT_PUBLISH_PRIORITY):
+        """
+        Queue the given tree file.
+
+        :param str folder: Full path to the queue folder.
+        :param str tree_file_path: Full path to the publish tree file.
+        :param int priority: Priority between 0 and 100, higher priorities are
+            published first.
+        """
+        job_id = uuid.uuid4().hex
+        priority = max(0, min(100, int(priority)))
+        jobs_folder = os.path.join(folder, "jobs")
+        if not os.path.isdir(jobs_folder):
+            os.makedirs(jobs_folder)
+        # the file name gives the order in which jobs are started
+        _write_json_file(
+            os.path.join(
+                jobs_folder, "%03d-%.6f-%s.json" % (100 - priority, time.time(), job_id)
+            ),
+            {
+                "id": job_id,
+                "tree_file_path": tree_file_path,
+                "priority": priority,
+                "submitted": time.time(),
+                "session": _SESSION_ID,
+            },
+        )
+        _write_session_heartbeat(folder)
+        self._folders.add(folder)
+
+    def dispatch(self, folder, bg_publish_app, logger):
+        """
+        Start background publishes for queued tree files while slots are
+        available, and keep dispatching from a timer while some tree files are
+        queued or being published.
+
+        :param str folder: Full path to the queue folder.
+        :param bg_publish_app: The tk-multi-bg-publish app instance.
+        :param logger: A standard logger.
+        """
+        self._folders.add(folder)
+        self._dispatch(bg_publish_app, logger)
+        if self._timer is None and self._folders:
+            from sgtk.platform.qt import QtCore
+
+            self._timer = QtCore.QTimer()
+            self._timer.timeout.connect(lambda: self._dispatch(bg_publish_app, logger))
+            self._timer.start(_PUBLISH_QUEUE_POLL_INTERVAL * 1000)
+
+    def _dispatch(self, bg_publish_app, logger):
+        """
+        Start background publishes in all known queue folders and stop the
+        timer when they are all empty.
+
+        :param bg_publish_app: The tk-multi-bg-publish app instance.
+        :param logger: A standard logger.
+        """
+        for folder in list(self._folders):
+            try:
+                if not self._dispatch_folder(folder, bg_publish_app, logger):
+                    self._folders.discard(folder)
+            except Exception as e:
+                logger.warning(
+                    "Unable to start background publishes from %s: %s" % (folder, e)
+                )
+        if not self._folders and self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _dispatch_folder(self, folder, bg_publish_app, logger):
+        """
+        Start background publishes in the given queue folder while slots are
+        available.
+
+        :param str folder: Full path to the queue folder.
+        :param bg_publish_app: The tk-multi-bg-publish app instance.
+        :param logger: A standard logger.
+        :returns: True if some tree files are queued or being published.
+        """
+        jobs_folder = os.path.join(folder, "jobs")
+        running_folder = os.path.join(folder, "running")
+        for path in [jobs_folder, running_folder]:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+        _write_session_heartbeat(folder)
+        lock_path = os.path.join(folder, "dispatch.lock")
+        if not self._acquire_lock(lock_path):
+            # another session is dispatching, check again later
+            return True
+        try:
+            running = 0
+            for name in os.listdir(running_folder):
+                running_path = os.path.join(running_folder, name)
+                job = _read_json_file(running_path)
+                if job is None or _is_completed(job):
+                    if job is not None:
+                        try:
+                            _journal_failures(job, bg_publish_app)
+                        except Exception as e:
+                            # the slot must be freed anyway
+                            logger.warning(
+                                "Unable to report the failure of %s: %s"
+                                % (job["tree_file_path"], e)
+                            )
+                    os.remove(running_path)
+                else:
+                    running += 1
+            names = []
+            for name in sorted(os.listdir(jobs_folder)):
+                if not name.endswith(".json"):
+                    continue
+                job = _read_json_file(os.path.join(jobs_folder, name))
+                if job is not None and _is_orphaned(folder, job):
+                    logger.warning(
+                        "Expiring background publish of %s, the session which queued it is gone."
+                        % job["tree_file_path"]
+                    )
+                    os.remove(os.path.join(jobs_folder, name))
+                else:
+                    names.append(name)
+            _remove_stale_session_heartbeats(folder)
+            max_processes = _get_max_publish_processes()
+            while names and running < max_processes:
+                name = names.pop(0)
+                job = _read_json_file(os.path.join(jobs_folder, name))
+                os.remove(os.path.join(jobs_folder, name))
+                if job is None or not os.path.isfile(job["tree_file_path"]):
+                    continue
+                job["started"] = time.time()
+                _write_json_file(
+                    os.path.join(running_folder, "%s.json" % job["id"]), job
+                )
+                running += 1
+                logger.info(
+                    "Starting background publish of %s, %d queued."
+                    % (job["tree_file_path"], len(names))
+                )
+                bg_publish_app.launch_publish_process(job["tree_file_path"])
+            if names:
+                logger.debug(
+                    "%d background publishes queued, %d running."
+                    % (len(names), running)
+                )
+            return bool(names or running)
+        finally:
+            os.remove(lock_path)
+
+    @staticmethod
+    def _acquire_lock(lock_path):
+        """
+        Create the given lock file, breaking it if it was left by a session
+        which died.
+
+        :param str lock_path: Full path to the lock file.
+        :returns: True if the lock was acquired.
+        """
+        try:
+            if time.time() - os.path.getmtime(lock_path) > _PUBLISH_QUEUE_LOCK_TIMEOUT:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except OSError:
+            return False
+        return True
+
+
+def _is_completed(job):
+    """
+    Return True if the background publish of the given running job completed.
+
+    :param job: A job dictionary.
+    """
+    tree_folder = os.path.dirname(job["tree_file_path"])
+    if not os.path.isdir(tree_folder):
+        return True
+    journal_path = os.path.join(tree_folder, _STATUS_JOURNAL_NAME)
+    state, _ = read_status_journal(journal_path)
+    items = [record for record in state.values() if "item" not in record]
+    if items and all(record.get("phase") == "finalize" for record in items):
+        return True
+    # failed publishes don't report it, consider them completed when their process is dead
+    heartbeat_path = os.path.join(tree_folder, _PROCESS_HEARTBEAT_NAME)
+    if os.path.isfile(heartbeat_path):
+        return not _is_alive(heartbeat_path)
+    return time.time() - job["started"] > _PUBLISH_QUEUE_START_TIMEOUT
+
+
+def _journal_failures(job, bg_publish_app):
+    """
+    Report in the status journal of the given completed job that its items
+    and tasks which were not finalized failed, in the phase which followed the
+    last one they completed.
+
+    :param job: A job dictionary.
+    :param bg_publish_app: The tk-multi-bg-publish app instance.
+    """
+    journal_path = os.path.join(
+        os.path.dirname(job["tree_file_path"]), _STATUS_JOURNAL_NAME
+    )
+    if not os.path.isfile(journal_path):
+        return
+    state, _ = read_status_journal(journal_path)
+    status_records = []
+    for record_uuid, record in state.items():
+        phase = record.get("phase")
+        if phase == "finalize" or record.get("error"):
+            continue
+        failed_record = {
+            "uuid": record_uuid,
+            "error": "The background publishing process stopped after the %s phase."
+            % (phase or "start"),
+        }
+        status = _get_status(bg_publish_app, _PHASE_FAILED_STATUSES[phase])
+        if status is not None:
+            failed_record["status"] = status
+        status_records.append(failed_record)
+    if status_records:
+        append_status_records(journal_path, status_records)
+
+
+def _get_status(bg_publish_app, name):
+    """
+    Return the value of the given tk-multi-bg-publish status constant.
+
+    :param bg_publish_app: The tk-multi-bg-publish app instance.
+    :param str name: The name of the status constant.
+    :returns: The status value, or ``None`` if the app does not define it.
+    """
+    return getattr(bg_publish_app.constants, name, None)
+
+
+def _is_orphaned(folder, job):
+    """
+    Return True if the session which queued the given pending job is gone.
+
+    :param str folder: Full path to the queue folder.
+    :param job: A job dictionary.
+    """
+    if not job.get("session"):
+        # queued before sessions were tracked
+        return time.time() - job["submitted"] > _HEARTBEAT_TIMEOUT
+    return not _is_alive(os.path.join(folder, "sessions", "%s.json" % job["session"]))
+
+
+def _is_alive(heartbeat_path):
+    """
+    Return True if the given heartbeat file was updated recently.
+
+    :param str heartbeat_path: Full path to a heartbeat file.
+    """
+    try:
+        return time.time() - os.path.getmtime(heartbeat_path) < _HEARTBEAT_TIMEOUT
+    except OSError:
+        return False
+
+
+def _write_session_heartbeat(folder):
+    """
+    Report that this session is alive in the given queue folder.
+
+    Sessions dispatch from a timer while their tree files are queued, which
+    keeps their heartbeat up to date.
+
+    :param str folder: Full path to the queue folder.
+    """
+    sessions_folder = os.path.join(folder, "sessions")
+    if not os.path.isdir(sessions_folder):
+        os.makedirs(sessions_folder)
+    _write_json_file(
+        os.path.join(sessions_folder, "%s.json" % _SESSION_ID),
+        {"pid": os.getpid(), "host": socket.gethostname(), "time": time.time()},
+    )
+
+
+def _remove_stale_session_heartbeats(folder):
+    """
+    Remove the heartbeat files of sessions which are gone from the given queue
+    folder.
+
+    :param str folder: Full path to the queue folder.
+    """
+    sessions_folder = os.path.join(folder, "sessions")
+    for name in os.listdir(sessions_folder):
+        path = os.path.join(sessions_folder, name)
+        if not _is_alive(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _ProcessHeartbeat(object):
+    """
+    Rewrite a heartbeat file from a background thread, until stopped or the
+    process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop_event = None
+
+    def start(self, path):
+        """
+        Start writing the given heartbeat file, if not already done.
+
+        :param str path: Full path to the heartbeat file.
+        """
+        with self._lock:
+            if self._stop_event is not None:
+                return
+            self._stop_event = threading.Event()
+        _write_json_file(
+            path,
+            {"pid": os.getpid(), "host": socket.gethostname(), "time": time.time()},
+        )
+        thread = threading.Thread(target=self._run, args=(path, self._stop_event))
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """
+        Stop writing the heartbeat file.
+        """
+        with self._lock:
+            if self._stop_event is not None:
+                self._stop_event.set()
+                self._stop_event = None
+
+    @staticmethod
+    def _run(path, stop_event):
+        """
+        Rewrite the given heartbeat file until the given event is set.
+
+        :param str path: Full path to the heartbeat file.
+        :param stop_event: A :class:`threading.Event` instance.
+        """
+        while not stop_event.wait(_HEARTBEAT_INTERVAL):
+            try:
+                _write_json_file(
+                    path,
+                    {
+                        "pid": os.getpid(),
+                        "host": socket.gethostname(),
+                        "time": time.time(),
+                    },
+                )
+            except Exception:
+                # the publish folder can be removed while the process is running
+                pass
+
+
+def _write_json_file(path, data):
+    """
+    Atomically write the given data as json in the given file.
+
+    :param str path: Full path to the file to write.
+    :param data: Data to serialize.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fp:
+            json.dump(data, fp)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json_file(path):
+    """
+    Read the given json file.
+
+    :param str path: Full path to the file to read.
+    :returns: The deserialized data or ``None`` if the file can't be read.
+    """
+    try:
+        with open(path, "r") as fp:
+            return json.load(fp)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _get_max_publish_processes():
+    """
+    Return the maximum number of background publishing processes to run at
+    the same time, from the environment.
+
+    :returns: An integer, at least 1.
+    """
+    try:
+        return max(
+            1,
+            int(
+                os.environ.get(_MAX_PUBLISH_PROCESSES_ENV_VAR)
+                or _DEFAULT_MAX_PUBLISH_PROCESSES
+            ),
+        )
+    except ValueError:
+        return _DEFAULT_MAX_PUBLISH_PROCESSES
+
+
+class _PublishFolderRetention(object):
+    """
+    Remove the folders created for background publishes which are no longer
+    needed, oldest first, when they are too old or use too much space.
+
+    Folders of publishes which are queued or being published, listed by the
+    publish queue, are never removed unless the session which queued them or
+    their publishing process is gone, nor are recently modified folders, which
+    can belong to publishes which are not queued yet.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_run = {}
+
+    def run_in_background(self, root_folder, queue_folder, logger):
+        """
+        Clean up the given folder in a background thread, if it was not done
+        recently.
+
+        :param str root_folder: Full path to the folder where background
+            publish folders are created.
+        :param str queue_folder: Full path to the publish queue folder.
+        :param logger: A standard logger.
+        """
+        with self._lock:
+            if time.time() - self._last_run.get(root_folder, 0) < _RETENTION_INTERVAL:
+                return
+            self._last_run[root_folder] = time.time()
+        thread = threading.Thread(
+            target=self._run, args=(root_folder, queue_folder, logger)
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, root_folder, queue_folder, logger):
+        """
+        Clean up the given folder.
+
+        :param str root_folder: Full path to the folder where background
+            publish folders are created.
+        :param str queue_folder: Full path to the publish queue folder.
+        :param logger: A standard logger.
+        """
+        try:
+            active = self._get_active_folders(queue_folder)
+            now = time.time()
+            folders = []
+            for name in os.listdir(root_folder):
+                path = os.path.join(root_folder, name)
+                if not os.path.isdir(path) or os.path.normcase(
+                    path
+                ) == os.path.normcase(queue_folder):
+                    continue
+                size, modified = _get_folder_usage(path)
+                folders.append((modified, size, path))
+            # oldest first
+            folders.sort()
+            total_size = sum(size for _, size, _ in folders)
+            removed = 0
+            for modified, size, path in folders:
+                if (
+                    os.path.normcase(path) in active
+                    or now - modified < _RETENTION_MIN_AGE
+                ):
+                    continue
+                if (
+                    now - modified < _RETENTION_MAX_AGE
+                    and total_size <= _RETENTION_MAX_SIZE
+                ):
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                if not os.path.exists(path):
+                    total_size -= size
+                    removed += 1
+            if removed:
+                logger.debug(
+                    "Removed %d background publish folders from %s, %d bytes left."
+                    % (removed, root_folder, total_size)
+                )
+        except Exception as e:
+            logger.warning(
+                "Unable to clean up background publish folders in %s: %s"
+                % (root_folder, e)
+            )
+
+    @staticmethod
+    def _get_active_folders(queue_folder):
+        """
+        Return the folders of the publishes which are queued or being
+        published.
+
+        :param str queue_folder: Full path to the publish queue folder.
+        :returns: A set of normalized folder paths.
+        """
+        active = set()
+        for name in ["jobs", "running"]:
+            folder = os.path.join(queue_folder, name)
+            if not os.path.isdir(folder):
+                continue
+            for job_name in os.listdir(folder):
+                job = _read_json_file(os.path.join(folder, job_name))
+                if not job:
+                    continue
+                if name == "jobs" and _is_orphaned(queue_folder, job):
+                    continue
+                if name == "running" and _is_completed(job):
+                    continue
+                active.add(os.path.normcase(os.path.dirname(job["tree_file_path"])))
+        return active
+
+
+def _get_folder_usage(folder):
+    """
+    Return the size of the files in the given folder and the last time one of
+    them was modified.
+
+    :param str folder: Full path to the folder.
+    :returns: A tuple with the size in bytes and a modification time.
+    """
+    size = 0
+    modified = os.path.getmtime(folder)
+    for dir_path, _, file_names in os.walk(folder):
+        for file_name in file_names:
+            try:
+                stat = os.stat(os.path.join(dir_path, file_name))
+            except OSError:
+                continue
+            size += stat.st_size
+            modified = max(modified, stat.st_mtime)
+    return size, modified
+
+
+# Identifies this session in the publish queue folders.
+_SESSION_ID = uuid.uuid4().hex
+
+# Background publishes queued by this session.
+_PUBLISH_QUEUE = _PublishQueue()
+
+# Heartbeat of this process, when it is a background publishing process.
+_PROCESS_HEARTBEAT = _ProcessHeartbeat()
+
+# Clean up of the background publish folders.
+_PUBLISH_FOLDER_RETENTION = _PublishFolderRetention()